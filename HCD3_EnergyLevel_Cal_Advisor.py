@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HCD3 升级建议 - 达到上一等级所需的改善量
+对批量中每台机器（向量化）计算升到上一等级（不合格者为 5 级）所需的：
+  - E24 减少量（以反算 max_E24_for_grade / max_E24_for_cold_hot_grade 的精确边界为准）
+  - 或单独调整一个设计输入所需的改变量（其余输入维持实测值，依现行门槛公式反解，
+    计入 K1/K2 与 E_st,24 的舍入；无法达成者为 nan）：
+      温热型：  热水设定温度 T_hot24_C（K 变大使 E_st,24 变小）、标示容量 V_marked_L
+      冰温热型：T_hot_C、T_cold_C（K1/K2 改变 Veq）、V_hot_L、V_cold_L
+并依机型系列汇总排名（平均所需减少量小者在前，最容易升级）。
+
+注意：此处按公式「固定 E24」求解；实际上改变设定温度或容量通常也会改变 E24。
+
+使用方法：
+  python HCD3_EnergyLevel_Cal_Advisor.py input.csv [系列汇总.csv] [--rows 逐台结果.csv] [--sep -]
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+from HCD3_EnergyLevel_Cal_Core import max_E24_for_grade, max_E24_for_cold_hot_grade, standard
+import HCD3_EnergyLevel_Cal_Vector as vec
+
+def _target_grade(grade: np.ndarray) -> np.ndarray:
+    # 上一等级：不合格 → 5；1 级 → 0（已是最佳）
+    return np.where(grade == vec.FAIL, 5, grade - 1).astype(np.int8)
+
+def _target_limit(solve, target: np.ndarray, inputs) -> np.ndarray:
+    # 逐等级只对目标为该等级的行反算 E24 上限（1 级者为 nan）
+    limit = np.full(target.shape, np.nan)
+    for g in (1, 2, 3, 4, 5):
+        rows = target == g
+        if rows.any():
+            limit[rows] = solve(g, *(x[rows] for x in inputs))
+    return limit
+
+def _coeff(A: np.ndarray, B: np.ndarray, target: np.ndarray):
+    # A、B 为 1–5 级系数（形状 (5,) 或 (5, n)），取各行目标等级者；目标为 0 时为 nan
+    A, B = (np.broadcast_to(np.reshape(x, (5, -1)), (5, target.size)) for x in (A, B))
+    idx = np.maximum(target, 1).astype(np.intp)[None] - 1
+    a = np.take_along_axis(A, idx, axis=0)[0]
+    b = np.take_along_axis(B, idx, axis=0)[0]
+    return np.where(target > 0, a, np.nan), np.where(target > 0, b, np.nan)
+
+def _ceil_digits(x: np.ndarray, digits) -> np.ndarray:
+    # 取不小于 x 的 10^-digits 倍数（容许百万分之一步长的浮点误差）；digits 为 None（不舍入）时原值
+    if digits is None:
+        return x
+    s = 10 ** digits
+    return np.ceil(np.round(x * s, 6)) / s
+
+def _half_step(digits) -> float:
+    # 舍入至 digits 位时，舍入后为某值的下界与该值之差（不舍入时为 0）
+    return 0.0 if digits is None else 0.5 / 10 ** digits
+
+def _step(digits) -> float:
+    return 1e-9 if digits is None else 10.0 ** -digits
+
+def _round_delta(x: np.ndarray, digits) -> np.ndarray:
+    # 改变量依输入的舍入位数表示，去除相减的浮点误差
+    return x if digits is None else vec.py_round(x, digits)
+
+def _hot_below_boiling(Th: np.ndarray, d: np.ndarray) -> np.ndarray:
+    return np.where(Th + d < 100.0, d, np.nan)
+
+def _cold_above_freezing(Tc: np.ndarray, d: np.ndarray) -> np.ndarray:
+    return np.where(Tc + d > 0.0, d, np.nan)
+
+def _min_reduction(E: np.ndarray, limit: np.ndarray) -> np.ndarray:
+    """
+    使浮点运算 E - r ≤ limit 成立的最小 r。
+    r0 = E - limit 与真解相差不过数个 ulp(E)，故在 r0 ± 4 ulp(E) 内对正浮点数的位元表示二分搜索
+    （正浮点数的位元表示与数值同序），迭代次数不超过 64，与 ulp(r) 远小于 ulp(E) 无关。
+    """
+    r0 = E - limit
+    ok = np.isfinite(r0) & (r0 > 0)
+    u = 4 * np.spacing(np.abs(np.where(ok, E, 1.0)))
+    lo = np.maximum(np.where(ok, r0 - u, 0.0), 0.0).view(np.int64)     # E - lo > limit（未达标）
+    hi = np.where(ok, r0 + u, 1.0).view(np.int64)                       # E - hi ≤ limit（达标）
+    while True:
+        active = hi - lo > 1
+        if not active.any():
+            break
+        mid = lo + (hi - lo) // 2
+        passes = E - mid.view(np.float64) <= limit
+        hi = np.where(active & passes, mid, hi)
+        lo = np.where(active & ~passes, mid, lo)
+    return np.where(ok, hi.view(np.float64), r0)
+
+def _settle(delta: np.ndarray, reaches, step: float, growth: float = 2.0) -> np.ndarray:
+    """
+    线性解受舍入或分段影响仍未达标的行，沿改善方向逐步加大改变量（步长每次乘以 growth，最多 16 次）。
+    reaches(delta_sub, rows) 回传这些行套用改变量后是否达到目标等级；只重算未达标的行。
+    """
+    delta = delta.copy()
+    rows = np.flatnonzero(np.isfinite(delta))
+    for _ in range(16):
+        rows = rows[~reaches(delta[rows], rows)]
+        if not rows.size:
+            break
+        delta[rows] += step
+        step *= growth
+    return delta
+
+def _best_lever(deltas: Dict[str, np.ndarray], scales: Dict[str, np.ndarray]):
+    names = list(deltas)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rel = np.stack([np.abs(deltas[k] / scales[k]) for k in names])
+    rel = np.where(np.isfinite(rel), rel, np.inf)
+    best = np.argmin(rel, axis=0)
+    lever = np.asarray(names)[best]
+    return np.where(np.isfinite(rel.min(axis=0)), lever, "")
+
+def advise(kind: str, columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    回传逐台阵列：grade、target_grade、required_dE24_kWh（正值为须减少量）、
+    各输入所需改变量 d_<字段>（nan 表示不适用）与 best_lever（相对改变量最小的输入）。
+    相对改变量：E24 与容量以实测值为基准，温度以与周围温度之温差为基准。
+    """
+    E = np.asarray(columns["E24_kWh"], dtype=float)
+    result = vec.evaluate_any(kind, columns)
+    grade = result["grade"]
+    target = _target_grade(grade)
+    Ta = np.asarray(columns["T_amb_C"], dtype=float)
+
+    def reaches(res, rows):
+        return (res["grade"] != vec.FAIL) & (res["grade"] <= target[rows])
+
+    version = standard(kind).version
+    dV = version.digits("V")
+
+    if kind == vec.COLD_HOT:
+        dK = version.digits("K")
+        Th = np.asarray(columns["T_hot_C"], dtype=float)
+        Tc = np.asarray(columns["T_cold_C"], dtype=float)
+        V1, V2 = result["V_hot_L"], result["V_cold_L"]
+        limit = _target_limit(max_E24_for_cold_hot_grade, target, (Th, Tc, Ta, V1, V2))
+        Veq = vec.calc_Veq(V1, V2, result["K1"], result["K2"])
+        # 以目前 Veq 所在分段的系数求解（跨越分段时由下方逐步修正）
+        a, b = _coeff(*vec.cold_hot_coeffs(Veq), target)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dVeq = (E - b) / a - Veq
+            K1, K2 = result["K1"], result["K2"]
+            # 容量依基准的位数（0.1 L）进位：仍未达标（浮点误差或跨越分段）者逐次再加一个单位
+            d_V1 = _settle(_ceil_digits(V1 + dVeq / K1, dV) - V1, lambda d, r: reaches(vec.evaluate_cold_hot_columns(
+                E[r], Th[r], Tc[r], Ta[r], V1[r] + d, V2[r]), r), _step(dV), growth=1.0)
+            d_V2 = _settle(_ceil_digits(V2 + 3.0 * dVeq / K2, dV) - V2, lambda d, r: reaches(vec.evaluate_cold_hot_columns(
+                E[r], Th[r], Tc[r], Ta[r], V1[r], V2[r] + d), r), _step(dV), growth=1.0)
+            # K1、K2 依基准的位数舍入：所需系数进位后，换算为舍入后恰为该值的最小温差
+            K1_new = _ceil_digits(K1 + dVeq / V1, dK) - _half_step(dK)
+            K2_new = _ceil_digits(K2 + 3.0 * dVeq / V2, dK) - _half_step(dK)
+            # 热水须低于 100 °C、冰水须高于 0 °C，超出者无法单靠该温度达成（先排除，不进入逐步修正）
+            d_Th = _hot_below_boiling(Th, Ta + K1_new * (100.0 - Ta) - Th)
+            d_Tc = _cold_above_freezing(Tc, Ta - K2_new * Ta - Tc)
+            d_Th = _hot_below_boiling(Th, _settle(d_Th, lambda d, r: reaches(vec.evaluate_cold_hot_columns(
+                E[r], Th[r] + d, Tc[r], Ta[r], V1[r], V2[r]), r), 1e-9))
+            d_Tc = _cold_above_freezing(Tc, _settle(d_Tc, lambda d, r: reaches(vec.evaluate_cold_hot_columns(
+                E[r], Th[r], Tc[r] + d, Ta[r], V1[r], V2[r]), r), -1e-9))
+            deltas = {
+                "T_hot_C": d_Th,
+                "T_cold_C": d_Tc,
+                "V_hot_L": _round_delta(d_V1, dV),
+                "V_cold_L": _round_delta(d_V2, dV),
+            }
+        scales = {"T_hot_C": Th - Ta, "T_cold_C": Ta - Tc, "V_hot_L": V1, "V_cold_L": V2}
+    else:
+        Th = np.asarray(columns["T_hot24_C"], dtype=float)
+        V = vec.round_to(vec.HOT_WARM, "V", columns["V_marked_L"])
+        limit = _target_limit(max_E24_for_grade, target, (Th, Ta, V))
+        a, b = _coeff(*vec.segment_coeffs(vec.HOT_WARM, V), target)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # E_st,24 依基准的位数舍入：目标取不超过上限（浮点值）的最大该位数值
+            L = a * V + b
+            dE = version.digits("E_st24")
+            if dE is None:
+                L_target = L
+            else:
+                s = 10 ** dE
+                k = np.floor(L * s)
+                L_target = np.where(k / s > L, (k - 1) / s, k / s)
+                L_target = np.where((k + 1) / s <= L, (k + 1) / s, L_target)
+            # E / K 舍入后 ≤ L_target 即可，最小 K 对应 E / K 恰低于 L_target + 半个单位
+            K_needed = E / (L_target + _half_step(dE))
+            d_Th = _hot_below_boiling(Th, Ta + K_needed * (100.0 - Ta) - Th)
+            d_Th = _hot_below_boiling(Th, _settle(d_Th, lambda d, r: reaches(
+                vec.evaluate_columns(E[r], Th[r] + d, Ta[r], V[r]), r), 1e-9))
+            Est = result["E_st24_kWh"]
+            V_new = _ceil_digits((Est - b) / a, dV)
+            V_new = np.where(Est > a * V_new + b, _round_delta(V_new + _step(dV), dV), V_new)
+            deltas = {
+                "T_hot24_C": d_Th,
+                "V_marked_L": _round_delta(V_new - V, dV),
+            }
+        scales = {"T_hot24_C": Th - Ta, "V_marked_L": V}
+
+    # 减法有舍入：取使 E24 - 减少量 恰在边界内的最小减少量
+    required = _min_reduction(E, limit)
+    done = target == 0
+    deltas = {k: np.where(done, np.nan, v) for k, v in deltas.items()}
+    lever_deltas = dict(deltas, E24_kWh=-required)
+    lever_scales = dict(scales, E24_kWh=E)
+    return {
+        "grade": grade,
+        "target_grade": target,
+        "required_dE24_kWh": required,
+        **{f"d_{k}": v for k, v in deltas.items()},
+        "best_lever": _best_lever(lever_deltas, lever_scales),
+    }
+
+def family_of(labels: List[str], sep: str = "-") -> np.ndarray:
+    """
+    由型号取得系列名称：分隔符之前的部分（无分隔符时为整个型号）
+    """
+    return np.array([label.split(sep, 1)[0] for label in labels])
+
+def summarize_families(families: np.ndarray, advice: Dict[str, np.ndarray]) -> List[Dict]:
+    """
+    依系列汇总（以 np.unique / bincount 向量化分组），依平均所需减少量升序排名
+    """
+    names, group = np.unique(families, return_inverse=True)
+    k = names.size
+    required = advice["required_dE24_kWh"]
+    need = np.isfinite(required)
+    units = np.bincount(group, minlength=k)
+    grade1 = np.bincount(group, weights=advice["grade"] == 1, minlength=k).astype(int)
+    failed = np.bincount(group, weights=advice["grade"] == vec.FAIL, minlength=k).astype(int)
+    n_need = np.bincount(group[need], minlength=k)
+    total = np.bincount(group[need], weights=required[need], minlength=k)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = total / n_need
+
+    # 各系列中位数：依 (系列, 所需量) 排序后取中间位置
+    order = np.lexsort((required[need], group[need]))
+    sorted_req = required[need][order]
+    starts = np.concatenate([[0], np.cumsum(n_need)[:-1]])
+    if sorted_req.size:
+        lo = np.clip(starts + (n_need - 1) // 2, 0, sorted_req.size - 1)
+        hi = np.clip(starts + n_need // 2, 0, sorted_req.size - 1)
+        median = np.where(n_need > 0, (sorted_req[lo] + sorted_req[hi]) / 2, np.nan)
+    else:
+        median = np.full(k, np.nan)
+
+    # 各系列最常见的建议调整项
+    levers, lever_idx = np.unique(advice["best_lever"], return_inverse=True)
+    lever_counts = np.bincount(group * levers.size + lever_idx, minlength=k * levers.size).reshape(k, levers.size)
+    if "" in levers:
+        lever_counts[:, np.searchsorted(levers, "")] = 0
+    common = levers[np.argmax(lever_counts, axis=1)]
+
+    rank = np.lexsort((names, np.where(np.isfinite(mean), mean, np.inf)))
+    summary = []
+    for r, i in enumerate(rank, 1):
+        summary.append({
+            "排名": r,
+            "系列": names[i],
+            "台数": int(units[i]),
+            "1级": int(grade1[i]),
+            "不合格": int(failed[i]),
+            "平均所需减少_kWh": f"{mean[i]:.4f}" if n_need[i] else "",
+            "中位数所需减少_kWh": f"{median[i]:.4f}" if n_need[i] else "",
+            "合计所需减少_kWh": f"{total[i]:.3f}",
+            "常见建议": common[i] if lever_counts[i].max() > 0 else "",
+        })
+    return summary
+
+def main():
+    import sys
+    import time
+
+    args = sys.argv[1:]
+    opts = {"--rows": None, "--sep": "-"}
+    files = []
+    i = 0
+    while i < len(args):
+        if args[i] in opts:
+            opts[args[i]] = args[i + 1]
+            i += 2
+        else:
+            files.append(args[i])
+            i += 1
+    if not files:
+        print("使用方法：python HCD3_EnergyLevel_Cal_Advisor.py input.csv [系列汇总.csv] [--rows 逐台结果.csv] [--sep -]")
+        return
+
+    from HCD3_EnergyLevel_Cal_Batch import write_csv
+
+    print("=" * 70)
+    print("升级建议 - 达到上一等级所需改善量")
+    print("=" * 70)
+    kind, columns, labels = vec.read_columns(files[0])
+    t0 = time.perf_counter()
+    advice = advise(kind, columns)
+    summary = summarize_families(family_of(labels, opts["--sep"]), advice)
+    print(f"  {len(labels):,} 台，耗时 {time.perf_counter() - t0:.2f} s")
+
+    for item in summary[:20]:
+        print(f"  {item['排名']:>3}. {item['系列']}: {item['台数']} 台，"
+              f"平均需减少 {item['平均所需减少_kWh'] or '-'} kWh，常见建议 {item['常见建议'] or '-'}")
+    write_csv(files[1] if len(files) > 1 else "advisor_summary.csv", summary)
+
+    if opts["--rows"]:
+        rows = []
+        for r in range(len(labels)):
+            row = {"序号": r + 1, "型号": labels[r]}
+            for key, values in advice.items():
+                v = values[r]
+                row[key] = v if key == "best_lever" else ("" if v != v else f"{v:.4f}" if isinstance(v, float) else int(v))
+            rows.append(row)
+        write_csv(opts["--rows"], rows)
+    print("=" * 70)
+
+if __name__ == "__main__":
+    main()
@@ -6,11 +6,16 @@ CNS 3910 批量测试工具 - 支持 CSV 输入/输出
   1. 准备 input.csv 文件（包含测试数据）
   2. 运行：python cns3910_batch_csv.py
   3. 查看 output.csv（包含计算结果）
+  坏行隔离：python HCD3_EnergyLevel_Cal_Batch.py input.csv output.csv --quarantine 隔离.csv
+  修正后重送：python HCD3_EnergyLevel_Cal_Batch.py --replay 隔离.csv output.csv [--quarantine 仍隔离.csv]
+  指定基准版本：附加 --standard 版本id 或 --date YYYY-MM-DD（默认今天有效的版本，见 HCD3_EnergyLevel_Standards.json）
 """
 
 import csv
-from typing import List, Dict
-from HCD3_EnergyLevel_Cal_Core import HotWarmDispenserInput, evaluate
+from typing import Dict, Iterable, List, Optional, Tuple
+from HCD3_EnergyLevel_Cal_Core import (
+    HotWarmDispenserInput, HOT_WARM, HOT_WARM_FIELDS, INVALID_REASONS, evaluate_fused, standard, validate_columns,
+)
 
 def read_csv(filename: str) -> List[Dict]:
     """
@@ -84,9 +89,229 @@ def create_sample_input():
     print(f"✓ 已创建示例输入文件：{filename}")
     return filename
 
-def process_batch(input_file: str, output_file: str):
+def add_sensitivity_columns(results: List[Dict], inputs: List[HotWarmDispenserInput]):
+    """
+    以向量化解析偏导数为每行附加灵敏度与翻转扰动字段（一次计算全部行）
+    """
+    from HCD3_EnergyLevel_Cal_Sensitivity import hot_warm_sensitivity
+
+    columns = [[getattr(x, k) for x in inputs] for k in ("E24_kWh", "T_hot24_C", "T_amb_C", "V_marked_L")]
+    sens = hot_warm_sensitivity(*columns)
+    for i, row in enumerate(results):
+        for key, values in sens.items():
+            value = values[i]
+            row[key] = value if key == "flip_input" else f"{value:.6g}"
+
+# --- 坏行隔离 ---
+#
+# 无法计算的输入行连同原始行号（序号）、原始字段与原因代码写入隔离档，
+# 修正后以 --replay 经同一处理流程重新计算，并依序号合并回原输出档。
+
+QUARANTINE_BUFFER_ROWS = 256    # 隔离档缓冲上限（行），满则写出
+BATCH_CHUNK_ROWS = 4096         # 每次整块检核 / 计算的行数
+
+REASON_MISSING_FIELD = "missing_field"
+REASON_BAD_NUMBER = "bad_number"
+REASON_EVAL_ERROR = "eval_error"
+
+QUARANTINE_REASONS = {
+    REASON_MISSING_FIELD: "缺少字段",
+    REASON_BAD_NUMBER: "数值格式错误",
+    REASON_EVAL_ERROR: "计算失败",
+    **INVALID_REASONS,
+}
+
+# 隔离档在原始字段前附加的字段
+QUARANTINE_FIELDS = ["序号", "原因代码", "原因说明"]
+
+class QuarantineWriter:
+    """
+    坏行隔离档（CSV，随处理进度写出；缓冲超过 buffer_rows 行即写入磁盘）
+    每行：序号、原因代码（多个以 ; 分隔）、原因说明，其后为原始字段
+    """
+
+    def __init__(self, filename: str, fieldnames: List[str], buffer_rows: int = QUARANTINE_BUFFER_ROWS):
+        self.filename = filename
+        self.buffer_rows = buffer_rows
+        self.count = 0
+        self._buffer: List[Dict] = []
+        raw = [k for k in fieldnames if k not in QUARANTINE_FIELDS]
+        self._file = open(filename, 'w', encoding='utf-8-sig', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=QUARANTINE_FIELDS + raw, extrasaction='ignore')
+        self._writer.writeheader()
+
+    def add(self, idx: int, row: Dict, reasons: List[Tuple[str, str]]):
+        """
+        reasons: [(字段, 原因代码)]
+        """
+        entry = {k: v for k, v in row.items() if k is not None}
+        entry["序号"] = idx
+        entry["原因代码"] = ";".join(code for _, code in reasons)
+        entry["原因说明"] = "；".join(f"{field}：{QUARANTINE_REASONS.get(code, code)}" for field, code in reasons)
+        self._buffer.append(entry)
+        self.count += 1
+        if len(self._buffer) >= self.buffer_rows:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._writer.writerows(self._buffer)
+            self._buffer.clear()
+        self._file.flush()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _parse_row(row: Dict) -> Tuple[Optional[HotWarmDispenserInput], List[Tuple[str, str]]]:
+    values, reasons = [], []
+    for k in HOT_WARM_FIELDS:
+        raw = row.get(k)
+        if raw is None or raw == "":
+            reasons.append((k, REASON_MISSING_FIELD))
+            continue
+        try:
+            values.append(float(raw))
+        except ValueError:
+            reasons.append((k, REASON_BAD_NUMBER))
+    if reasons:
+        return None, reasons
+    return HotWarmDispenserInput(*values), []
+
+def _output_row(idx: int, row: Dict, result: dict) -> Dict:
+    return {
+        "序号": idx,
+        "型号": row.get('型号') or f'测试{idx}',
+        "E24_kWh": row['E24_kWh'],
+        "T_hot24_C": row['T_hot24_C'],
+        "T_amb_C": row['T_amb_C'],
+        "V_marked_L": row['V_marked_L'],
+        "温度校正系数_K": f"{result['K']:.6f}",
+        "E_st24_kWh": f"{result['E_st24_kWh']:.3f}",
+        "MEPS_kWh": f"{result['MEPS_kWh']:.3f}",
+        "1级门槛": f"{result['limits_kWh'][1]:.3f}",
+        "2级门槛": f"{result['limits_kWh'][2]:.3f}",
+        "3级门槛": f"{result['limits_kWh'][3]:.3f}",
+        "4级门槛": f"{result['limits_kWh'][4]:.3f}",
+        "5级门槛": f"{result['limits_kWh'][5]:.3f}",
+        "能效等级": result['grade'] if result['grade'] else "不合格",
+        "是否通过MEPS": "是" if result['is_meps_pass'] else "否",
+    }
+
+def _process_chunk(chunk: List[Tuple[int, Dict]], total: int, results: List[Dict],
+                   inputs: List[HotWarmDispenserInput], quarantine: Optional[QuarantineWriter],
+                   verbose: bool = True):
+    def reject(idx, row, reasons):
+        if verbose:
+            text = "；".join(f"{f}：{QUARANTINE_REASONS.get(c, c)}" for f, c in reasons)
+            print(f"  ❌ 第 {idx} 行数据错误：{text}")
+        if quarantine is not None:
+            quarantine.add(idx, row, reasons)
+
+    parsed = []
+    for idx, row in chunk:
+        test_input, reasons = _parse_row(row)
+        if reasons:
+            reject(idx, row, reasons)
+        else:
+            parsed.append((idx, row, test_input))
+    if not parsed:
+        return
+
+    # 整块检核（NaN、范围、分母为 0、温度顺序），不合格行不进入计算
+    report = validate_columns({k: [getattr(x, k) for _, _, x in parsed] for k in HOT_WARM_FIELDS})
+    errors: Dict[int, List[Tuple[str, str]]] = {}
+    for j, field, code in zip(report["row"].tolist(), report["field"].tolist(), report["reason"].tolist()):
+        errors.setdefault(j, []).append((field, code))
+
+    for j, (idx, row, test_input) in enumerate(parsed):
+        if j in errors:
+            reject(idx, row, errors[j])
+            continue
+        try:
+            result = evaluate_fused(test_input)
+        except Exception as e:
+            if verbose:
+                print(f"  ❌ 第 {idx} 行处理失败：{e}")
+            if quarantine is not None:
+                quarantine.add(idx, row, [("", REASON_EVAL_ERROR)])
+            continue
+        output_row = _output_row(idx, row, result)
+        results.append(output_row)
+        inputs.append(test_input)
+
+        # 显示进度
+        if not verbose:
+            continue
+        grade_str = f"{result['grade']}级" if result['grade'] else "❌不合格"
+        print(f"  [{idx}/{total}] {output_row['型号']}: "
+              f"E_st,24={result['E_st24_kWh']:.3f} kWh → {grade_str}")
+
+def process_rows(rows: Iterable[Tuple[int, Dict]], total: int,
+                 quarantine: Optional[QuarantineWriter] = None,
+                 chunk_rows: int = BATCH_CHUNK_ROWS,
+                 verbose: bool = True) -> Tuple[List[Dict], List[HotWarmDispenserInput]]:
+    """
+    处理流程（批量、重送与后台任务共用）：逐块解析 → 整块检核 → 计算；
+    rows 为 (序号, 原始字段) 序列，坏行写入 quarantine（任何有 add(序号, 原始字段, 原因) 的对象）。
+    verbose=False 时不输出逐行进度。回传 (输出行, 对应输入)
+    """
+    results: List[Dict] = []
+    inputs: List[HotWarmDispenserInput] = []
+    chunk: List[Tuple[int, Dict]] = []
+    for item in rows:
+        chunk.append(item)
+        if len(chunk) >= chunk_rows:
+            _process_chunk(chunk, total, results, inputs, quarantine, verbose)
+            chunk = []
+    if chunk:
+        _process_chunk(chunk, total, results, inputs, quarantine, verbose)
+    return results, inputs
+
+def print_summary(results: List[Dict]):
+    """
+    统计摘要（MEPS 通过率与等级分布）
+    """
+    print("\n" + "=" * 70)
+    print("统计摘要")
+    print("=" * 70)
+
+    total = len(results)
+    passed = sum(1 for r in results if r['是否通过MEPS'] == "是")
+
+    print(f"  总测试数：{total}")
+    print(f"  通过 MEPS：{passed} ({passed/total*100:.1f}%)")
+    print(f"  未通过：{total - passed} ({(total-passed)/total*100:.1f}%)")
+
+    # 按等级统计（合并后的旧行等级为字符串）
+    print("\n  等级分布：")
+    for grade in [1, 2, 3, 4, 5]:
+        count = sum(1 for r in results if str(r['能效等级']) == str(grade))
+        if count > 0:
+            print(f"    {grade}级: {count} ({count/total*100:.1f}%)")
+
+    failed = sum(1 for r in results if r['能效等级'] == "不合格")
+    if failed > 0:
+        print(f"    不合格: {failed} ({failed/total*100:.1f}%)")
+
+    print("=" * 70)
+
+def _read_fieldnames(filename: str) -> List[str]:
+    with open(filename, 'r', encoding='utf-8-sig') as f:
+        return next(csv.reader(f), [])
+
+def process_batch(input_file: str, output_file: str, sensitivity: bool = False,
+                  quarantine_file: Optional[str] = None):
     """
     批量处理 CSV 文件
+    sensitivity=True 时附加灵敏度字段（dEst_d*、flip_*，见 HCD3_EnergyLevel_Cal_Sensitivity）
+    quarantine_file 指定时，坏行连同原始行号、字段与原因代码写入该隔离档
     """
     print("=" * 70)
     print("CNS 3910 批量测试工具")
@@ -98,97 +323,112 @@ def process_batch(input_file: str, output_file: str):
         return
     
     print(f"\n✓ 读取到 {len(input_data)} 组测试数据")
+    print(f"  适用基准：{standard(HOT_WARM).version.id}")
     
-    # 处理每组数据
-    results = []
-    for idx, row in enumerate(input_data, 1):
-        try:
-            # 解析输入
-            test_input = HotWarmDispenserInput(
-                E24_kWh=float(row['E24_kWh']),
-                T_hot24_C=float(row['T_hot24_C']),
-                T_amb_C=float(row['T_amb_C']),
-                V_marked_L=float(row['V_marked_L'])
-            )
-            
-            # 执行计算
-            result = evaluate(test_input)
-            
-            # 整合结果
-            output_row = {
-                "序号": idx,
-                "型号": row.get('型号', f'测试{idx}'),
-                "E24_kWh": row['E24_kWh'],
-                "T_hot24_C": row['T_hot24_C'],
-                "T_amb_C": row['T_amb_C'],
-                "V_marked_L": row['V_marked_L'],
-                "温度校正系数_K": f"{result['K']:.6f}",
-                "E_st24_kWh": f"{result['E_st24_kWh']:.3f}",
-                "MEPS_kWh": f"{result['MEPS_kWh']:.3f}",
-                "1级门槛": f"{result['limits_kWh'][1]:.3f}",
-                "2级门槛": f"{result['limits_kWh'][2]:.3f}",
-                "3级门槛": f"{result['limits_kWh'][3]:.3f}",
-                "4级门槛": f"{result['limits_kWh'][4]:.3f}",
-                "5级门槛": f"{result['limits_kWh'][5]:.3f}",
-                "能效等级": result['grade'] if result['grade'] else "不合格",
-                "是否通过MEPS": "是" if result['is_meps_pass'] else "否",
-            }
-            
-            results.append(output_row)
-            
-            # 显示进度
-            grade_str = f"{result['grade']}级" if result['grade'] else "❌不合格"
-            print(f"  [{idx}/{len(input_data)}] {output_row['型号']}: "
-                  f"E_st,24={result['E_st24_kWh']:.3f} kWh → {grade_str}")
-            
-        except KeyError as e:
-            print(f"  ❌ 第 {idx} 行数据格式错误：缺少字段 {e}")
-        except ValueError as e:
-            print(f"  ❌ 第 {idx} 行数据格式错误：{e}")
-        except Exception as e:
-            print(f"  ❌ 第 {idx} 行处理失败：{e}")
+    quarantine = QuarantineWriter(quarantine_file, _read_fieldnames(input_file)) if quarantine_file else None
+    try:
+        results, inputs = process_rows(enumerate(input_data, 1), len(input_data), quarantine)
+    finally:
+        if quarantine is not None:
+            quarantine.close()
+            print(f"\n  隔离 {quarantine.count} 行 → {quarantine_file}")
     
     # 输出结果
     if results:
+        if sensitivity:
+            add_sensitivity_columns(results, inputs)
         write_csv(output_file, results)
-        
-        # 统计摘要
-        print("\n" + "=" * 70)
-        print("统计摘要")
-        print("=" * 70)
-        
-        total = len(results)
-        passed = sum(1 for r in results if r['是否通过MEPS'] == "是")
-        
-        print(f"  总测试数：{total}")
-        print(f"  通过 MEPS：{passed} ({passed/total*100:.1f}%)")
-        print(f"  未通过：{total - passed} ({(total-passed)/total*100:.1f}%)")
-        
-        # 按等级统计
-        print("\n  等级分布：")
-        for grade in [1, 2, 3, 4, 5]:
-            count = sum(1 for r in results if r['能效等级'] == grade)
-            if count > 0:
-                print(f"    {grade}级: {count} ({count/total*100:.1f}%)")
-        
-        failed = sum(1 for r in results if r['能效等级'] == "不合格")
-        if failed > 0:
-            print(f"    不合格: {failed} ({failed/total*100:.1f}%)")
-        
-        print("=" * 70)
+        print_summary(results)
+
+def replay_quarantine(quarantine_in: str, output_file: str, quarantine_file: Optional[str] = None):
+    """
+    重送修正后的隔离档：经同一处理流程计算，依序号合并回 output_file（同序号取代、依序号排序）；
+    仍有错误的行写入 quarantine_file（若有）。原输出含灵敏度字段时重送行亦附加。
+    """
+    print("=" * 70)
+    print("CNS 3910 批量测试工具 - 隔离行重送")
+    print("=" * 70)
+
+    fixed = read_csv(quarantine_in)
+    if not fixed:
+        return
+    existing = read_csv(output_file)
+    print(f"\n✓ 读取到 {len(fixed)} 行隔离数据，原输出 {len(existing)} 行")
+
+    rows = []
+    for i, row in enumerate(fixed, 1):
+        try:
+            idx = int(row.get("序号") or "")
+        except ValueError:
+            print(f"  ❌ 隔离档第 {i} 行缺少有效序号，略过")
+            continue
+        rows.append((idx, {k: v for k, v in row.items() if k not in QUARANTINE_FIELDS}))
+
+    raw_fields = [k for k in _read_fieldnames(quarantine_in) if k not in QUARANTINE_FIELDS]
+    quarantine = QuarantineWriter(quarantine_file, raw_fields) if quarantine_file else None
+    try:
+        results, inputs = process_rows(rows, len(rows), quarantine)
+    finally:
+        if quarantine is not None:
+            quarantine.close()
+            print(f"\n  仍隔离 {quarantine.count} 行 → {quarantine_file}")
+
+    if not results:
+        print("❌ 没有可合并的结果")
+        return
+    if existing and "flip_input" in existing[0]:
+        add_sensitivity_columns(results, inputs)
+
+    merged = {int(r["序号"]): r for r in existing}
+    replaced = sum(1 for r in results if int(r["序号"]) in merged)
+    merged.update((int(r["序号"]), r) for r in results)
+    merged_rows = [merged[k] for k in sorted(merged)]
+    print(f"\n  合并：新增 {len(results) - replaced} 行，取代 {replaced} 行")
+    write_csv(output_file, merged_rows)
+    print_summary(merged_rows)
 
 def main():
     import sys
     import os
     
-    if len(sys.argv) > 1 and sys.argv[1] == "--sample":
+    args = [a for a in sys.argv[1:] if a != "--sensitivity"]
+    sensitivity = len(args) != len(sys.argv) - 1
+    opts = {"--quarantine": None, "--replay": None, "--standard": None, "--date": None}
+    rest = []
+    i = 0
+    while i < len(args):
+        if args[i] in opts and i + 1 < len(args):
+            opts[args[i]] = args[i + 1]
+            i += 2
+        else:
+            rest.append(args[i])
+            i += 1
+    args = rest
+
+    if opts["--standard"] or opts["--date"]:
+        from datetime import date
+        from HCD3_EnergyLevel_Cal_Core import use_standard
+        try:
+            use_standard(opts["--standard"], date.fromisoformat(opts["--date"]) if opts["--date"] else None)
+        except (KeyError, ValueError) as e:
+            print(f"❌ 无法选用基准版本：{e.args[0] if e.args else e}")
+            return
+    
+    if len(args) > 0 and args[0] == "--sample":
         # 创建示例文件
         create_sample_input()
         return
     
+    if opts["--replay"]:
+        if not os.path.exists(opts["--replay"]):
+            print(f"❌ 找不到隔离文件：{opts['--replay']}")
+            return
+        replay_quarantine(opts["--replay"], args[0] if args else "output.csv", opts["--quarantine"])
+        return
+    
     # 检查输入文件
-    input_file = sys.argv[1] if len(sys.argv) > 1 else "input.csv"
-    output_file = sys.argv[2] if len(sys.argv) > 2 else "output.csv"
+    input_file = args[0] if len(args) > 0 else "input.csv"
+    output_file = args[1] if len(args) > 1 else "output.csv"
     
     if not os.path.exists(input_file):
         print(f"❌ 找不到输入文件：{input_file}")
@@ -196,10 +436,14 @@ def main():
         print("  1. 创建示例文件：python cns3910_batch_csv.py --sample")
         print("  2. 编辑 sample_input.csv 或准备自己的 input.csv")
         print("  3. 运行批量测试：python cns3910_batch_csv.py [input.csv] [output.csv]")
+        print("     附加 --sensitivity 输出灵敏度与翻转扰动字段")
+        print("     附加 --quarantine 隔离.csv 保存无法计算的行（原始行号、字段与原因代码）")
+        print("     附加 --standard 版本id 或 --date YYYY-MM-DD 指定基准版本")
+        print("  4. 修正隔离行后重送并合并：python cns3910_batch_csv.py --replay 隔离.csv [output.csv]")
         return
     
     # 执行批量处理
-    process_batch(input_file, output_file)
+    process_batch(input_file, output_file, sensitivity, opts["--quarantine"])
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HCD3 基准
+micro：以同一批固定种子的随机输入，比较逐台评估的参考实现（Core.evaluate / evaluate_cold_hot）
+  与单次计算快速路径（evaluate_fused / evaluate_cold_hot_fused），输出每台 ns，
+  并先核对两者结果完全相同。
+startup：各入口在全新进程中的载入时间与首个结果时间（载入 + 评估一台），
+  以及载入了哪些不应载入的模块；与 HCD3_EnergyLevel_Startup_Budget.json 的预算比较，
+  超出预算时结束码为 1。
+throughput：evaluate / evaluate_cold_hot / classify_grade 的 次/秒、定点整数整栏评估
+  （FixedPoint.evaluate_fixed_columns / evaluate_cold_hot_fixed_columns）的 行/秒，
+  与批量流程 read_csv → process_rows（process_batch 的计算部分）→ write_csv 各规模的 行/秒；
+  与基准档 HCD3_EnergyLevel_Bench_Baseline.json 比较，任一项慢于基准超过容许百分比时结束码为 1。
+  --save 以本次结果覆写基准档（换机器或确认的效能变化后使用）。
+  批量流程整份数据放在内存中（每行约 1 KB），--rows 含 10000000 时需约 10 GB 以上内存。
+
+使用方法：
+  python HCD3_EnergyLevel_Cal_Bench.py [--n 20000] [--repeat 5] [--seed 0]
+  python HCD3_EnergyLevel_Cal_Bench.py startup [--budget 预算.json] [--repeat 5]
+  python HCD3_EnergyLevel_Cal_Bench.py throughput [--rows 1000,100000] [--repeat 3]
+         [--baseline 基准.json] [--tolerance 15] [--save]
+"""
+
+import os
+import random
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from HCD3_EnergyLevel_Cal_Core import (
+    HotWarmDispenserInput, ColdHotDispenserInput,
+    evaluate, evaluate_cold_hot, evaluate_fused, evaluate_cold_hot_fused,
+)
+
+def sample_inputs(n: int, seed: int = 0) -> Dict[str, List]:
+    """
+    固定种子的随机输入：{"hot_warm": [...], "cold_hot": [...]}
+    """
+    rng = random.Random(seed)
+    hot_warm = [HotWarmDispenserInput(round(rng.uniform(0.3, 1.5), 3), round(rng.uniform(80, 95), 1),
+                                      round(rng.uniform(15, 35), 1), round(rng.uniform(0.5, 10), 2))
+                for _ in range(n)]
+    cold_hot = [ColdHotDispenserInput(round(rng.uniform(0.2, 1.5), 3), round(rng.uniform(85, 95), 1),
+                                      round(rng.uniform(2, 12), 1), round(rng.uniform(15, 35), 1),
+                                      round(rng.uniform(0.5, 10), 1), round(rng.uniform(0.5, 20), 1))
+                for _ in range(n)]
+    return {"hot_warm": hot_warm, "cold_hot": cold_hot}
+
+def ns_per_call(fn: Callable, inputs: Sequence, repeat: int = 5) -> float:
+    """
+    逐台呼叫 fn，取 repeat 次中最快一次的每台平均 ns
+    """
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter_ns()
+        for x in inputs:
+            fn(x)
+        elapsed = time.perf_counter_ns() - t0
+        best = elapsed if best is None or elapsed < best else best
+    return best / max(len(inputs), 1)
+
+def micro(n: int = 20000, repeat: int = 5, seed: int = 0) -> List[Dict]:
+    """
+    回传各机型 {机型, 参考_ns, 快速_ns, 加速}；结果不同时拋出 AssertionError
+    """
+    inputs = sample_inputs(n, seed)
+    pairs = (("hot_warm", evaluate, evaluate_fused), ("cold_hot", evaluate_cold_hot, evaluate_cold_hot_fused))
+    rows = []
+    for kind, reference, fused in pairs:
+        for x in inputs[kind]:
+            assert reference(x) == fused(x), f"{kind} 结果不同：{x}"
+        ref_ns = ns_per_call(reference, inputs[kind], repeat)
+        fused_ns = ns_per_call(fused, inputs[kind], repeat)
+        rows.append({"机型": kind, "参考_ns": round(ref_ns, 1), "快速_ns": round(fused_ns, 1),
+                     "加速": round(ref_ns / fused_ns, 2)})
+    return rows
+
+# --- 启动时间 ---
+
+STARTUP_BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                   "HCD3_EnergyLevel_Startup_Budget.json")
+
+_HOT_WARM_RECORD = {"型号": "A", "E24_kWh": "1.152", "T_hot24_C": "87", "T_amb_C": "25", "V_marked_L": "1.4"}
+
+# 入口名 → (模块, 首个结果的程序码（m 为该模块；None 表示只量载入，如需显示器的 GUI）)
+STARTUP_ENTRIES: Dict[str, tuple] = {
+    "Core": ("HCD3_EnergyLevel_Cal_Core", "m.evaluate(m.HotWarmDispenserInput(1.152, 87.0, 25.0, 1.4))"),
+    "CLI": ("HCD3_EnergyLevel_Cal_CLI", "m.main(['evaluate', '1.152', '87', '25', '1.4', '--quiet'])"),
+    "Interactive": ("HCD3_EnergyLevel_Cal_Interactive", "m.evaluate(m.HotWarmDispenserInput(1.152, 87.0, 25.0, 1.4))"),
+    "GUI": ("HCD3_EnergyLevel_Cal_GUI", None),
+    "GUI_Simple": ("HCD3_EnergyLevel_Cal_GUI_Simple", None),
+    "Batch": ("HCD3_EnergyLevel_Cal_Batch", f"m.process_rows([(1, {_HOT_WARM_RECORD!r})], 1, verbose=False)"),
+    "Server": ("HCD3_EnergyLevel_Cal_Server",
+               "m.handle_hot_warm({'E24_kWh': 1.152, 'T_hot24_C': 87, 'T_amb_C': 25, 'V_marked_L': 1.4})"),
+    "Daemon": ("HCD3_EnergyLevel_Cal_Daemon",
+               "m.evaluate(m.HotWarmDispenserInput(1.152, 87.0, 25.0, 1.4), path='/nonexistent/hcd3.sock')"),
+}
+
+# 在全新进程中执行；结果为最后一行 JSON（载入 json 前先记下已载入模块）
+_STARTUP_DRIVER = """
+import sys, time
+t0 = time.perf_counter()
+import {module} as m
+t1 = time.perf_counter()
+{first}
+t2 = time.perf_counter()
+modules = sorted(sys.modules)
+import json
+print(json.dumps({{"import_ms": (t1 - t0) * 1e3, "first_result_ms": (t2 - t0) * 1e3, "modules": modules}}))
+"""
+
+def measure_startup(module: str, first: Optional[str] = None, repeat: int = 5) -> Dict:
+    """
+    在全新进程中量测载入与首个结果时间（ms，取 repeat 次中最快；先执行一次以产生 .pyc）。
+    回传 {"import_ms", "first_result_ms"（first 为 None 时为 None）, "modules"}
+    """
+    import json
+    import subprocess
+    import sys
+    code = _STARTUP_DRIVER.format(module=module, first=first or "pass")
+    here = os.path.dirname(os.path.abspath(__file__))
+    best = None
+    for _ in range(repeat + 1):
+        proc = subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True,
+                              text=True, encoding="utf-8", check=False)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{module} 启动失败：{proc.stderr.strip()}")
+        run = json.loads(proc.stdout.strip().splitlines()[-1])
+        if best is None:
+            best = dict(run, import_ms=float("inf"), first_result_ms=float("inf"))
+        best["import_ms"] = min(best["import_ms"], run["import_ms"])
+        best["first_result_ms"] = min(best["first_result_ms"], run["first_result_ms"])
+        best["modules"] = run["modules"]
+    if first is None:
+        best["first_result_ms"] = None
+    return best
+
+def load_startup_budget(filename: str = STARTUP_BUDGET_FILE) -> Dict[str, Dict]:
+    import json
+    with open(filename, 'r', encoding='utf-8') as f:
+        return json.load(f)["entry_points"]
+
+def startup(budget_file: str = STARTUP_BUDGET_FILE, repeat: int = 5) -> List[Dict]:
+    """
+    量测预算档中各入口：回传 {入口, 载入_ms, 首个结果_ms, 预算_载入_ms, 预算_首个结果_ms, 多载模块, 通过}。
+    超出时间预算或载入了预算档 forbid 所列模块（含其子模块）时 通过 为 False
+    """
+    rows = []
+    for name, budget in load_startup_budget(budget_file).items():
+        module, first = STARTUP_ENTRIES[name]
+        run = measure_startup(module, first, repeat)
+        forbid = budget.get("forbid", [])
+        extra = sorted({m.split(".")[0] for m in run["modules"]} & set(forbid))
+        ok = run["import_ms"] <= budget["import_ms"] and not extra
+        if first is not None:
+            ok = ok and run["first_result_ms"] <= budget["first_result_ms"]
+        rows.append({"入口": name, "载入_ms": round(run["import_ms"], 1),
+                     "首个结果_ms": None if first is None else round(run["first_result_ms"], 1),
+                     "预算_载入_ms": budget["import_ms"], "预算_首个结果_ms": budget.get("first_result_ms"),
+                     "多载模块": ",".join(extra), "通过": ok})
+    return rows
+
+def print_startup(rows: List[Dict]):
+    for row in rows:
+        first = "—" if row["首个结果_ms"] is None else f"{row['首个结果_ms']:.1f}"
+        mark = "✓" if row["通过"] else "❌"
+        print(f"  {mark} {row['入口']:<12} 载入 {row['载入_ms']:>6.1f} ms（≤{row['预算_载入_ms']}）   "
+              f"首个结果 {first:>6} ms" + (f"（≤{row['预算_首个结果_ms']}）" if row["预算_首个结果_ms"] else "")
+              + (f"   多载：{row['多载模块']}" if row["多载模块"] else ""))
+
+# --- 吞吐量 ---
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "HCD3_EnergyLevel_Bench_Baseline.json")
+THROUGHPUT_ROWS = (1000, 100000)
+DEFAULT_TOLERANCE_PCT = 15.0
+
+def per_second(fn: Callable, inputs: Sequence, repeat: int = 3) -> float:
+    """
+    逐台呼叫 fn 的每秒次数（取 repeat 次中最快一次）
+    """
+    return 1e9 / ns_per_call(fn, inputs, repeat)
+
+def columns_rows_per_second(fn: Callable, columns: Sequence, repeat: int = 3) -> float:
+    """
+    整栏呼叫 fn(*columns) 的每秒行数（取 repeat 次中最快一次）
+    """
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter_ns()
+        fn(*columns)
+        elapsed = time.perf_counter_ns() - t0
+        best = elapsed if best is None or elapsed < best else best
+    return len(columns[0]) * 1e9 / best
+
+def _batch_file(filename: str, n: int, seed: int = 0):
+    import csv
+    rng = random.Random(seed)
+    with open(filename, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["型号", "E24_kWh", "T_hot24_C", "T_amb_C", "V_marked_L"])
+        for i in range(n):
+            writer.writerow([f"M{i}", f"{rng.uniform(0.3, 1.5):.3f}", f"{rng.uniform(80, 95):.1f}",
+                             f"{rng.uniform(15, 35):.1f}", f"{rng.uniform(0.5, 10):.2f}"])
+
+def batch_rows_per_second(n: int, repeat: int = 3, seed: int = 0) -> Dict[str, float]:
+    """
+    批量流程各阶段与整体的 行/秒：{"read_csv", "process", "write_csv", "pipeline"}（各取最快）
+    """
+    import contextlib
+    import io
+    import shutil
+    import tempfile
+    from HCD3_EnergyLevel_Cal_Batch import read_csv, write_csv, process_rows
+
+    folder = tempfile.mkdtemp(prefix="hcd3_bench_")
+    try:
+        src, out = os.path.join(folder, "in.csv"), os.path.join(folder, "out.csv")
+        _batch_file(src, n, seed)
+        best = {}
+        for _ in range(repeat):
+            with contextlib.redirect_stdout(io.StringIO()):     # write_csv 的完成讯息
+                t0 = time.perf_counter()
+                rows = read_csv(src)
+                t1 = time.perf_counter()
+                results, _ = process_rows(enumerate(rows, 1), len(rows), verbose=False)
+                t2 = time.perf_counter()
+                write_csv(out, results)
+                t3 = time.perf_counter()
+            assert len(results) == n, f"批量流程少了 {n - len(results)} 行"
+            for key, elapsed in (("read_csv", t1 - t0), ("process", t2 - t1),
+                                 ("write_csv", t3 - t2), ("pipeline", t3 - t0)):
+                best[key] = max(best.get(key, 0.0), n / elapsed)
+            del rows, results
+        return best
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+def throughput(rows: Sequence[int] = THROUGHPUT_ROWS, repeat: int = 3, n: int = 20000,
+               seed: int = 0) -> Dict[str, float]:
+    """
+    量测各项吞吐量：{项目: 每秒次数或行数}；
+    项目为 evaluate、evaluate_cold_hot、classify_grade（次/秒）、
+    fixed_point_columns、fixed_point_columns_cold_hot（n 行整栏，行/秒）与 batch_<阶段>@<行数>（行/秒）
+    """
+    from dataclasses import astuple
+    import numpy as np
+    from HCD3_EnergyLevel_Cal_Core import classify_grade, est24
+    from HCD3_EnergyLevel_Cal_FixedPoint import evaluate_cold_hot_fixed_columns, evaluate_fixed_columns
+
+    inputs = sample_inputs(n, seed)
+    calls = max(repeat, 7)      # 每轮仅约 0.1 s，多取几轮以压低杂讯
+    grades = [(est24(x.E24_kWh, x.T_hot24_C, x.T_amb_C), x.V_marked_L) for x in inputs["hot_warm"]]
+    result = {
+        "evaluate": per_second(evaluate, inputs["hot_warm"], calls),
+        "evaluate_cold_hot": per_second(evaluate_cold_hot, inputs["cold_hot"], calls),
+        "classify_grade": per_second(lambda a: classify_grade(*a), grades, calls),
+    }
+    for key, fn, kind in (("fixed_point_columns", evaluate_fixed_columns, "hot_warm"),
+                          ("fixed_point_columns_cold_hot", evaluate_cold_hot_fixed_columns, "cold_hot")):
+        columns = [np.array(c) for c in zip(*map(astuple, inputs[kind]))]
+        result[key] = columns_rows_per_second(fn, columns, 5 * calls)     # 每次仅数 ms，多取几轮
+    for count in rows:
+        # 大规模每次需数分钟，只跑一次
+        for stage, rate in batch_rows_per_second(count, repeat if count <= 100000 else 1, seed).items():
+            result[f"batch_{stage}@{count}"] = rate
+    return result
+
+def save_baseline(result: Dict[str, float], filename: str = BASELINE_FILE,
+                  tolerance_pct: float = DEFAULT_TOLERANCE_PCT):
+    """
+    写入基准档（附 Python 版本与机器资讯，比较时提示环境不同）
+    """
+    import json
+    import platform
+    baseline = {"python": platform.python_version(), "machine": platform.machine(),
+                "processor": platform.processor() or platform.machine(),
+                "tolerance_pct": tolerance_pct,
+                "results": {k: round(v, 1) for k, v in result.items()}}
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+def load_baseline(filename: str = BASELINE_FILE) -> Dict:
+    import json
+    with open(filename, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def compare_throughput(current: Dict[str, float], baseline: Dict[str, float],
+                       tolerance_pct: float = DEFAULT_TOLERANCE_PCT) -> List[Dict]:
+    """
+    与基准比较：回传 {项目, 基准, 当前, 变化_%, 回归}；
+    当前值低于 基准 × (1 - 容许%) 为回归。只比较两边都有的项目（依基准档顺序）
+    """
+    rows = []
+    for key, base in baseline.items():
+        if key not in current:
+            continue
+        now = current[key]
+        change = (now / base - 1) * 100 if base else 0.0
+        rows.append({"项目": key, "基准": round(base, 1), "当前": round(now, 1),
+                     "变化_%": round(change, 1), "回归": now < base * (1 - tolerance_pct / 100)})
+    return rows
+
+def print_comparison(rows: List[Dict], tolerance_pct: float):
+    for row in rows:
+        mark = "❌" if row["回归"] else "✓"
+        print(f"  {mark} {row['项目']:<28} 基准 {row['基准']:>13,.0f}/s   当前 {row['当前']:>13,.0f}/s   "
+              f"{row['变化_%']:+6.1f}%")
+    print(f"  （容许变慢 {tolerance_pct:g}%）")
+
+def _throughput_main(opts: Dict[str, str]) -> bool:
+    rows = [int(r) for r in opts["--rows"].split(",") if r]
+    repeat = int(opts["--repeat"])
+    print("=" * 70)
+    print(f"吞吐量（批量 {', '.join(f'{r:,}' for r in rows)} 行 × {repeat} 次，取最快）")
+    print("=" * 70)
+    result = throughput(rows, repeat)
+    for key, rate in result.items():
+        print(f"  {key:<28} {rate:>13,.0f} /s")
+    print("=" * 70)
+    if opts["--save"]:
+        tolerance = float(opts["--tolerance"] or DEFAULT_TOLERANCE_PCT)
+        save_baseline(result, opts["--baseline"], tolerance)
+        print(f"✓ 基准已保存至：{opts['--baseline']}")
+        return True
+    if not os.path.exists(opts["--baseline"]):
+        print(f"（无基准档 {opts['--baseline']}，以 --save 建立）")
+        return True
+    baseline = load_baseline(opts["--baseline"])
+    tolerance = float(opts["--tolerance"] or baseline.get("tolerance_pct", DEFAULT_TOLERANCE_PCT))
+    print(f"与基准比较（Python {baseline.get('python')}，{baseline.get('processor')}）：")
+    comparison = compare_throughput(result, baseline["results"], tolerance)
+    print_comparison(comparison, tolerance)
+    print("=" * 70)
+    if any(r["回归"] for r in comparison):
+        print("❌ 效能回归")
+        return False
+    print("✓ 无效能回归")
+    return True
+
+def main():
+    import sys
+
+    args = sys.argv[1:]
+    suite = args[0] if args[:1] in (["startup"], ["throughput"]) else "micro"
+    flags = set()
+    if suite == "startup":
+        opts = {"--budget": STARTUP_BUDGET_FILE, "--repeat": "5"}
+    elif suite == "throughput":
+        opts = {"--rows": ",".join(map(str, THROUGHPUT_ROWS)), "--repeat": "3",
+                "--baseline": BASELINE_FILE, "--tolerance": "", "--save": ""}
+        flags = {"--save"}
+    else:
+        opts = {"--n": "20000", "--repeat": "5", "--seed": "0"}
+    args = args[1:] if suite != "micro" else args
+    i = 0
+    while i < len(args):
+        if args[i] in flags:
+            opts[args[i]] = "1"
+            i += 1
+        elif args[i] in opts and i + 1 < len(args):
+            opts[args[i]] = args[i + 1]
+            i += 2
+        else:
+            print(__doc__)
+            return
+
+    if suite == "throughput":
+        if not _throughput_main(opts):
+            sys.exit(1)
+        return
+
+    if suite == "startup":
+        print("=" * 70)
+        print(f"启动时间（全新进程 × {opts['--repeat']} 次，取最快）")
+        print("=" * 70)
+        rows = startup(opts["--budget"], int(opts["--repeat"]))
+        print_startup(rows)
+        print("=" * 70)
+        if not all(r["通过"] for r in rows):
+            print("❌ 超出启动时间预算")
+            sys.exit(1)
+        print("✓ 全部在预算内")
+        return
+
+    n, repeat, seed = int(opts["--n"]), int(opts["--repeat"]), int(opts["--seed"])
+
+    print("=" * 70)
+    print(f"单次计算微基准（{n:,} 台 × {repeat} 次，取最快）")
+    print("=" * 70)
+    for row in micro(n, repeat, seed):
+        print(f"  {row['机型']:<10} 参考 {row['参考_ns']:>8.0f} ns/台   "
+              f"快速 {row['快速_ns']:>8.0f} ns/台   ×{row['加速']:.2f}")
+    print("✓ 两种实现结果完全相同")
+    print("=" * 70)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HCD3 功率分析仪二进制记录读取器
+以 mmap 映射固定长度记录的二进制转储文件，每个通道为零拷贝的 NumPy 视图；
+24h 窗口切片、E24 电能积分与温度平均皆直接在视图上分块计算，不会将整个文件读入内存。
+
+使用方法：
+  python HCD3_EnergyLevel_Cal_BinaryLog.py dump.bin "t_s:<f8,P_W:<f4,T_hot_C:<f4" [起点h] [--header 字节数]
+         [--cal 校正证书.csv 通道对应.csv]
+
+记录格式以「通道:dtype」逗号分隔描述，dtype 为 NumPy 格式码（< 小端，> 大端）。
+积分与计数差值的窗口须完全落在记录时间范围内，否则抛出 ValueError（不以端点值外推）。
+温度平均可传入 CalibrationRegistry，已指定感温器的通道逐块先校正再累加。
+"""
+
+import os
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+CHUNK_RECORDS = 1 << 20   # 分块计算时每块记录数，限制临时阵列大小
+
+class RecordLayout:
+    """
+    固定长度记录的格式描述
+      fields      - [(通道名称, dtype 字符串), ...]，依记录内顺序
+      header_bytes- 文件开头需跳过的标头长度
+      time_field  - 时间通道名称
+      time_unit_s - 时间通道一个单位的秒数（秒=1，毫秒=0.001）
+    """
+
+    def __init__(self, fields: List[Tuple[str, str]], header_bytes: int = 0,
+                 time_field: str = None, time_unit_s: float = 1.0):
+        self.dtype = np.dtype([(name, fmt) for name, fmt in fields])
+        self.header_bytes = header_bytes
+        self.time_field = time_field or fields[0][0]
+        self.time_unit_s = time_unit_s
+
+    @classmethod
+    def from_spec(cls, spec: str, **kwargs) -> "RecordLayout":
+        """
+        由「t_s:<f8,P_W:<f4,...」格式字符串建立
+        """
+        fields = []
+        for item in spec.split(','):
+            name, fmt = item.strip().split(':')
+            fields.append((name.strip(), fmt.strip()))
+        return cls(fields, **kwargs)
+
+class BinaryLog:
+    """
+    以 np.memmap（只读 mmap）开启二进制记录；文件尾不完整的记录会被忽略。
+    """
+
+    def __init__(self, filename: str, layout: RecordLayout):
+        self.filename = filename
+        self.layout = layout
+        size = os.path.getsize(filename) - layout.header_bytes
+        self.n_records = max(size, 0) // layout.dtype.itemsize
+        if self.n_records:
+            self.records = np.memmap(filename, dtype=layout.dtype, mode='r',
+                                     offset=layout.header_bytes, shape=(self.n_records,))
+        else:
+            self.records = np.empty(0, dtype=layout.dtype)
+
+    def __len__(self) -> int:
+        return self.n_records
+
+    def channel(self, name: str) -> np.ndarray:
+        """
+        单一通道的零拷贝视图（跨步存取记录内字段）
+        """
+        return self.records[name]
+
+    @property
+    def time(self) -> np.ndarray:
+        return self.channel(self.layout.time_field)
+
+    def _hours(self, t) -> np.ndarray:
+        return np.asarray(t, dtype=float) * (self.layout.time_unit_s / 3600.0)
+
+    def window(self, start_h: float = 0.0, hours: float = 24.0) -> Tuple[int, int]:
+        """
+        时间通道须为递增；以二分搜索回传 [start_h, start_h + hours] 内记录的索引范围 [i, j)
+        """
+        scale = 3600.0 / self.layout.time_unit_s
+        t = self.time
+        i = int(np.searchsorted(t, start_h * scale, side='left'))
+        j = int(np.searchsorted(t, (start_h + hours) * scale, side='right'))
+        return i, j
+
+    def covers(self, start_h: float = 0.0, hours: float = 24.0) -> bool:
+        """
+        窗口 [start_h, start_h + hours] 是否完全落在第一笔与最后一笔记录的时刻之间
+        """
+        if not self.n_records:
+            return False
+        t0, t1 = self._hours(self.time[[0, -1]])
+        return t0 <= start_h and start_h + hours <= t1
+
+    def _check_coverage(self, start_h: float, hours: float):
+        if not self.covers(start_h, hours):
+            span = (f"{self._hours(self.time[0]):g} h ~ {self._hours(self.time[-1]):g} h"
+                    if self.n_records else "无记录")
+            raise ValueError(f"窗口 {start_h:g} h ~ {start_h + hours:g} h 超出记录范围（{span}）")
+
+    def _value_at(self, name: str, t_h: float) -> float:
+        """
+        以相邻两笔记录线性插值取得 t_h 时刻的通道值；超出记录范围时抛出 ValueError
+        """
+        t = self.time
+        k = int(np.searchsorted(t, t_h * 3600.0 / self.layout.time_unit_s))
+        v = self.channel(name)
+        if k < self.n_records and self._hours(t[k]) == t_h:
+            return float(v[k])
+        if k <= 0 or k >= self.n_records:
+            raise ValueError(f"{t_h:g} h 超出记录范围")
+        t0, t1 = self._hours(t[k - 1:k + 1])
+        v0, v1 = float(v[k - 1]), float(v[k])
+        if t1 == t0:
+            return v1
+        return v0 + (v1 - v0) * (t_h - t0) / (t1 - t0)
+
+    def integrate_power_kWh(self, power_field: str, start_h: float = 0.0,
+                            hours: float = 24.0, power_scale_W: float = 1.0) -> float:
+        """
+        以梯形法积分功率通道（W × power_scale_W）得窗口内电能 (kWh)；
+        窗口边界以插值补上不完整的区段。分块进行，每块最多 CHUNK_RECORDS 笔。
+        窗口超出记录范围时抛出 ValueError。
+        """
+        self._check_coverage(start_h, hours)
+        end_h = start_h + hours
+        i, j = self.window(start_h, hours)
+        # 边界节点：(时刻 h, 功率 W)
+        t_first, p_first = start_h, self._value_at(power_field, start_h)
+        t_last, p_last = end_h, self._value_at(power_field, end_h)
+        if i >= j:
+            # 窗口落在相邻两笔记录之间，两端插值点连成的梯形即为精确积分
+            return 0.5 * (p_first + p_last) * (t_last - t_first) * power_scale_W / 1000.0
+
+        t = self.time
+        p = self.channel(power_field)
+        total_Wh = 0.0
+        for a in range(i, j - 1, CHUNK_RECORDS):
+            b = min(a + CHUNK_RECORDS, j - 1)
+            tc = self._hours(t[a:b + 1])
+            pc = np.asarray(p[a:b + 1], dtype=float)
+            total_Wh += float(np.sum(0.5 * (pc[1:] + pc[:-1]) * np.diff(tc)))
+        t_i, t_j = self._hours(t[[i, j - 1]])
+        total_Wh += 0.5 * (p_first + float(p[i])) * (t_i - t_first)
+        total_Wh += 0.5 * (float(p[j - 1]) + p_last) * (t_last - t_j)
+        return total_Wh * power_scale_W / 1000.0
+
+    def counter_delta_kWh(self, energy_field: str, start_h: float = 0.0,
+                          hours: float = 24.0, energy_scale_kWh: float = 1.0) -> float:
+        """
+        累计电能计数通道于窗口两端的差值 (kWh)，端点以插值求得；
+        窗口超出记录范围时抛出 ValueError。
+        """
+        self._check_coverage(start_h, hours)
+        e0 = self._value_at(energy_field, start_h)
+        e1 = self._value_at(energy_field, start_h + hours)
+        return (e1 - e0) * energy_scale_kWh
+
+    def mean(self, name: str, start_h: float = 0.0, hours: float = 24.0, calibration=None) -> float:
+        """
+        窗口内通道的记录平均值（分块累加）；
+        calibration（CalibrationRegistry）指定了该通道的感温器时，每块先校正再累加
+        """
+        i, j = self.window(start_h, hours)
+        if i >= j:
+            return float('nan')
+        v = self.channel(name)
+        serial = calibration.channels.get(name) if calibration is not None else None
+        total = 0.0
+        for a in range(i, j, CHUNK_RECORDS):
+            block = v[a:min(a + CHUNK_RECORDS, j)]
+            if serial is not None:
+                block = calibration.correct(serial, block)
+            total += float(np.sum(block, dtype=float))
+        return total / (j - i)
+
+    def means(self, names: List[str], start_h: float = 0.0, hours: float = 24.0,
+              calibration=None) -> Dict[str, float]:
+        return {name: self.mean(name, start_h, hours, calibration) for name in names}
+
+def main():
+    import sys
+
+    args = sys.argv[1:]
+    header = 0
+    if "--header" in args:
+        k = args.index("--header")
+        header = int(args[k + 1])
+        del args[k:k + 2]
+    calibration = None
+    if "--cal" in args:
+        from HCD3_EnergyLevel_Cal_Calibration import CalibrationRegistry
+        k = args.index("--cal")
+        calibration = CalibrationRegistry.from_csv(args[k + 1], args[k + 2])
+        del args[k:k + 3]
+    if len(args) < 2:
+        print("使用方法：python HCD3_EnergyLevel_Cal_BinaryLog.py dump.bin \"t_s:<f8,P_W:<f4,...\" [起点h] "
+              "[--header 字节数] [--cal 校正证书.csv 通道对应.csv]")
+        return
+
+    layout = RecordLayout.from_spec(args[1], header_bytes=header)
+    start_h = float(args[2]) if len(args) > 2 else 0.0
+    log = BinaryLog(args[0], layout)
+
+    print("=" * 70)
+    print(f"二进制记录：{args[0]}（{len(log)} 笔）")
+    print("=" * 70)
+    i, j = log.window(start_h)
+    print(f"  24h 窗口：{start_h:g} h ~ {start_h + 24:g} h，记录 {i} ~ {j}")
+    if not log.covers(start_h):
+        print("  ❌ 窗口超出记录范围，无法积分 E24")
+    for name in layout.dtype.names:
+        if name == layout.time_field:
+            continue
+        if name.startswith("P"):
+            if log.covers(start_h):
+                print(f"  {name} 积分 E24：{log.integrate_power_kWh(name, start_h):.3f} kWh")
+        else:
+            corrected = calibration is not None and name in calibration.channels
+            print(f"  {name} 平均：{log.mean(name, start_h, calibration=calibration):.3f}"
+                  + ("（已校正）" if corrected else ""))
+    print("=" * 70)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HCD3 统一命令行入口
+各功能以子命令提供，共用选项与机器可读输出（脚本不必解析 print_report 的文字）：
+  evaluate  评估一台（4 个数值为温热型，6 个为冰温热型）
+  batch     评估 CSV / .npz 整份数据（含输入检核，错误行标示原因代码）
+  table     各容量的分级门槛表
+  sweep     设计空间扫描（见 HCD3_EnergyLevel_Cal_Sweep）
+  serve     本机 HTTP 计算服务（--db 时含后台任务）
+  bench     基准：micro 单次计算；startup 各入口启动时间（超出预算时结束码为 1）；
+            throughput 吞吐量与基准档比较（效能回归时结束码为 1）
+
+共用选项：
+  --format csv|json|parquet  输出格式（json 为记录清单；parquet 需安装 pyarrow 且须指定 --out）
+  --out 文件                 输出至文件（默认 stdout）
+  --jobs N                   并行数（batch：进程数；serve：后台任务工作线程数）
+  --quiet                    不输出进度等说明文字（说明文字一律写到 stderr）
+  --standard 版本id          指定基准版本（默认为登记表中今天有效的版本）
+  --date YYYY-MM-DD          改用该日有效的基准版本
+
+使用方法：
+  python HCD3_EnergyLevel_Cal_CLI.py evaluate 1.152 87 25 1.4
+  python HCD3_EnergyLevel_Cal_CLI.py batch input.csv --format csv --out output.csv --jobs 4
+  python HCD3_EnergyLevel_Cal_CLI.py table --kind cold-hot --volumes 2,4,6,8
+  python HCD3_EnergyLevel_Cal_CLI.py sweep hot-warm 输出目录 E24_kWh=0.2:2:100 T_hot24_C=87 T_amb_C=25 V_marked_L=0.5:10:50
+  python HCD3_EnergyLevel_Cal_CLI.py serve --port 8765 [--db hcd3_jobs.sqlite --jobs 2]
+  python HCD3_EnergyLevel_Cal_CLI.py bench --n 20000
+  python HCD3_EnergyLevel_Cal_CLI.py bench startup [--budget 预算.json]
+  python HCD3_EnergyLevel_Cal_CLI.py bench throughput [--rows 1000,100000] [--tolerance 15] [--save]
+"""
+
+import argparse
+import math
+import sys
+from typing import Dict, List, Optional, Sequence
+
+from HCD3_EnergyLevel_Cal_Core import (
+    HotWarmDispenserInput, ColdHotDispenserInput, HOT_WARM_FIELDS, COLD_HOT_FIELDS,
+    evaluate_fused, evaluate_cold_hot_fused, standard, use_standard, validate_columns, validate_record,
+)
+
+# 启动时间：只载入 evaluate 路径所需模块；NumPy、csv、json、pyarrow 及各工具模块
+# 于用到的子命令或输出格式内才载入（预算见 HCD3_EnergyLevel_Startup_Budget.json）
+
+FORMATS = ("csv", "json", "parquet")
+BATCH_CHUNK_ROWS = 1 << 18
+
+EXIT_OK, EXIT_INPUT, EXIT_USAGE = 0, 1, 2
+
+class CLIError(Exception):
+    """
+    以讯息与结束码结束命令的错误
+    """
+
+    def __init__(self, message: str, code: int = EXIT_INPUT):
+        super().__init__(message)
+        self.code = code
+
+# --- 输出 ---
+
+def flatten_result(result: dict) -> Dict[str, object]:
+    """
+    结果字典摊平为单层记录（limits_kWh → limit_1_kWh … limit_5_kWh），便于 CSV / Parquet
+    """
+    row = {k: v for k, v in result.items() if k != "limits_kWh"}
+    for g, v in result["limits_kWh"].items():
+        row[f"limit_{g}_kWh"] = v
+    return row
+
+def _columns_of(rows: List[Dict]) -> List[str]:
+    names: Dict[str, None] = {}
+    for row in rows:
+        names.update(dict.fromkeys(row))
+    return list(names)
+
+def _typed(value):
+    # nan / inf（无法解析的输入）输出为 null / 空栏，JSON 保持合法
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+def emit(rows: List[Dict], fmt: str = "json", out: Optional[str] = None):
+    """
+    以指定格式写出记录清单（out 为 None 时写到 stdout）
+    """
+    rows = [{k: _typed(v) for k, v in row.items()} for row in rows]
+    if fmt == "parquet":
+        if not out:
+            raise CLIError("parquet 格式须以 --out 指定输出文件", EXIT_USAGE)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise CLIError("parquet 格式需要 pyarrow（pip install pyarrow）", EXIT_USAGE)
+        pq.write_table(pa.Table.from_pylist(rows), out)
+        return
+
+    f = open(out, 'w', encoding='utf-8-sig' if fmt == "csv" else 'utf-8', newline='') if out else sys.stdout
+    try:
+        if fmt == "csv":
+            import csv
+            writer = csv.DictWriter(f, fieldnames=_columns_of(rows), lineterminator="\n")
+            writer.writeheader()
+            writer.writerows({k: ("" if v is None else v) for k, v in row.items()} for row in rows)
+        else:
+            import json
+            json.dump(rows, f, ensure_ascii=False)
+            f.write("\n")
+    finally:
+        if out:
+            f.close()
+
+def _say(args, message: str):
+    if not args.quiet:
+        print(message, file=sys.stderr)
+
+# --- evaluate ---
+
+def cmd_evaluate(args) -> List[Dict]:
+    if len(args.values) not in (4, 6):
+        raise CLIError("evaluate 需要 4 个数值（温热型）或 6 个数值（冰温热型）", EXIT_USAGE)
+    fields = HOT_WARM_FIELDS if len(args.values) == 4 else COLD_HOT_FIELDS
+    errors = validate_record(dict(zip(fields, args.values)))
+    if errors:
+        reasons = ", ".join(f"{f}:{c}" for f, c in errors)
+        raise CLIError(f"输入检核不通过：{reasons}")
+    if len(args.values) == 4:
+        result = evaluate_fused(HotWarmDispenserInput(*args.values))
+    else:
+        result = evaluate_cold_hot_fused(ColdHotDispenserInput(*args.values))
+    return [flatten_result(result)]
+
+# --- batch ---
+
+def _evaluate_chunk(task) -> Dict[str, list]:
+    # 进程池工作函数：一块列资料 → 各字段的 Python 清单
+    import numpy as np
+    import HCD3_EnergyLevel_Cal_Vector as vec
+    kind, columns, version_id = task
+    if standard(kind).version.id != version_id:
+        use_standard(version_id)        # 以 spawn 启动的工作进程不继承主进程选用的版本
+    result = vec.evaluate_any(kind, columns)
+    n = len(columns[vec.fields_of(kind)[0]])
+    out = {}
+    for k, v in result.items():
+        if k == "limits_kWh":
+            for g, arr in v.items():
+                out[f"limit_{g}_kWh"] = np.broadcast_to(arr, (n,)).tolist()
+        else:
+            out[k] = np.broadcast_to(v, (n,)).tolist()
+    return out
+
+def evaluate_file(filename: str, jobs: int = 1, chunk_rows: int = BATCH_CHUNK_ROWS) -> List[Dict]:
+    """
+    评估整份数据：回传逐台记录（序号、型号、输入、结果字段、error 为原因代码或 None）
+    """
+    import numpy as np
+    import HCD3_EnergyLevel_Cal_Vector as vec
+    kind, columns, labels = vec.read_columns(filename)
+    names = vec.fields_of(kind)
+    report = validate_columns(columns)
+    errors: Dict[int, List[str]] = {}
+    for r, f, c in zip(report["row"].tolist(), report["field"].tolist(), report["reason"].tolist()):
+        errors.setdefault(r, []).append(f"{f}:{c}")
+    index = np.flatnonzero(report["valid"])
+    version_id = standard(kind).version.id
+    tasks = [(kind, {k: columns[k][index[s:s + chunk_rows]] for k in names}, version_id)
+             for s in range(0, index.size, chunk_rows)]
+    if jobs > 1 and len(tasks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            parts = list(pool.map(_evaluate_chunk, tasks))
+    else:
+        parts = [_evaluate_chunk(t) for t in tasks]
+
+    inputs = {k: columns[k].tolist() for k in names}
+    results: Dict[str, list] = {}
+    for part in parts:
+        for k, v in part.items():
+            results.setdefault(k, []).extend(v)
+    rows: List[Dict] = []
+    j = 0
+    for i, ok in enumerate(report["valid"].tolist()):
+        row = {"序号": i + 1, "型号": labels[i] if i < len(labels) else f"测试{i + 1}"}
+        row.update({k: inputs[k][i] for k in names})
+        if ok:
+            row.update({k: v[j] for k, v in results.items()})
+            j += 1
+            row["grade"] = None if row["grade"] == vec.FAIL else row["grade"]
+            row["error"] = None
+        else:
+            row["grade"] = None
+            row["error"] = ";".join(errors.get(i, []))
+        rows.append(row)
+    return rows
+
+def cmd_batch(args) -> List[Dict]:
+    import os
+    if not os.path.exists(args.input):
+        raise CLIError(f"找不到输入文件：{args.input}")
+    rows = evaluate_file(args.input, args.jobs)
+    bad = sum(1 for r in rows if r["error"])
+    _say(args, f"✓ {len(rows)} 台，输入错误 {bad} 台")
+    return rows
+
+# --- table ---
+
+def cmd_table(args) -> List[Dict]:
+    from HCD3_EnergyLevel_Cal_Core import grade_thresholds_kWh, cold_hot_grade_thresholds
+    try:
+        volumes = [float(v) for v in args.volumes.split(",")]
+    except ValueError:
+        raise CLIError(f"容量格式错误：{args.volumes}", EXIT_USAGE)
+    rows = []
+    for V in volumes:
+        if args.kind == "cold-hot":
+            limits, key = cold_hot_grade_thresholds(V), "Veq_L"
+        else:
+            limits, key = grade_thresholds_kWh(V), "V_marked_L"
+        row = {key: V}
+        row.update({f"limit_{g}_kWh": round(v, 3) for g, v in limits.items()})
+        rows.append(row)
+    return rows
+
+# --- sweep ---
+
+def cmd_sweep(args) -> List[Dict]:
+    import HCD3_EnergyLevel_Cal_Sweep as sweep
+    import HCD3_EnergyLevel_Cal_Vector as vec
+    kind = vec.COLD_HOT if args.kind == "cold-hot" else vec.HOT_WARM
+    axes = {}
+    for item in args.axes:
+        if "=" not in item:
+            raise CLIError(f"扫描轴格式应为 字段=取值：{item}", EXIT_USAGE)
+        name, spec = item.split("=", 1)
+        try:
+            axes[name.strip()] = sweep.parse_range(spec)
+        except ValueError as e:
+            raise CLIError(f"取值格式错误：{item}（{e}）", EXIT_USAGE)
+    try:
+        meta = sweep.sweep(kind, axes, args.out_dir)
+    except (KeyError, ValueError) as e:
+        raise CLIError(str(e))
+    _say(args, f"✓ 结果已保存至：{args.out_dir}")
+    return [{"grade": label, "count": count} for label, count in meta["grade_counts"].items()]
+
+# --- serve ---
+
+def cmd_serve(args) -> None:
+    from HCD3_EnergyLevel_Cal_Server import make_server
+    server = make_server(args.host, args.port)
+    manager = store = None
+    if args.db:
+        from HCD3_EnergyLevel_Cal_Jobs import JobManager, JobStore, install
+        store = JobStore(args.db)
+        manager = JobManager(store, workers=max(args.jobs, 1))
+        install(server, manager)
+    host, port = server.server_address[:2]
+    _say(args, f"HCD3 计算服务：http://{host}:{port}" + (f"（后台任务：{args.db}）" if args.db else ""))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        _say(args, "✓ 服务已停止")
+    finally:
+        server.server_close()
+        if manager is not None:
+            manager.shutdown()
+            store.close()
+    return None
+
+# --- bench ---
+
+def cmd_bench(args) -> List[Dict]:
+    import HCD3_EnergyLevel_Cal_Bench as bench
+    if args.suite == "micro":
+        return bench.micro(args.n, args.repeat, args.seed)
+    if args.suite == "throughput":
+        return _bench_throughput(args, bench)
+    rows = bench.startup(args.budget or bench.STARTUP_BUDGET_FILE, args.repeat)
+    emit(rows, args.format, args.out)
+    over = [r["入口"] for r in rows if not r["通过"]]
+    if over:
+        raise CLIError(f"超出启动时间预算：{', '.join(over)}")
+    _say(args, "✓ 全部在启动时间预算内")
+    return None
+
+def _bench_throughput(args, bench) -> None:
+    try:
+        sizes = [int(r) for r in args.rows.split(",") if r]
+    except ValueError:
+        raise CLIError(f"行数格式错误：{args.rows}", EXIT_USAGE)
+    baseline_file = args.baseline or bench.BASELINE_FILE
+    result = bench.throughput(sizes, args.repeat, args.n, args.seed)
+    if args.save:
+        bench.save_baseline(result, baseline_file, args.tolerance or bench.DEFAULT_TOLERANCE_PCT)
+        _say(args, f"✓ 基准已保存至：{baseline_file}")
+        emit([{"项目": k, "每秒": round(v, 1)} for k, v in result.items()], args.format, args.out)
+        return None
+    import os
+    if not os.path.exists(baseline_file):
+        raise CLIError(f"找不到基准档：{baseline_file}（以 --save 建立）")
+    baseline = bench.load_baseline(baseline_file)
+    tolerance = args.tolerance or baseline.get("tolerance_pct", bench.DEFAULT_TOLERANCE_PCT)
+    rows = bench.compare_throughput(result, baseline["results"], tolerance)
+    emit(rows, args.format, args.out)
+    slower = [r["项目"] for r in rows if r["回归"]]
+    if slower:
+        raise CLIError(f"效能回归（慢于基准超过 {tolerance:g}%）：{', '.join(slower)}")
+    _say(args, "✓ 无效能回归")
+    return None
+
+# --- 参数解析 ---
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--format", choices=FORMATS, default=None, help="输出格式（默认 json；batch 默认 csv）")
+    common.add_argument("--out", default=None, help="输出文件（默认 stdout）")
+    common.add_argument("--jobs", type=int, default=1, help="并行数")
+    common.add_argument("--quiet", action="store_true", help="不输出说明文字")
+    common.add_argument("--standard", default=None, help="基准版本 id（默认今天有效的版本）")
+    common.add_argument("--date", default=None, help="改用该日（YYYY-MM-DD）有效的基准版本")
+
+    parser = argparse.ArgumentParser(prog="HCD3_EnergyLevel_Cal_CLI.py", description="HCD3 饮水机能效计算")
+    sub = parser.add_subparsers(dest="command", metavar="子命令")
+    sub.required = True
+
+    p = sub.add_parser("evaluate", parents=[common], help="评估一台")
+    p.add_argument("values", nargs="+", type=float, help="E24 T_hot T_amb V 或 E24 T_hot T_cold T_amb V1 V2")
+    p.set_defaults(func=cmd_evaluate)
+
+    p = sub.add_parser("batch", parents=[common], help="评估整份数据")
+    p.add_argument("input", help="CSV 或 .npz")
+    p.set_defaults(func=cmd_batch, default_format="csv")
+
+    p = sub.add_parser("table", parents=[common], help="分级门槛表")
+    p.add_argument("--kind", choices=("hot-warm", "cold-hot"), default="hot-warm")
+    p.add_argument("--volumes", default="1,1.5,2,3,5,8,10", help="容量（逗号分隔，L）")
+    p.set_defaults(func=cmd_table)
+
+    p = sub.add_parser("sweep", parents=[common], help="设计空间扫描")
+    p.add_argument("kind", choices=("hot-warm", "cold-hot"))
+    p.add_argument("out_dir")
+    p.add_argument("axes", nargs="+", help="字段=起:止:点数 | a,b,c | a")
+    p.set_defaults(func=cmd_sweep)
+
+    p = sub.add_parser("serve", parents=[common], help="本机 HTTP 计算服务")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--db", default=None, help="后台任务 SQLite 文件（指定时启用 /jobs）")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("bench", parents=[common],
+                       help="基准（micro：单次计算；startup：启动时间预算；throughput：吞吐量与基准比较）")
+    p.add_argument("suite", nargs="?", choices=("micro", "startup", "throughput"), default="micro")
+    p.add_argument("--budget", default=None, help="启动时间预算 JSON（默认 HCD3_EnergyLevel_Startup_Budget.json）")
+    p.add_argument("--rows", default="1000,100000", help="throughput 批量流程行数（逗号分隔）")
+    p.add_argument("--baseline", default=None, help="吞吐量基准 JSON（默认 HCD3_EnergyLevel_Bench_Baseline.json）")
+    p.add_argument("--tolerance", type=float, default=None, help="容许变慢百分比（默认取基准档设定）")
+    p.add_argument("--save", action="store_true", help="以本次吞吐量覆写基准档")
+    p.add_argument("--n", type=int, default=20000)
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=cmd_bench)
+    return parser
+
+def _use_standard(args):
+    from datetime import date
+    try:
+        use_standard(args.standard, date.fromisoformat(args.date) if args.date else None)
+    except (KeyError, ValueError) as e:
+        raise CLIError(f"无法选用基准版本：{e.args[0] if e.args else e}")
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    args.format = args.format or getattr(args, "default_format", "json")
+    try:
+        if args.standard or args.date:
+            _use_standard(args)
+        rows = args.func(args)
+        if rows is not None:
+            emit(rows, args.format, args.out)
+            if args.out:
+                _say(args, f"✓ 结果已保存至：{args.out}")
+    except CLIError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return e.code
+    except KeyError:
+        raise
+    except LookupError as e:
+        # 所选日期没有该机型的有效基准版本
+        print(f"❌ {e}", file=sys.stderr)
+        return EXIT_INPUT
+    return EXIT_OK
+
+if __name__ == "__main__":
+    sys.exit(main())
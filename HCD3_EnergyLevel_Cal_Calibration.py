@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HCD3 热电偶校正登录表
+依各感温器校正证书（参考温度 vs 指示温度）对记录器温度做分段线性校正，
+须在求 T_hot_C / T_cold_C / T_amb_C 平均值之前套用。
+
+校正证书 CSV 格式（可多支感温器合并一个文件）：
+  serial,indicated_C,reference_C
+通道对应 CSV 格式：
+  channel,serial
+"""
+
+import csv
+from typing import Dict, Iterable, Mapping, Tuple
+
+import numpy as np
+
+class SensorCalibration:
+    """
+    单支感温器的预先计算插值表。
+    区间内以 np.interp 分段线性插值；超出证书范围时沿端点区段斜率外插。
+    """
+
+    def __init__(self, serial: str, points: Iterable[Tuple[float, float]]):
+        pts = sorted((float(i), float(r)) for i, r in points)
+        if not pts:
+            raise ValueError(f"感温器 {serial} 没有校正点")
+        indicated = np.array([p[0] for p in pts])
+        if np.any(np.diff(indicated) == 0):
+            raise ValueError(f"感温器 {serial} 的指示温度有重复校正点")
+        self.serial = serial
+        self.indicated = indicated
+        self.reference = np.array([p[1] for p in pts])
+        if len(pts) == 1:
+            # 单点证书：整段平移
+            self.slope_lo = self.slope_hi = 1.0
+        else:
+            self.slope_lo = (self.reference[1] - self.reference[0]) / (indicated[1] - indicated[0])
+            self.slope_hi = (self.reference[-1] - self.reference[-2]) / (indicated[-1] - indicated[-2])
+
+    def apply(self, samples) -> np.ndarray:
+        """
+        校正整个样本阵列，回传新阵列（float64）
+        """
+        x = np.asarray(samples, dtype=float)
+        y = np.interp(x, self.indicated, self.reference)
+        lo, hi = self.indicated[0], self.indicated[-1]
+        below = x < lo
+        if below.any():
+            y[below] = self.reference[0] + (x[below] - lo) * self.slope_lo
+        above = x > hi
+        if above.any():
+            y[above] = self.reference[-1] + (x[above] - hi) * self.slope_hi
+        return y
+
+class CalibrationRegistry:
+    """
+    以感温器序号为键的校正登录表；插值表于登录时建立一次并快取。
+    """
+
+    def __init__(self):
+        self._sensors: Dict[str, SensorCalibration] = {}
+        self.channels: Dict[str, str] = {}   # 通道名称 → 感温器序号
+
+    def register(self, serial: str, points: Iterable[Tuple[float, float]]):
+        self._sensors[serial] = SensorCalibration(serial, points)
+
+    def assign(self, channel: str, serial: str):
+        self.channels[channel] = serial
+
+    def __contains__(self, serial: str) -> bool:
+        return serial in self._sensors
+
+    def get(self, serial: str) -> SensorCalibration:
+        try:
+            return self._sensors[serial]
+        except KeyError:
+            raise KeyError(f"找不到感温器 {serial} 的校正证书") from None
+
+    def correct(self, serial: str, samples) -> np.ndarray:
+        return self.get(serial).apply(samples)
+
+    def correct_channels(self, data: Mapping[str, Iterable[float]]) -> Dict[str, np.ndarray]:
+        """
+        校正多通道记录；未指定感温器的通道原样转为阵列
+        """
+        out = {}
+        for channel, samples in data.items():
+            serial = self.channels.get(channel)
+            if serial is None:
+                out[channel] = np.asarray(samples, dtype=float)
+            else:
+                out[channel] = self.correct(serial, samples)
+        return out
+
+    def corrected_means(self, data: Mapping[str, Iterable[float]]) -> Dict[str, float]:
+        """
+        先校正再取平均，供 T_hot_C / T_cold_C / T_amb_C 等输入使用
+        """
+        return {ch: float(v.mean()) for ch, v in self.correct_channels(data).items()}
+
+    # --- 文件读写 ---
+
+    @classmethod
+    def from_csv(cls, certificate_file: str, channel_file: str = None) -> "CalibrationRegistry":
+        registry = cls()
+        registry.load_certificates(certificate_file)
+        if channel_file:
+            registry.load_channels(channel_file)
+        return registry
+
+    def load_certificates(self, filename: str):
+        points: Dict[str, list] = {}
+        with open(filename, 'r', encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f):
+                points.setdefault(row['serial'].strip(), []).append(
+                    (row['indicated_C'], row['reference_C']))
+        for serial, pts in points.items():
+            self.register(serial, pts)
+
+    def load_channels(self, filename: str):
+        with open(filename, 'r', encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f):
+                self.assign(row['channel'].strip(), row['serial'].strip())
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HCD3 引擎一致性差分测试
+以固定种子产生大量随机与刁钻输入，交给每个可用的评估引擎，与参考实现
+（Core.evaluate / evaluate_cold_hot）逐字段比对，数值须逐位元相同（NaN 视为相同，±0 视为不同）：
+  fused           Core.evaluate_fused / evaluate_cold_hot_fused（即适用基准版本的 Kernel.evaluate）
+  vector          Vector.evaluate_columns / evaluate_cold_hot_columns（即 Kernel.evaluate_columns）
+  daemon          常驻计算进程（--daemon 且可连线时）
+参考实现与各引擎皆依 Core.standard() 的适用基准版本计算。
+比对字段为参考结果的全部字段（K / K1 / K2、E_st,24、各级上限、等级、合格判定、餘裕量等）。
+定点整数版本（FixedPoint）依法规四舍五入，刻意与浮点版本不同，不列入；其差异以 FixedPoint 自身比对。
+
+输入类别（各占一部分）：
+  random     合理范围内的随机值，小数位数 0–4 随机
+  tie        E_st,24、K / K1 / K2、V 恰落在 x.xxx5（及前后 1 ulp）的舍入平手点
+  boundary   E24 恰为各级上限（及前后 1 ulp）、Veq 恰在分段边界
+  tiny       极小分母：周围温度接近 100 °C / 0 °C、热水温度接近周围温度
+参考实现拋出例外（如分母恰为 0）的输入不比对，只计数。
+各块以 (种子, 块序) 产生，于进程池并行；每个（机型, 引擎, 字段）的第一个不一致输入会缩减为最少位数的最小重现案例。
+
+使用方法：
+  python HCD3_EnergyLevel_Cal_Conformance.py [--n 1000000] [--seed 0] [--jobs 4] [--daemon [socket]] [--out 不一致.json]
+"""
+
+import math
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from HCD3_EnergyLevel_Cal_Core import (
+    HotWarmDispenserInput, ColdHotDispenserInput, HOT_WARM_FIELDS, COLD_HOT_FIELDS,
+    evaluate, evaluate_cold_hot, evaluate_fused, evaluate_cold_hot_fused,
+    max_E24_for_grade, max_E24_for_cold_hot_grade, standard, validate_record,
+)
+import HCD3_EnergyLevel_Cal_Vector as vec
+
+BLOCK_ROWS = 20000
+MAX_CASES_PER_BLOCK = 20        # 每块每个（引擎, 字段）最多回传的不一致输入
+CATEGORIES = ("random", "tie", "boundary", "tiny")
+
+KIND_FIELDS = {vec.HOT_WARM: HOT_WARM_FIELDS, vec.COLD_HOT: COLD_HOT_FIELDS}
+KIND_INPUT = {vec.HOT_WARM: HotWarmDispenserInput, vec.COLD_HOT: ColdHotDispenserInput}
+REFERENCE = {vec.HOT_WARM: evaluate, vec.COLD_HOT: evaluate_cold_hot}
+
+# --- 引擎：输入清单 → ({字段: float64 阵列}, 例外遮罩) ---
+#
+# 各级上限摊平为 limit_1_kWh … limit_5_kWh；等级不合格（None / FAIL）为 0，bool 为 0 / 1；
+# 拋出例外的列数值为 NaN、遮罩为 True。比对以 float64 的位元样式进行。
+
+def _flatten(result: dict) -> Dict[str, object]:
+    out = {k: v for k, v in result.items() if k != "limits_kWh"}
+    for g, v in result["limits_kWh"].items():
+        out[f"limit_{g}_kWh"] = v
+    return out
+
+def _to_arrays(results: List[Optional[dict]]) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    error = np.array([r is None for r in results], dtype=bool)
+    flat = [_flatten(r) if r is not None else None for r in results]
+    keys = next((list(f) for f in flat if f is not None), [])
+    arrays = {}
+    for k in keys:
+        # 只把 None（不合格等级）换成 0；不可写成 `v or 0`，会把 -0.0 变成 +0
+        arrays[k] = np.array([math.nan if f is None else (0 if f[k] is None else f[k]) for f in flat], dtype=float)
+    return arrays, error
+
+def _scalar_engine(fn: Callable) -> Callable:
+    def run(kind: str, inputs: List):
+        results = []
+        for x in inputs:
+            try:
+                results.append(fn(x))
+            except Exception:
+                results.append(None)
+        return _to_arrays(results)
+    return run
+
+def _columns_engine(fn: Callable) -> Callable:
+    def run(kind: str, inputs: List):
+        fields = KIND_FIELDS[kind]
+        n = len(inputs)
+        with np.errstate(all='ignore'):
+            result = fn(*(np.array([getattr(x, k) for x in inputs], dtype=float) for k in fields))
+        arrays = {k: np.broadcast_to(np.asarray(v, dtype=float), (n,))
+                  for k, v in _flatten(result).items()}
+        return arrays, np.zeros(n, dtype=bool)
+    return run
+
+def _daemon_engine(path: Optional[str]) -> Callable:
+    def run(kind: str, inputs: List):
+        from HCD3_EnergyLevel_Cal_Daemon import evaluate_rows
+        rows = [[getattr(x, k) for k in KIND_FIELDS[kind]] for x in inputs]
+        # 常驻进程拒绝检核不通过的输入（回传 None），视同例外
+        results, _ = evaluate_rows(kind, rows, path, fallback=False)
+        return _to_arrays(results)
+    return run
+
+def engines(daemon: Optional[str] = None, use_daemon: bool = False) -> Dict[str, Dict[str, Callable]]:
+    """
+    各机型可用的引擎：{机型: {引擎名: run(kind, inputs) → ({字段: 阵列}, 例外遮罩)}}
+    """
+    table = {
+        vec.HOT_WARM: {
+            "fused": _scalar_engine(evaluate_fused),
+            "vector": _columns_engine(vec.evaluate_columns),
+        },
+        vec.COLD_HOT: {
+            "fused": _scalar_engine(evaluate_cold_hot_fused),
+            "vector": _columns_engine(vec.evaluate_cold_hot_columns),
+        },
+    }
+    if use_daemon:
+        for kind in table:
+            table[kind]["daemon"] = _daemon_engine(daemon)
+    return table
+
+def reference(kind: str, inputs: List):
+    return _scalar_engine(REFERENCE[kind])(kind, inputs)
+
+# --- 比对 ---
+
+def same_bits(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    逐元素逐位元相同：NaN 与 NaN 相同，0.0 与 -0.0 不同
+    """
+    a = np.ascontiguousarray(a, dtype=np.float64)
+    b = np.ascontiguousarray(b, dtype=np.float64)
+    return (a.view(np.int64) == b.view(np.int64)) | (np.isnan(a) & np.isnan(b))
+
+def compare(ref: Tuple[Dict[str, np.ndarray], np.ndarray], got: Tuple[Dict[str, np.ndarray], np.ndarray]
+            ) -> Dict[str, np.ndarray]:
+    """
+    参考实现可算的列中，各字段不一致的列索引：{字段: 索引阵列}；引擎拋出例外的列归入 "error"
+    """
+    (ref_values, ref_error), (values, error) = ref, got
+    checked = ~ref_error
+    out = {}
+    rows = np.flatnonzero(checked & error)
+    if rows.size:
+        out["error"] = rows
+    for k, a in ref_values.items():
+        if k not in values:
+            raise KeyError(f"引擎结果缺少字段 {k}")
+        rows = np.flatnonzero(checked & ~error & ~same_bits(a, values[k]))
+        if rows.size:
+            out[k] = rows
+    return out
+
+# --- 输入产生 ---
+
+def _decimals(rng: np.random.Generator, values: np.ndarray) -> np.ndarray:
+    # 随机取 0–4 位小数（以十进制文字读回，模拟人工输入）
+    digits = rng.integers(0, 5, values.size)
+    return np.array([float(f"{v:.{d}f}") for v, d in zip(values.tolist(), digits.tolist())])
+
+def _nudge(rng: np.random.Generator, values: np.ndarray) -> np.ndarray:
+    # 三分之一保持、其余往下 / 往上 1 ulp
+    step = rng.integers(-1, 2, values.size)
+    return np.where(step < 0, np.nextafter(values, -np.inf), np.where(step > 0, np.nextafter(values, np.inf), values))
+
+def _base(rng: np.random.Generator, kind: str, n: int) -> Dict[str, np.ndarray]:
+    if kind == vec.HOT_WARM:
+        cols = {"E24_kWh": rng.uniform(0.05, 3.0, n), "T_hot24_C": rng.uniform(60, 99, n),
+                "T_amb_C": rng.uniform(5, 40, n), "V_marked_L": rng.uniform(0.3, 20, n)}
+    else:
+        cols = {"E24_kWh": rng.uniform(0.05, 3.0, n), "T_hot_C": rng.uniform(70, 99, n),
+                "T_cold_C": rng.uniform(1, 14, n), "T_amb_C": rng.uniform(15, 40, n),
+                "V_hot_L": rng.uniform(0.3, 12, n), "V_cold_L": rng.uniform(0.3, 24, n)}
+    return {k: _decimals(rng, v) for k, v in cols.items()}
+
+def _ties(rng: np.random.Generator, kind: str, cols: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    n = cols["E24_kWh"].size
+    hot = "T_hot24_C" if kind == vec.HOT_WARM else "T_hot_C"
+    Ta = cols["T_amb_C"]
+    which = rng.integers(0, 3, n)
+    # K（或 K1）= (m + 0.5) / 1000：由 K 反推热水温度
+    K = (rng.integers(200, 900, n) + 0.5) / 1000
+    cols[hot] = np.where(which == 0, _nudge(rng, Ta + K * (100.0 - Ta)), cols[hot])
+    # V = x.x5（第 2 位恰为 5）
+    V_keys = ("V_marked_L",) if kind == vec.HOT_WARM else ("V_hot_L", "V_cold_L")
+    for k in V_keys:
+        cols[k] = np.where(which == 1, _nudge(rng, (rng.integers(3, 200, n) + 0.5) / 10), cols[k])
+    if kind == vec.HOT_WARM:
+        # E24 / K = (m + 0.5) / 1000
+        K = (cols[hot] - Ta) / (100.0 - Ta)
+        cols["E24_kWh"] = np.where(which == 2, _nudge(rng, K * (rng.integers(100, 3000, n) + 0.5) / 1000),
+                                   cols["E24_kWh"])
+    else:
+        # K2 = (Ta - Tc) / Ta = (m + 0.5) / 1000
+        K2 = (rng.integers(200, 950, n) + 0.5) / 1000
+        cols["T_cold_C"] = np.where(which == 2, _nudge(rng, Ta - K2 * Ta), cols["T_cold_C"])
+    return cols
+
+def _boundaries(rng: np.random.Generator, kind: str, cols: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    n = cols["E24_kWh"].size
+    grade = rng.integers(1, 6, n)
+    if kind == vec.HOT_WARM:
+        limits = {g: max_E24_for_grade(g, cols["T_hot24_C"], cols["T_amb_C"], cols["V_marked_L"])
+                  for g in (1, 2, 3, 4, 5)}
+    else:
+        # 一半的列令 Veq 恰在分段边界：V1 = (边界 - V2 × K2 / 3) / K1
+        bounds = [seg.upper_L for seg in standard(vec.COLD_HOT).version.segments[:-1]]
+        if bounds:
+            bound = np.asarray(bounds, dtype=float)[rng.integers(0, len(bounds), n)]
+            K1 = vec.calc_K1(cols["T_hot_C"], cols["T_amb_C"])
+            K2 = vec.calc_K2(cols["T_cold_C"], cols["T_amb_C"])
+            V1 = (bound - vec.round_to(vec.COLD_HOT, "V", cols["V_cold_L"]) * K2 / 3) / K1
+            cols["V_hot_L"] = np.where((rng.random(n) < 0.5) & (V1 > 0), _nudge(rng, V1), cols["V_hot_L"])
+        args = tuple(cols[k] for k in COLD_HOT_FIELDS[1:])
+        limits = {g: np.asarray(max_E24_for_cold_hot_grade(g, *args), dtype=float) for g in (1, 2, 3, 4, 5)}
+    E = np.choose(grade - 1, [limits[g] for g in (1, 2, 3, 4, 5)])
+    cols["E24_kWh"] = np.where(np.isfinite(E), _nudge(rng, E), cols["E24_kWh"])
+    return cols
+
+def _tiny(rng: np.random.Generator, kind: str, cols: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    n = cols["E24_kWh"].size
+    hot = "T_hot24_C" if kind == vec.HOT_WARM else "T_hot_C"
+    eps = 10.0 ** -rng.integers(3, 13, n).astype(float)
+    which = rng.integers(0, 3, n)
+    # 周围温度接近 100 °C（K / K1 分母）、接近 0 °C（K2 分母）、热水温度接近周围温度（K 分子）
+    cols["T_amb_C"] = np.where(which == 0, 100.0 - eps, np.where(which == 1, eps, cols["T_amb_C"]))
+    cols[hot] = np.where(which == 0, 100.0 + rng.uniform(-1, 1, n), cols[hot])
+    cols[hot] = np.where(which == 2, cols["T_amb_C"] + eps * rng.choice([-1.0, 1.0], n), cols[hot])
+    if kind == vec.COLD_HOT:
+        cols["T_cold_C"] = np.where(which == 1, -rng.uniform(0, 5, n), cols["T_cold_C"])
+    return cols
+
+def generate_block(kind: str, seed: int, block: int, n: int) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """
+    第 block 块的 n 笔输入（只依 种子 与 块序 决定）：回传 ({字段: 阵列}, 类别索引阵列)
+    """
+    rng = np.random.default_rng([seed, block, 0 if kind == vec.HOT_WARM else 1])
+    category = rng.integers(0, len(CATEGORIES), n)
+    cols = _base(rng, kind, n)
+    with np.errstate(all='ignore'):
+        for c, make in ((1, _ties), (2, _boundaries), (3, _tiny)):
+            mask = category == c
+            if mask.any():
+                part = make(rng, kind, {k: v[mask] for k, v in cols.items()})
+                for k in cols:
+                    cols[k][mask] = part[k]
+    return cols, category
+
+# --- 执行 ---
+
+def run_block(task) -> Dict:
+    """
+    进程池工作函数：task = (机型, 种子, 块序, 笔数, 常驻进程路径, 是否使用常驻进程)
+    回传 {"rows", "skipped", "mismatches": {(引擎, 字段): 数量}, "cases": [不一致案例]}
+    """
+    kind, seed, block, n, daemon, use_daemon = task
+    cols, category = generate_block(kind, seed, block, n)
+    build = KIND_INPUT[kind]
+    fields = KIND_FIELDS[kind]
+    inputs = [build(*row) for row in zip(*(cols[k].tolist() for k in fields))]
+    ref = reference(kind, inputs)
+
+    counts: Dict[Tuple[str, str], int] = {}
+    cases: List[Dict] = []
+    for name, run in engines(daemon, use_daemon)[kind].items():
+        for field, rows in compare(ref, run(kind, inputs)).items():
+            if name == "daemon" and field == "error":
+                # 检核不通过而被常驻进程拒绝是预期行为
+                rows = np.array([r for r in rows.tolist()
+                                 if not validate_record({k: cols[k][r] for k in fields})], dtype=np.intp)
+                if not rows.size:
+                    continue
+            counts[(name, field)] = int(rows.size)
+            for r in rows[:MAX_CASES_PER_BLOCK].tolist():
+                cases.append({"kind": kind, "engine": name, "field": field,
+                              "category": CATEGORIES[category[r]],
+                              "input": {k: float(cols[k][r]) for k in fields}})
+    return {"rows": n, "skipped": int(ref[1].sum()), "mismatches": counts, "cases": cases}
+
+def mismatching_fields(kind: str, engine: str, values: Dict[str, float], table=None) -> List[str]:
+    """
+    单一输入在指定引擎上与参考实现不一致的字段（参考实现拋出例外时回传空清单）
+    """
+    table = table or engines(use_daemon=engine == "daemon")
+    inputs = [KIND_INPUT[kind](**values)]
+    return list(compare(reference(kind, inputs), table[kind][engine](kind, inputs)))
+
+def shrink(case: Dict, table=None) -> Dict[str, float]:
+    """
+    缩减不一致输入：逐字段改用较少小数位数（0 位起），只要同一引擎同一字段仍不一致即保留，直到无法再缩减
+    """
+    table = table or engines(use_daemon=case["engine"] == "daemon")
+    values = dict(case["input"])
+
+    def still_fails(candidate):
+        return case["field"] in mismatching_fields(case["kind"], case["engine"], candidate, table)
+
+    changed = True
+    while changed:
+        changed = False
+        for k in KIND_FIELDS[case["kind"]]:
+            for digits in range(0, 18):
+                simpler = float(f"{values[k]:.{digits}f}")
+                if simpler == values[k]:
+                    break
+                candidate = dict(values, **{k: simpler})
+                if still_fails(candidate):
+                    values = candidate
+                    changed = True
+                    break
+    return values
+
+def reproducer(case: Dict, values: Dict[str, float]) -> str:
+    """
+    可直接执行的最小重现程序码（浮点数以 repr 写出，读回逐位元相同）
+    """
+    build = KIND_INPUT[case["kind"]].__name__
+    args = ", ".join(f"{k}={v!r}" for k, v in values.items())
+    return (f"from HCD3_EnergyLevel_Cal_Core import {build}\n"
+            f"from HCD3_EnergyLevel_Cal_Conformance import mismatching_fields\n"
+            f"print(mismatching_fields({case['kind']!r}, {case['engine']!r}, dict({args})))")
+
+def conformance(n: int = 1_000_000, seed: int = 0, jobs: int = 1, daemon: Optional[str] = None,
+                use_daemon: bool = False, block_rows: int = BLOCK_ROWS) -> Dict:
+    """
+    两种机型各 n 笔。回传 {"rows", "skipped", "engines", "mismatches": [{机型, 引擎, 字段, 数量}],
+    "cases": [{..., "minimal": 最小输入, "reproducer": 程序码}]}（每个机型/引擎/字段一例）
+    """
+    tasks = [(kind, seed, b, min(block_rows, n - s), daemon, use_daemon)
+             for kind in KIND_FIELDS for b, s in enumerate(range(0, n, block_rows))]
+    if jobs > 1 and len(tasks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            parts = list(pool.map(run_block, tasks))
+    else:
+        parts = [run_block(t) for t in tasks]
+
+    counts: Dict[Tuple[str, str, str], int] = {}
+    first: Dict[Tuple[str, str, str], Dict] = {}
+    for task, part in zip(tasks, parts):
+        for (engine, field), c in part["mismatches"].items():
+            counts[(task[0], engine, field)] = counts.get((task[0], engine, field), 0) + c
+        for case in part["cases"]:
+            first.setdefault((case["kind"], case["engine"], case["field"]), case)
+
+    table = engines(daemon, use_daemon)
+    cases = []
+    for key, case in first.items():
+        minimal = shrink(case, table)
+        cases.append(dict(case, minimal=minimal, reproducer=reproducer(case, minimal)))
+    return {
+        "rows": sum(p["rows"] for p in parts),
+        "skipped": sum(p["skipped"] for p in parts),
+        "engines": {kind: list(e) for kind, e in table.items()},
+        "mismatches": [{"kind": k, "engine": e, "field": f, "count": c} for (k, e, f), c in sorted(counts.items())],
+        "cases": cases,
+    }
+
+def main():
+    import json
+    import sys
+    import time
+
+    args = sys.argv[1:]
+    opts = {"--n": "1000000", "--seed": "0", "--jobs": "1", "--out": None}
+    use_daemon, daemon = False, None
+    i = 0
+    while i < len(args):
+        if args[i] == "--daemon":
+            use_daemon = True
+            if i + 1 < len(args) and not args[i + 1].startswith("--"):
+                daemon = args[i + 1]
+                i += 1
+            i += 1
+        elif args[i] in opts and i + 1 < len(args):
+            opts[args[i]] = args[i + 1]
+            i += 2
+        else:
+            print(__doc__)
+            return
+
+    if use_daemon:
+        from HCD3_EnergyLevel_Cal_Daemon import ping
+        if not ping(daemon):
+            print("❌ 无法连线至常驻进程（先执行 HCD3_EnergyLevel_Cal_Daemon.py serve）")
+            sys.exit(2)
+
+    n, jobs = int(float(opts["--n"])), int(opts["--jobs"])
+    print("=" * 70)
+    print(f"引擎一致性差分测试（每机型 {n:,} 笔，种子 {opts['--seed']}，{jobs} 进程）")
+    print("=" * 70)
+    t0 = time.perf_counter()
+    report = conformance(n, int(opts["--seed"]), jobs, daemon, use_daemon)
+    elapsed = time.perf_counter() - t0
+    for kind, names in report["engines"].items():
+        print(f"  {kind}：{', '.join(names)}")
+    print(f"  {report['rows']:,} 笔（参考实现例外而略过 {report['skipped']:,} 笔），"
+          f"耗时 {elapsed:.1f} s（{report['rows'] / max(elapsed, 1e-9):,.0f} 笔/秒）")
+    for m in report["mismatches"]:
+        print(f"  ❌ {m['kind']} / {m['engine']} / {m['field']}：{m['count']:,} 笔")
+    for case in report["cases"]:
+        print(f"\n  最小重现（{case['kind']} / {case['engine']} / {case['field']}，类别 {case['category']}）：")
+        print("    " + case["reproducer"].replace("\n", "\n    "))
+    if opts["--out"]:
+        with open(opts["--out"], 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, allow_nan=True)
+        print(f"\n✓ 报告已保存至：{opts['--out']}")
+    print("=" * 70)
+    if report["mismatches"]:
+        print("❌ 有引擎与参考实现不一致")
+        sys.exit(1)
+    print("✓ 所有引擎与参考实现逐位元一致")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Literal, Optional, Dict
+from typing import Literal, Optional, Dict, List, Tuple, Union
 
 Grade = Literal[1, 2, 3, 4, 5]
 
@@ -21,6 +21,75 @@ class ColdHotDispenserInput:
     V_hot_L: float          # 熱水貯水桶容量標示值 V1 (L)
     V_cold_L: float         # 冰水貯水桶容量標示值 V2 (L)
 
+# --- 分級係數：上限線 = a × V + b（kWh）---
+#
+# 以下為內建版本，僅於找不到基準版本登記表（HCD3_EnergyLevel_Standards.json）時使用；
+# 實際計算的係數、分段與捨入位數一律取自 standard(機型)，法規修訂只需更新登記表。
+
+HOT_WARM_GRADE_COEFFS: Dict[Grade, Tuple[float, float]] = {
+    1: (0.032, 0.450),
+    2: (0.037, 0.525),
+    3: (0.042, 0.600),
+    4: (0.048, 0.675),
+    5: (0.053, 0.750),  # 亦為 MEPS
+}
+
+COLD_HOT_GRADE_COEFFS: Dict[Grade, Tuple[float, float]] = {
+    1: (0.049, 0.243),
+    2: (0.057, 0.284),
+    3: (0.065, 0.324),
+    4: (0.073, 0.365),
+    5: (0.081, 0.405),  # 亦為容許基準
+}
+
+# 冰溫熱型依 Veq 分段：COLD_HOT_VEQ_BOUNDS[i] 為第 i 段上限（含），最後一段無上限。
+# 公告分級表適用 Veq ≤ 8L；大容量（Veq > 8L）係數於取得公告前沿用同一組。
+COLD_HOT_GRADE_COEFFS_LARGE: Dict[Grade, Tuple[float, float]] = dict(COLD_HOT_GRADE_COEFFS)
+
+COLD_HOT_VEQ_BOUNDS: Tuple[float, ...] = (8.0,)
+COLD_HOT_SEGMENT_COEFFS: Tuple[Dict[Grade, Tuple[float, float]], ...] = (
+    COLD_HOT_GRADE_COEFFS,          # Veq ≤ 8L
+    COLD_HOT_GRADE_COEFFS_LARGE,    # Veq > 8L
+)
+
+# --- 適用基準版本 ---
+#
+# 預設為登記表中今天有效的版本；use_standard() 可指定版本 id 或日期（批次、CLI、歷史重算）。
+# 首次計算時才載入登記表並編譯，匯入本模組不讀檔。
+
+HOT_WARM = "hot_warm"
+COLD_HOT = "cold_hot"
+
+_standards: Dict[str, object] = {}                 # 機型 → 使用中的 Standards.Kernel
+_standard_choice: Dict[str, object] = {"path": None, "on": None}
+
+def use_standard(version_id: Optional[str] = None, on=None, path: Optional[str] = None):
+    """
+    選用基準版本：
+      version_id - 該版本所屬機型改用此版本（另一機型依 on 選擇）
+      on         - datetime.date，選用該日有效的版本（預設今天）
+      path       - 登記表檔案（預設 HCD3_EnergyLevel_Standards.json）
+    皆未指定時回到預設。版本不存在拋出 KeyError，登記表格式錯誤拋出 ValueError。
+    """
+    from HCD3_EnergyLevel_Cal_Standards import load_registry
+    registry = load_registry(path)
+    chosen = registry.kernel(version_id) if version_id else None
+    _standards.clear()
+    _standard_choice.update(path=path, on=on)
+    if chosen is not None:
+        _standards[chosen.kind] = chosen
+
+def standard(kind: str):
+    """
+    機型目前適用的基準版本核心（Standards.Kernel）；.version 為版本內容
+    """
+    kernel = _standards.get(kind)
+    if kernel is None:
+        from HCD3_EnergyLevel_Cal_Standards import load_registry
+        registry = load_registry(_standard_choice["path"])
+        kernel = _standards[kind] = registry.kernel(kind=kind, on=_standard_choice["on"])
+    return kernel
+
 # --- 公式（依 CNS3910 與附表）---
 
 def temp_correction_factor(T_hot24_C: float, T_amb_C: float) -> float:
@@ -29,51 +98,57 @@ def temp_correction_factor(T_hot24_C: float, T_amb_C: float) -> float:
     """
     return (T_hot24_C - T_amb_C) / (100.0 - T_amb_C)
 
-def est24(E24_kWh: float, T_hot24_C: float, T_amb_C: float, rounding: int = 3) -> float:
+def est24(E24_kWh: float, T_hot24_C: float, T_amb_C: float, rounding: Optional[int] = None) -> float:
     """
     標準化每 24 小時備用損失 E_st,24 = E24 / K
-    依規定：E_st,24 實測值計算至小數第 3 位（第 4 位四捨五入）。
+    依規定：E_st,24 實測值計算至小數第 3 位（第 4 位四捨五入）；
+    rounding 未指定時依適用基準的位數。
     """
     K = temp_correction_factor(T_hot24_C, T_amb_C)
+    if rounding is None:
+        return standard(HOT_WARM).rounders["E_st24"](E24_kWh / K)
     return round(E24_kWh / K, rounding)
 
 def meps_limit_kWh(V_marked_L: float) -> float:
     """
     容許耗用能源基準（附表一）：
-    MEPS = 0.053 × V + 0.750  (kWh)
+    MEPS = 0.053 × V + 0.750  (kWh)，即適用基準的 5 級上限線
     V 為熱水系統貯水桶「標示容量」，計算至小數第 1 位（第 2 位四捨五入）
     """
-    V = round(V_marked_L, 1)
-    return 0.053 * V + 0.750
+    return grade_thresholds_kWh(V_marked_L)[5]
 
 def grade_thresholds_kWh(V_marked_L: float) -> Dict[Grade, float]:
     """
-    能源效率分級（附表五）之上限線（含）：
+    能源效率分級（附表五）之上限線（含），係數與 V 的捨入位數取自適用基準：
       1級: E_st,24 ≤ 0.032×V + 0.450
       2級: E_st,24 ≤ 0.037×V + 0.525
       3級: E_st,24 ≤ 0.042×V + 0.600
       4級: E_st,24 ≤ 0.048×V + 0.675
       5級: E_st,24 ≤ 0.053×V + 0.750  (同 MEPS)
     """
-    V = round(V_marked_L, 1)
-    return {
-        1: 0.032 * V + 0.450,
-        2: 0.037 * V + 0.525,
-        3: 0.042 * V + 0.600,
-        4: 0.048 * V + 0.675,
-        5: 0.053 * V + 0.750,  # 亦為 MEPS
-    }
+    return _grade_thresholds(standard(HOT_WARM), V_marked_L)
+
+def _grade_thresholds(kernel, V_marked_L: float) -> Dict[Grade, float]:
+    V = kernel.rounders["V"](V_marked_L)
+    return {g: a * V + b for g, (a, b) in kernel.coeffs(V).items()}
+
+def _first_grade(value: float, limits: Dict[Grade, float]) -> Optional[Grade]:
+    for g in (1, 2, 3, 4, 5):
+        if value <= limits[g]:
+            return g
+    return None  # 超過 5 級上限 → 不符合容許基準
 
 def classify_grade(est24_kWh: float, V_marked_L: float) -> Optional[Grade]:
     """
     根據 E_st,24 與分級門檻回傳 1–5 級；
     若 E_st,24 大於 5 級上限（亦即超過 MEPS），回傳 None 表示「不合格」。
     """
-    limits = grade_thresholds_kWh(V_marked_L)
-    for g in (1, 2, 3, 4, 5):
-        if est24_kWh <= limits[g]:
+    kernel = standard(HOT_WARM)
+    V = kernel.rounders["V"](V_marked_L)
+    for g, (a, b) in kernel.coeffs(V).items():      # 依等級順序逐級比較，不建上限 dict
+        if est24_kWh <= a * V + b:
             return g
-    return None  # 超過 5 級上限 → 不符合容許基準
+    return None
 
 # --- 綜合計算 ---
 
@@ -85,11 +160,12 @@ def evaluate(input: HotWarmDispenserInput) -> dict:
       - 各級上限值與 MEPS
       - 等級/是否合格
     """
+    kernel = standard(HOT_WARM)    # 每次評估只查一次適用基準，各步驟共用
     K = temp_correction_factor(input.T_hot24_C, input.T_amb_C)
-    Est24 = est24(input.E24_kWh, input.T_hot24_C, input.T_amb_C)
-    limits = grade_thresholds_kWh(input.V_marked_L)
-    meps = meps_limit_kWh(input.V_marked_L)
-    g = classify_grade(Est24, input.V_marked_L)
+    Est24 = kernel.rounders["E_st24"](input.E24_kWh / K)
+    limits = _grade_thresholds(kernel, input.V_marked_L)
+    meps = limits[5]
+    g = _first_grade(Est24, limits)
     return {
         "K": round(K, 6),
         "E_st24_kWh": Est24,
@@ -104,62 +180,58 @@ def evaluate(input: HotWarmDispenserInput) -> dict:
 def calc_K1(T_hot_C: float, T_amb_C: float) -> float:
     """
     熱水溫度校正係數 K1 = (Th - 周圍溫度) / (100 - 周圍溫度)
-    計算至小數第 3 位
+    計算至小數第 3 位（依適用基準）
     """
-    return round((T_hot_C - T_amb_C) / (100.0 - T_amb_C), 3)
+    return standard(COLD_HOT).rounders["K"]((T_hot_C - T_amb_C) / (100.0 - T_amb_C))
 
 def calc_K2(T_cold_C: float, T_amb_C: float) -> float:
     """
     冰水溫度校正係數 K2 = (周圍溫度 - Tc) / 周圍溫度
-    計算至小數第 3 位
+    計算至小數第 3 位（依適用基準）
     """
-    return round((T_amb_C - T_cold_C) / T_amb_C, 3)
+    return standard(COLD_HOT).rounders["K"]((T_amb_C - T_cold_C) / T_amb_C)
 
 def calc_Veq(V_hot_L: float, V_cold_L: float, K1: float, K2: float) -> float:
     """
     等效內容量 Veq = V1 × K1 + (V2 × K2) / 3
-    V1, V2 計算至小數第 1 位
+    V1, V2 計算至小數第 1 位（依適用基準）
     """
-    V1 = round(V_hot_L, 1)
-    V2 = round(V_cold_L, 1)
-    return V1 * K1 + (V2 * K2) / 3
+    round_V = standard(COLD_HOT).rounders["V"]
+    return round_V(V_hot_L) * K1 + (round_V(V_cold_L) * K2) / 3
+
+def cold_hot_coeffs(Veq: float) -> Dict[Grade, Tuple[float, float]]:
+    """
+    依 Veq 所在分段（適用基準的分段，上限含本身）回傳該段 1–5 級係數
+    """
+    return standard(COLD_HOT).coeffs(Veq)
 
 def energy_standard_limit(Veq: float) -> float:
     """
     冰溫熱型飲水供應機容許耗用能源基準
-    E24 ≤ 0.081×Veq+0.405
+    E24 ≤ 0.081×Veq+0.405（Veq ≤ 8L；其他分段取該段 5 級係數）
     計算至小數第 3 位
     """
-    E = 0.081 * Veq + 0.405
-    return round(E, 3)
+    a, b = cold_hot_coeffs(Veq)[5]
+    E = a * Veq + b
+    return standard(COLD_HOT).rounders["E_standard"](E)
 
 def cold_hot_grade_thresholds(Veq: float) -> Dict[Grade, float]:
     """
-    冰溫熱型飲水供應機能效分級（Veq ≤ 8L）：
+    冰溫熱型飲水供應機能效分級（Veq ≤ 8L；其他分段見適用基準）：
       1級: E24 ≤ 0.049×Veq+0.243
       2級: 0.049×Veq+0.243 < E24 ≤ 0.057×Veq+0.284
       3級: 0.057×Veq+0.284 < E24 ≤ 0.065×Veq+0.324
       4級: 0.065×Veq+0.324 < E24 ≤ 0.073×Veq+0.365
       5級: 0.073×Veq+0.365 < E24 ≤ 0.081×Veq+0.405
     """
-    return {
-        1: 0.049 * Veq + 0.243,
-        2: 0.057 * Veq + 0.284,
-        3: 0.065 * Veq + 0.324,
-        4: 0.073 * Veq + 0.365,
-        5: 0.081 * Veq + 0.405,  # 亦為容許基準
-    }
+    return {g: a * Veq + b for g, (a, b) in cold_hot_coeffs(Veq).items()}
 
 def classify_cold_hot_grade(E24_kWh: float, Veq: float) -> Optional[Grade]:
     """
     根據 E24 與冰溫熱型分級門檻回傳 1–5 級；
     若 E24 大於 5 級上限（亦即超過容許基準），回傳 None 表示「不合格」。
     """
-    limits = cold_hot_grade_thresholds(Veq)
-    for g in (1, 2, 3, 4, 5):
-        if E24_kWh <= limits[g]:
-            return g
-    return None  # 超過 5 級上限 → 不符合容許基準
+    return _first_grade(E24_kWh, cold_hot_grade_thresholds(Veq))
 
 def evaluate_cold_hot(input: ColdHotDispenserInput) -> dict:
     """
@@ -170,12 +242,17 @@ def evaluate_cold_hot(input: ColdHotDispenserInput) -> dict:
       - E 容許耗用能源基準
       - 1-5級能效等級
     """
-    K1 = calc_K1(input.T_hot_C, input.T_amb_C)
-    K2 = calc_K2(input.T_cold_C, input.T_amb_C)
-    Veq = calc_Veq(input.V_hot_L, input.V_cold_L, K1, K2)
-    E_standard = energy_standard_limit(Veq)
-    limits = cold_hot_grade_thresholds(Veq)
-    grade = classify_cold_hot_grade(input.E24_kWh, Veq)
+    kernel = standard(COLD_HOT)    # 每次評估只查一次適用基準，各步驟共用
+    round_K, round_V = kernel.rounders["K"], kernel.rounders["V"]
+    K1 = round_K((input.T_hot_C - input.T_amb_C) / (100.0 - input.T_amb_C))
+    K2 = round_K((input.T_amb_C - input.T_cold_C) / input.T_amb_C)
+    V1, V2 = round_V(input.V_hot_L), round_V(input.V_cold_L)
+    Veq = V1 * K1 + (V2 * K2) / 3
+    coeffs = kernel.coeffs(Veq)
+    a, b = coeffs[5]
+    E_standard = kernel.rounders["E_standard"](a * Veq + b)
+    limits = {g: a * Veq + b for g, (a, b) in coeffs.items()}
+    grade = _first_grade(input.E24_kWh, limits)
     
     # 判定：E24 實測值不得高於容許耗用能源基準
     is_qualified = input.E24_kWh <= E_standard
@@ -187,8 +264,8 @@ def evaluate_cold_hot(input: ColdHotDispenserInput) -> dict:
     return {
         "K1": K1,
         "K2": K2,
-        "V_hot_L": round(input.V_hot_L, 1),
-        "V_cold_L": round(input.V_cold_L, 1),
+        "V_hot_L": V1,
+        "V_cold_L": V2,
         "Veq_L": round(Veq, 3),
         "E24_kWh": round(input.E24_kWh, 3),
         "E_standard_kWh": E_standard,
@@ -199,6 +276,287 @@ def evaluate_cold_hot(input: ColdHotDispenserInput) -> dict:
         "margin_percent": round(margin_percent, 1)
     }
 
+# --- 單次計算快速路徑（逐台呼叫用：GUI、批次、服務）---
+#
+# 與 evaluate() / evaluate_cold_hot() 結果完全相同（同樣的運算順序與捨入），
+# 即適用基準版本編譯後的 Kernel.evaluate：係數、分段與捨入位數已固定於閉包，
+# 5 個等級逐一展開，不經由捨入函數與分段查找函數（MEPS / 容許基準即取其 5 級值）。
+
+def evaluate_fused(input: HotWarmDispenserInput) -> dict:
+    """
+    溫熱型單次計算快速路徑，回傳鍵值與 evaluate() 相同
+    """
+    return standard(HOT_WARM).evaluate(input)
+
+def evaluate_cold_hot_fused(input: ColdHotDispenserInput) -> dict:
+    """
+    冰溫熱型單次計算快速路徑，回傳鍵值與 evaluate_cold_hot() 相同
+    """
+    return standard(COLD_HOT).evaluate(input)
+
+# --- 依欄位建立輸入（CSV / JSON 記錄通用）---
+
+HOT_WARM_FIELDS = ("E24_kWh", "T_hot24_C", "T_amb_C", "V_marked_L")
+COLD_HOT_FIELDS = ("E24_kWh", "T_hot_C", "T_cold_C", "T_amb_C", "V_hot_L", "V_cold_L")
+
+def is_cold_hot(record: Dict) -> bool:
+    """
+    記錄（或欄位 dict）是否為冰溫熱型：T_cold_C 欄位有值；
+    缺欄位、None 或空字串（CSV 中溫熱型列的空欄）皆為溫熱型。
+    """
+    value = record.get("T_cold_C")
+    return value is not None and not (isinstance(value, str) and value == "")
+
+def input_from_record(record: Dict) -> Union[HotWarmDispenserInput, ColdHotDispenserInput]:
+    """
+    依欄位自動判別機型並建立輸入物件：
+      T_cold_C 欄位有值 → 冰溫熱型；否則 → 溫熱型
+    數值可為字串（CSV 讀入）；缺欄位拋出 KeyError，數值格式錯誤拋出 ValueError。
+    """
+    if is_cold_hot(record):
+        return ColdHotDispenserInput(*(float(record[k]) for k in COLD_HOT_FIELDS))
+    return HotWarmDispenserInput(*(float(record[k]) for k in HOT_WARM_FIELDS))
+
+# --- 反算：達到指定等級（或更佳）所允許的最大 E24 ---
+#
+# 溫熱型：E_st,24 = round(E24 / K, d) ≤ L_N（d 為適用基準的位數，CNS3910 為 3；s = 10**d）
+#   設 m 為滿足 m/s ≤ L_N 的最大整數，則合格 ⇔ E24 / K 捨入後不超過 m/s，
+#   即 E24 / K 約小於 (m + 0.5)/s（中點依偶數捨入），故以 K × (m + 0.5)/s 為起點；
+#   基準未規定捨入（d 為 None）時 E_st,24 = E24 / K，改以 K × L_N 為起點。
+#   再逐一浮點數（nextafter）微調至 est24() 判定仍合格的最大值，
+#   故等級邊界上的捨入規則與正算完全一致。
+# 冰溫熱型：E24 直接與 L_N(Veq) 比較（未捨入），最大 E24 即 L_N 本身。
+# 參數可為純量或陣列（list / NumPy），陣列時以 NumPy 一次計算整份型錄。
+
+def _np():
+    import numpy
+    return numpy
+
+def _is_array(*values) -> bool:
+    return any(not isinstance(v, (int, float)) for v in values)
+
+def _best_limit(limits: Dict[Grade, float], grade: Grade, maximum=max):
+    # 等級 ≤ N ⇔ 存在 g ≤ N 使值 ≤ L_g，故取 L_1..L_N 之最大者
+    best = limits[1]
+    for g in range(2, grade + 1):
+        best = maximum(best, limits[g])
+    return best
+
+def max_E24_for_grade(grade: Grade, T_hot24_C, T_amb_C, V_marked_L):
+    """
+    溫熱型：在給定溫度與容量下，仍能判定為 grade 級（或更佳）的最大 E24 (kWh)。
+    K ≤ 0 時無意義，回傳 nan。
+    """
+    if _is_array(T_hot24_C, T_amb_C, V_marked_L):
+        return _max_E24_for_grade_array(grade, T_hot24_C, T_amb_C, V_marked_L)
+
+    import math
+    K = temp_correction_factor(T_hot24_C, T_amb_C)
+    L = _best_limit(grade_thresholds_kWh(V_marked_L), grade)
+    if not (K > 0 and math.isfinite(K) and math.isfinite(L)):
+        return math.nan
+
+    def passes(E24):
+        return est24(E24, T_hot24_C, T_amb_C) <= L
+
+    digits = standard(HOT_WARM).version.digits("E_st24")
+    if digits is None:
+        E = K * L
+    else:
+        s = 10 ** digits
+        m = math.floor(L * s)
+        while (m + 1) / s <= L:
+            m += 1
+        while m / s > L:
+            m -= 1
+        E = K * (m + 0.5) / s
+    while not passes(E):
+        E = math.nextafter(E, -math.inf)
+    while passes(math.nextafter(E, math.inf)):
+        E = math.nextafter(E, math.inf)
+    return E
+
+def _max_E24_for_grade_array(grade: Grade, T_hot24_C, T_amb_C, V_marked_L):
+    import HCD3_EnergyLevel_Cal_Vector as vec
+    np = _np()
+
+    T_hot24_C, T_amb_C, V_marked_L = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (T_hot24_C, T_amb_C, V_marked_L)))
+    K = vec.temp_correction_factor(T_hot24_C, T_amb_C)
+    L = _best_limit(vec.grade_thresholds_kWh(V_marked_L), grade, np.maximum)
+    valid = (K > 0) & np.isfinite(K) & np.isfinite(L)
+    K = np.where(valid, K, 1.0)
+    L = np.where(valid, L, 0.0)
+
+    digits = standard(HOT_WARM).version.digits("E_st24")
+
+    def passes(E24):
+        return (E24 / K if digits is None else vec.py_round(E24 / K, digits)) <= L
+
+    if digits is None:
+        E = K * L
+    else:
+        s = 10 ** digits
+        m = np.floor(L * s)
+        m += (m + 1) / s <= L
+        m -= m / s > L
+        E = K * (m + 0.5) / s
+    bad = ~passes(E)
+    while bad.any():
+        E = np.where(bad, np.nextafter(E, -np.inf), E)
+        bad = ~passes(E)
+    up = np.nextafter(E, np.inf)
+    step = passes(up)
+    while step.any():
+        E = np.where(step, up, E)
+        up = np.nextafter(E, np.inf)
+        step = passes(up)
+    return np.where(valid, E, np.nan)
+
+def max_E24_for_cold_hot_grade(grade: Grade, T_hot_C, T_cold_C, T_amb_C, V_hot_L, V_cold_L):
+    """
+    冰溫熱型：經 K1 / K2 / Veq 計算鏈求出分級上限，
+    仍能判定為 grade 級（或更佳）的最大 E24 (kWh)。
+    """
+    if _is_array(T_hot_C, T_cold_C, T_amb_C, V_hot_L, V_cold_L):
+        import HCD3_EnergyLevel_Cal_Vector as vec
+        K1 = vec.calc_K1(T_hot_C, T_amb_C)
+        K2 = vec.calc_K2(T_cold_C, T_amb_C)
+        Veq = vec.calc_Veq(V_hot_L, V_cold_L, K1, K2)
+        return _best_limit(vec.cold_hot_grade_thresholds(Veq), grade, _np().maximum)
+    K1 = calc_K1(T_hot_C, T_amb_C)
+    K2 = calc_K2(T_cold_C, T_amb_C)
+    Veq = calc_Veq(V_hot_L, V_cold_L, K1, K2)
+    return _best_limit(cold_hot_grade_thresholds(Veq), grade)
+
+def E24_budget(T_hot24_C, T_amb_C, V_marked_L) -> Dict[Grade, float]:
+    """
+    溫熱型各等級 E24 預算表 {1..5: 最大 E24}；輸入為陣列時值亦為陣列
+    """
+    return {g: max_E24_for_grade(g, T_hot24_C, T_amb_C, V_marked_L) for g in (1, 2, 3, 4, 5)}
+
+def E24_budget_cold_hot(T_hot_C, T_cold_C, T_amb_C, V_hot_L, V_cold_L) -> Dict[Grade, float]:
+    """
+    冰溫熱型各等級 E24 預算表 {1..5: 最大 E24}
+    """
+    return {g: max_E24_for_cold_hot_grade(g, T_hot_C, T_cold_C, T_amb_C, V_hot_L, V_cold_L)
+            for g in (1, 2, 3, 4, 5)}
+
+# --- 整欄輸入檢核（批次用）---
+#
+# 以布林遮罩一次檢查整欄，不對每列拋出例外；回傳錯誤表供批次隔離壞列。
+# 一列可有多個錯誤，各自列出。非有限值（NaN / inf）不再做範圍與溫度順序檢查。
+
+INVALID_NOT_FINITE = "not_finite"
+INVALID_RANGE = "out_of_range"
+INVALID_T_AMB_100 = "t_amb_100"
+INVALID_T_AMB_0 = "t_amb_0"
+INVALID_T_HOT_ORDER = "t_hot_le_amb"
+INVALID_T_COLD_ORDER = "t_cold_ge_amb"
+
+INVALID_REASONS: Dict[str, str] = {
+    INVALID_NOT_FINITE: "數值缺漏或非有限值",
+    INVALID_RANGE: "超出合理範圍",
+    INVALID_T_AMB_100: "周圍溫度為 100°C（K / K1 分母為 0）",
+    INVALID_T_AMB_0: "周圍溫度為 0°C（K2 分母為 0）",
+    INVALID_T_HOT_ORDER: "熱水溫度不高於周圍溫度",
+    INVALID_T_COLD_ORDER: "冰水溫度不低於周圍溫度",
+}
+
+# 各欄合理範圍（含端點）
+VALID_RANGES: Dict[str, Tuple[float, float]] = {
+    "E24_kWh": (0.0, 100.0),
+    "T_hot24_C": (-50.0, 150.0),
+    "T_hot_C": (-50.0, 150.0),
+    "T_cold_C": (-50.0, 150.0),
+    "T_amb_C": (-50.0, 150.0),
+    "V_marked_L": (0.0, 1000.0),
+    "V_hot_L": (0.0, 1000.0),
+    "V_cold_L": (0.0, 1000.0),
+}
+
+def validate_columns(columns: Dict) -> Dict:
+    """
+    檢核整欄輸入（機型依 is_cold_hot 判別，同 input_from_record），回傳：
+      valid  - bool[n]，該列可安全計算
+      row    - int[m]，錯誤所在列（0 起算，依列排序）
+      field  - str[m]，錯誤欄位
+      reason - str[m]，錯誤代碼（見 INVALID_REASONS）
+    """
+    np = _np()
+    fields = COLD_HOT_FIELDS if is_cold_hot(columns) else HOT_WARM_FIELDS
+    cols = {k: np.asarray(columns[k], dtype=float) for k in fields}
+    n = len(cols[fields[0]])
+    hot_key = "T_hot_C" if "T_hot_C" in cols else "T_hot24_C"
+    T_hot, T_amb = cols[hot_key], cols["T_amb_C"]
+    checks = []
+    finite = {}
+    for k in fields:
+        finite[k] = np.isfinite(cols[k])
+        lo, hi = VALID_RANGES[k]
+        checks.append((k, INVALID_NOT_FINITE, ~finite[k]))
+        checks.append((k, INVALID_RANGE, finite[k] & ((cols[k] < lo) | (cols[k] > hi))))
+    both = finite[hot_key] & finite["T_amb_C"]
+    checks.append(("T_amb_C", INVALID_T_AMB_100, T_amb == 100.0))
+    checks.append((hot_key, INVALID_T_HOT_ORDER, both & (T_hot <= T_amb)))
+    if "T_cold_C" in cols:
+        checks.append(("T_amb_C", INVALID_T_AMB_0, T_amb == 0.0))
+        cold = finite["T_cold_C"] & finite["T_amb_C"]
+        checks.append(("T_cold_C", INVALID_T_COLD_ORDER, cold & (cols["T_cold_C"] >= T_amb)))
+
+    valid = np.ones(n, dtype=bool)
+    rows, field, reason = [], [], []
+    for k, code, mask in checks:
+        hit = np.flatnonzero(mask)
+        if hit.size:
+            valid[hit] = False
+            rows.append(hit)
+            field.append(np.full(hit.size, k, dtype=object))
+            reason.append(np.full(hit.size, code, dtype=object))
+    if rows:
+        row = np.concatenate(rows)
+        order = np.argsort(row, kind='stable')
+        return {"valid": valid, "row": row[order],
+                "field": np.concatenate(field)[order], "reason": np.concatenate(reason)[order]}
+    return {"valid": valid, "row": np.empty(0, dtype=np.intp),
+            "field": np.empty(0, dtype=object), "reason": np.empty(0, dtype=object)}
+
+def validate_record(record: Dict) -> List[Tuple[str, str]]:
+    """
+    檢核單台輸入（規則與錯誤順序同 validate_columns 的單列結果），純 Python 不載入 NumPy，
+    供單台評估的啟動路徑使用。回傳 [(欄位, 錯誤代碼)]，空清單表示可安全計算。
+    """
+    import math
+    fields = COLD_HOT_FIELDS if is_cold_hot(record) else HOT_WARM_FIELDS
+    values = {k: float(record[k]) for k in fields}
+    finite = {k: math.isfinite(v) for k, v in values.items()}
+    hot_key = "T_hot_C" if "T_hot_C" in values else "T_hot24_C"
+    T_hot, T_amb = values[hot_key], values["T_amb_C"]
+    errors = []
+    for k in fields:
+        lo, hi = VALID_RANGES[k]
+        if not finite[k]:
+            errors.append((k, INVALID_NOT_FINITE))
+        elif not lo <= values[k] <= hi:
+            errors.append((k, INVALID_RANGE))
+    if T_amb == 100.0:
+        errors.append(("T_amb_C", INVALID_T_AMB_100))
+    if finite[hot_key] and finite["T_amb_C"] and T_hot <= T_amb:
+        errors.append((hot_key, INVALID_T_HOT_ORDER))
+    if "T_cold_C" in values:
+        if T_amb == 0.0:
+            errors.append(("T_amb_C", INVALID_T_AMB_0))
+        if finite["T_cold_C"] and finite["T_amb_C"] and values["T_cold_C"] >= T_amb:
+            errors.append(("T_cold_C", INVALID_T_COLD_ORDER))
+    return errors
+
+def validation_errors(report: Dict) -> List[Dict]:
+    """
+    錯誤表轉為記錄清單 [{"row", "field", "reason", "message"}]（row 為 0 起算）
+    """
+    return [{"row": int(r), "field": f, "reason": c, "message": INVALID_REASONS[c]}
+            for r, f, c in zip(report["row"].tolist(), report["field"].tolist(), report["reason"].tolist())]
+
 def print_report_cold_hot(input: ColdHotDispenserInput, result: dict):
     """
     輸出冰溫熱型飲水供應機測試報告
@@ -215,6 +573,7 @@ def print_report_cold_hot(input: ColdHotDispenserInput, result: dict):
     print(f"  冰水貯水桶容量 V2:          {result['V_cold_L']:.1f} L")
     
     print("\n【計算結果】")
+    print(f"  適用基準:                   {standard(COLD_HOT).version.id}")
     print(f"  熱水溫度校正係數 K1:        {result['K1']:.3f}")
     print(f"  冰水溫度校正係數 K2:        {result['K2']:.3f}")
     print(f"  等效內容量 Veq:             {result['Veq_L']:.3f} L")
@@ -253,6 +612,7 @@ def print_report(input: HotWarmDispenserInput, result: dict):
     print(f"  熱貯水桶標示容量 V:         {input.V_marked_L:.1f} L")
     
     print("\n【計算結果】")
+    print(f"  適用基準:                   {standard(HOT_WARM).version.id}")
     print(f"  溫度校正係數 K:             {result['K']:.6f}")
     print(f"  標準化待機損失 E_st,24:     {result['E_st24_kWh']:.3f} kWh")
     print(f"  容許耗用能源基準 MEPS:      {result['MEPS_kWh']:.3f} kWh")
@@ -275,8 +635,130 @@ def print_report(input: HotWarmDispenserInput, result: dict):
     
     print("=" * 70)
 
+# --- 串流模式（NDJSON：stdin 每行一筆量測記錄 → stdout 每行一筆結果）---
+#
+# python HCD3_EnergyLevel_Cal_Core.py --stream [--batch 512]
+# 機型依欄位判別（同 input_from_record）；每累積 batch 行、或 stdin 暫無資料時整批檢核、
+# 計算並寫出後 flush，故管線兩端可一問一答。記錄中的 "id" 欄位原樣帶回結果。
+# 檢核不通過或格式錯誤的行輸出 {"line", "error", "errors"}，不中斷串流。
+# 有 .buffer 的 stdin 以區塊讀取、自行切行：已讀入的行都處理完才以 select 檢查 fd，
+# 否則 TextIOWrapper 緩衝中的行對 select 不可見，每批會退化為一行。
+
+STREAM_BATCH = 512
+STREAM_BLOCK = 1 << 16      # 大於 BufferedReader 的緩衝，read1 一次即取盡其中資料
+
+def _stdin_idle(stream) -> bool:
+    # POSIX 管線 / 終端機可用 select 判斷是否暫無資料；其他情況視為有資料（僅依 batch 大小寫出）
+    try:
+        import select
+        return not select.select([stream], [], [], 0)[0]
+    except (ImportError, OSError, ValueError, TypeError):
+        return False
+
+def _stream_batch(lines, out):
+    import json
+    results: List[Optional[Dict]] = [None] * len(lines)
+    groups = {COLD_HOT_FIELDS: [], HOT_WARM_FIELDS: []}
+    parsed = {}
+    for i, (n, text) in enumerate(lines):
+        try:
+            record = json.loads(text)
+            if not isinstance(record, dict):
+                raise ValueError("須為 JSON 物件")
+            fields = COLD_HOT_FIELDS if is_cold_hot(record) else HOT_WARM_FIELDS
+            parsed[i] = (record, [float(record[k]) for k in fields])
+            groups[fields].append(i)
+        except KeyError as e:
+            results[i] = {"line": n, "error": f"缺少欄位 {e}"}
+        except (TypeError, ValueError) as e:
+            results[i] = {"line": n, "error": f"格式錯誤：{e}"}
+
+    for fields, index in groups.items():
+        if not index:
+            continue
+        report = validate_columns({k: [parsed[i][1][j] for i in index] for j, k in enumerate(fields)})
+        for r, field, code in zip(report["row"].tolist(), report["field"].tolist(), report["reason"].tolist()):
+            i = index[r]
+            if results[i] is None:
+                results[i] = {"line": lines[i][0], "error": "輸入檢核不通過", "errors": []}
+            results[i]["errors"].append({"field": field, "reason": code, "message": INVALID_REASONS[code]})
+        cold_hot = fields is COLD_HOT_FIELDS
+        for i in index:
+            if results[i] is not None:
+                continue
+            record, values = parsed[i]
+            if cold_hot:
+                result = evaluate_cold_hot_fused(ColdHotDispenserInput(*values))
+            else:
+                result = evaluate_fused(HotWarmDispenserInput(*values))
+            result["limits_kWh"] = {str(g): v for g, v in result["limits_kWh"].items()}
+            if "id" in record:
+                result = {"id": record["id"], **result}
+            results[i] = result
+    out.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in results))
+    out.flush()
+
+def _stream_lines(stdin):
+    """
+    逐區塊產生 [行文字]：每個區塊為一次讀取中完整的行（最後不完整的行留待下一區塊）
+    """
+    buffer = getattr(stdin, "buffer", None)
+    if buffer is None or not hasattr(buffer, "read1"):
+        # StringIO 等：逐行，每行一個區塊
+        for text in iter(stdin.readline, ""):
+            yield [text]
+        return
+    tail = b""
+    while True:
+        block = buffer.read1(STREAM_BLOCK)
+        if not block:
+            break
+        *complete, tail = (tail + block).split(b"\n")
+        if complete:
+            yield [line.decode("utf-8", errors="replace") for line in complete]
+    if tail:
+        yield [tail.decode("utf-8", errors="replace")]
+
+def stream_ndjson(stdin, stdout, batch: int = STREAM_BATCH) -> int:
+    """
+    NDJSON 串流評估：每行輸入對應一行輸出（空行略過），回傳處理行數
+    """
+    lines = []
+    count = 0
+    n = 0
+    for block in _stream_lines(stdin):
+        for text in block:
+            n += 1
+            if text.strip():
+                lines.append((n, text))
+            if len(lines) >= batch:
+                _stream_batch(lines, stdout)
+                count += len(lines)
+                lines = []
+        # 本區塊的行已全部取出，此時 fd 無資料才代表輸入暫停
+        if lines and _stdin_idle(stdin):
+            _stream_batch(lines, stdout)
+            count += len(lines)
+            lines = []
+    if lines:
+        _stream_batch(lines, stdout)
+        count += len(lines)
+    return count
+
 # --- 範例（取你圖片中的數據）---
 if __name__ == "__main__":
+    import sys
+    args = sys.argv[1:]
+    if "--standard" in args or "--date" in args:
+        # --standard 版本id / --date YYYY-MM-DD：改用指定的基準版本
+        from datetime import date
+        use_standard(args[args.index("--standard") + 1] if "--standard" in args else None,
+                     date.fromisoformat(args[args.index("--date") + 1]) if "--date" in args else None)
+    if "--stream" in args:
+        batch = int(args[args.index("--batch") + 1]) if "--batch" in args else STREAM_BATCH
+        stream_ndjson(sys.stdin, sys.stdout, max(batch, 1))
+        sys.exit(0)
+
     print("【溫熱型飲水機測試】\n")
     
     demo = HotWarmDispenserInput(
@@ -305,7 +787,7 @@ if __name__ == "__main__":
     print("【冰溫熱型飲水機測試】")
     print("=" * 70 + "\n")
     
-    # 測試案例 3: 冰溫熱型 - Veq ≤ 12L
+    # 測試案例 3: 冰溫熱型 - Veq ≤ 8L
     demo3 = ColdHotDispenserInput(
         E24_kWh=1.200,   # 24小時備用損失
         T_hot_C=88.0,    # 熱水平均溫度
@@ -318,10 +800,10 @@ if __name__ == "__main__":
     print_report_cold_hot(demo3, result3)
     
     print("\n" + "=" * 70)
-    print("測試案例 4: 冰溫熱型 - Veq > 12L (大容量)")
+    print("測試案例 4: 冰溫熱型 - Veq > 8L (大容量)")
     print("=" * 70 + "\n")
     
-    # 測試案例 4: 冰溫熱型 - Veq > 12L
+    # 測試案例 4: 冰溫熱型 - Veq > 8L
     demo4 = ColdHotDispenserInput(
         E24_kWh=1.500,   # 24小時備用損失
         T_hot_C=90.0,    # 熱水平均溫度
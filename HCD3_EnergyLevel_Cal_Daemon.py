@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HCD3 常驻计算进程（Unix domain socket）
+exe / 解释器启动远比一次计算慢；常驻进程启动时即载入基准登记表、编译评估核心并预热 NumPy，
+之后客户端经本机 socket 以精简的二进制协议送出量测值，每台往返在 1 ms 以下。
+找不到常驻进程（或平台不支援 AF_UNIX）时，客户端自动改在本进程计算，结果相同。
+
+协议（little-endian；每个讯框前置 4 字节长度 <I）：
+  请求：<BBI 操作码、机型码（0 温热型 / 1 冰温热型）、台数 n，其后 n × 字段数 个 float64（字段顺序同 Core.*_FIELDS）
+  回应：<BI 状态（0 成功 / 1 错误）、n，其后 int8[n] 等级（1–5；0 不合格；-1 输入检核不通过）、
+        uint8[n] 是否合格、float64[n × 数值字段数]（见 VALUE_FIELDS）；错误时其后为 UTF-8 讯息
+
+使用方法：
+  python HCD3_EnergyLevel_Cal_Daemon.py serve [--socket 路径]
+  python HCD3_EnergyLevel_Cal_Daemon.py eval E24 T_hot T_amb V                 （温热型）
+  python HCD3_EnergyLevel_Cal_Daemon.py eval E24 T_hot T_cold T_amb V1 V2      （冰温热型）
+  python HCD3_EnergyLevel_Cal_Daemon.py batch input.csv [output.csv]
+  python HCD3_EnergyLevel_Cal_Daemon.py ping
+  （socket 路径默认为每用户目录（$XDG_RUNTIME_DIR/hcd3，或暂存目录下的 hcd3-<uid>，权限 0700）
+   下的 hcd3_energy.sock，可用环境变量 HCD3_SOCKET 指定）
+"""
+
+import os
+import socket
+import stat
+import struct
+import sys
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from HCD3_EnergyLevel_Cal_Core import (
+    HotWarmDispenserInput, ColdHotDispenserInput, HOT_WARM_FIELDS, COLD_HOT_FIELDS, is_cold_hot,
+)
+
+HOT_WARM, COLD_HOT = "hot_warm", "cold_hot"
+KIND_CODES = {HOT_WARM: 0, COLD_HOT: 1}
+KIND_FIELDS = {HOT_WARM: HOT_WARM_FIELDS, COLD_HOT: COLD_HOT_FIELDS}
+
+OP_EVALUATE = 1
+OP_PING = 2
+STATUS_OK, STATUS_ERROR = 0, 1
+GRADE_INVALID = -1
+
+LIMIT_FIELDS = ("L1", "L2", "L3", "L4", "L5")
+VALUE_FIELDS = {
+    HOT_WARM: ("K", "E_st24_kWh", "MEPS_kWh") + LIMIT_FIELDS,
+    COLD_HOT: ("K1", "K2", "V_hot_L", "V_cold_L", "Veq_L", "E24_kWh", "E_standard_kWh",
+               "margin_kWh", "margin_percent") + LIMIT_FIELDS,
+}
+FLAG_FIELD = {HOT_WARM: "is_meps_pass", COLD_HOT: "is_qualified"}
+
+SOCKET_NAME = "hcd3_energy.sock"
+SCALAR_MAX_ROWS = 32            # 台数不超过此值时逐台以标量核心计算，否则以批量核心
+MAX_FRAME_BYTES = 256 << 20
+CLIENT_CHUNK_ROWS = 1 << 16
+
+_HEADER = struct.Struct("<BBI")
+_REPLY = struct.Struct("<BI")
+_LENGTH = struct.Struct("<I")
+
+def _runtime_dir() -> str:
+    # 每用户目录：优先 XDG_RUNTIME_DIR（本身即为本用户专用），否则为暂存目录下的 hcd3-<uid>
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return os.path.join(os.environ["XDG_RUNTIME_DIR"], "hcd3")
+    import tempfile     # 连带载入 random / shutil 等，仅在需要默认路径时载入
+    uid = os.getuid() if hasattr(os, "getuid") else None
+    return os.path.join(tempfile.gettempdir(), "hcd3" if uid is None else f"hcd3-{uid}")
+
+def default_socket_path() -> str:
+    if os.environ.get("HCD3_SOCKET"):
+        return os.environ["HCD3_SOCKET"]
+    return os.path.join(_runtime_dir(), SOCKET_NAME)
+
+def _private_dir(directory: str, create: bool = False):
+    """
+    确认 socket 目录为本用户所有、权限 0700 的目录（create 时不存在即建立），否则拋出 OSError；
+    避免其他用户预先建立同名目录或 socket 冒充常驻进程
+    """
+    if create:
+        try:
+            os.mkdir(directory, 0o700)
+        except FileExistsError:
+            pass
+    st = os.lstat(directory)
+    if not hasattr(os, "getuid"):
+        return
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise OSError(f"socket 目录须为本用户所有且权限为 0700：{directory}")
+
+def _check_default_dir(path: str, create: bool = False):
+    # 仅检查默认目录；HCD3_SOCKET / --socket 指定的路径由使用者负责
+    if not os.environ.get("HCD3_SOCKET") and path == os.path.join(_runtime_dir(), SOCKET_NAME):
+        _private_dir(os.path.dirname(path), create)
+
+def _remove_stale_socket(path: str):
+    """
+    path 已存在时：是 socket 且无人监听（连线被拒）才删除；仍有进程监听或不是 socket 时拋出 OSError
+    """
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise OSError(f"路径已存在且不是 socket：{path}")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.unlink(path)     # 上次未正常结束留下的 socket 文件
+        return
+    finally:
+        probe.close()
+    raise OSError(f"常驻进程已在执行：{path}")
+
+def _le(values: array) -> array:
+    # 协议固定为 little-endian
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray(size)
+    view = memoryview(buf)
+    got = 0
+    while got < size:
+        n = sock.recv_into(view[got:], size - got)
+        if n == 0:
+            raise ConnectionError("连线已关闭")
+        got += n
+    return bytes(buf)
+
+def _recv_frame(sock: socket.socket) -> bytes:
+    (size,) = _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))
+    if size > MAX_FRAME_BYTES:
+        raise ConnectionError(f"讯框过大：{size} bytes")
+    return _recv_exact(sock, size)
+
+def _send_frame(sock: socket.socket, body: bytes):
+    sock.sendall(_LENGTH.pack(len(body)) + body)
+
+def _kernels() -> Dict[str, object]:
+    # 适用的基准版本（Core.standard；登记表与核心皆有快取，常驻进程内只编译一次）
+    from HCD3_EnergyLevel_Cal_Core import standard
+    return {kind: standard(kind) for kind in (HOT_WARM, COLD_HOT)}
+
+def _result_values(kind: str, result: dict) -> List[float]:
+    limits = result["limits_kWh"]
+    return [float(result[k]) for k in VALUE_FIELDS[kind][:-5]] + [float(limits[g]) for g in (1, 2, 3, 4, 5)]
+
+def evaluate_block(kind: str, rows: Sequence[Sequence[float]], kernels: Dict[str, object] = None
+                   ) -> Tuple[List[int], List[int], List[List[float]]]:
+    """
+    评估 n 台（常驻进程与本进程备援共用）：回传 (等级码, 合格旗标, 数值字段)；
+    输入检核不通过的台等级码为 GRADE_INVALID、数值为 nan
+    """
+    from HCD3_EnergyLevel_Cal_Core import validate_columns
+    kernels = kernels or _kernels()
+    kernel = kernels[kind]
+    fields = KIND_FIELDS[kind]
+    n = len(rows)
+    width = len(VALUE_FIELDS[kind])
+    grade = [GRADE_INVALID] * n
+    flag = [0] * n
+    values = [[float('nan')] * width for _ in range(n)]
+    if n == 0:
+        return grade, flag, values
+    report = validate_columns({k: [row[j] for row in rows] for j, k in enumerate(fields)})
+    index = [i for i, ok in enumerate(report["valid"].tolist()) if ok]
+    if len(index) <= SCALAR_MAX_ROWS:
+        build = ColdHotDispenserInput if kind == COLD_HOT else HotWarmDispenserInput
+        for i in index:
+            result = kernel.evaluate(build(*(float(v) for v in rows[i])))
+            grade[i] = result["grade"] or 0
+            flag[i] = int(bool(result[FLAG_FIELD[kind]]))
+            values[i] = _result_values(kind, result)
+        return grade, flag, values
+
+    import numpy as np
+    data = np.asarray(rows, dtype=float)[index]
+    result = kernel.evaluate_columns(*(data[:, j] for j in range(len(fields))))
+    block = np.column_stack([np.broadcast_to(np.asarray(result[k], dtype=float), (len(index),))
+                             for k in VALUE_FIELDS[kind][:-5]] +
+                            [np.broadcast_to(result["limits_kWh"][g], (len(index),)) for g in (1, 2, 3, 4, 5)])
+    for i, g, f, v in zip(index, result["grade"].tolist(), result[FLAG_FIELD[kind]].tolist(), block.tolist()):
+        grade[i], flag[i], values[i] = g, int(f), v
+    return grade, flag, values
+
+def result_dict(kind: str, grade: int, flag: int, values: Sequence[float]) -> Optional[dict]:
+    """
+    等级码与数值字段还原为 Core.evaluate() / evaluate_cold_hot() 相同的结果字典；检核不通过回传 None
+    """
+    if grade == GRADE_INVALID:
+        return None
+    named = dict(zip(VALUE_FIELDS[kind], values))
+    limits = {g: named[f"L{g}"] for g in (1, 2, 3, 4, 5)}
+    if kind == COLD_HOT:
+        return {
+            "K1": named["K1"], "K2": named["K2"], "V_hot_L": named["V_hot_L"], "V_cold_L": named["V_cold_L"],
+            "Veq_L": named["Veq_L"], "E24_kWh": named["E24_kWh"], "E_standard_kWh": named["E_standard_kWh"],
+            "limits_kWh": limits, "grade": grade or None, "is_qualified": bool(flag),
+            "margin_kWh": named["margin_kWh"], "margin_percent": named["margin_percent"],
+        }
+    return {
+        "K": named["K"], "E_st24_kWh": named["E_st24_kWh"], "limits_kWh": limits,
+        "MEPS_kWh": named["MEPS_kWh"], "grade": grade or None, "is_meps_pass": bool(flag),
+    }
+
+# --- 常驻进程 ---
+
+def _handle(body: bytes, kernels: Dict[str, object]) -> bytes:
+    op, code, n = _HEADER.unpack_from(body)
+    if op == OP_PING:
+        return _REPLY.pack(STATUS_OK, 0)
+    kind = HOT_WARM if code == 0 else COLD_HOT if code == 1 else None
+    if op != OP_EVALUATE or kind is None:
+        return _REPLY.pack(STATUS_ERROR, 0) + f"不支援的请求：op={op} kind={code}".encode("utf-8")
+    width = len(KIND_FIELDS[kind])
+    data = _le(array('d', body[_HEADER.size:]))
+    if len(data) != n * width:
+        return _REPLY.pack(STATUS_ERROR, 0) + "数据长度与台数不符".encode("utf-8")
+    rows = [data[i * width:(i + 1) * width] for i in range(n)]
+    grade, flag, values = evaluate_block(kind, rows, kernels)
+    flat = array('d')
+    for v in values:
+        flat.extend(v)
+    return (_REPLY.pack(STATUS_OK, n) + array('b', grade).tobytes() + array('B', flag).tobytes()
+            + _le(flat).tobytes())
+
+def make_daemon(path: Optional[str] = None):
+    """
+    建立常驻服务（未启动）：载入登记表、编译并预热评估核心后绑定 path；
+    每个连线一个线程，连线可连续送多个请求
+    """
+    import socketserver
+
+    path = path or default_socket_path()
+    _check_default_dir(path, create=True)
+    kernels = _kernels()
+    for kernel in kernels.values():    # 预热批量核心（NumPy 与编译好的列式函数）
+        kernel.evaluate_columns
+    evaluate_block(HOT_WARM, [[0.5, 85.0, 25.0, 2.0]] * (SCALAR_MAX_ROWS + 1), kernels)
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            sock = self.request
+            while True:
+                try:
+                    body = _recv_frame(sock)
+                except (ConnectionError, OSError):
+                    return
+                try:
+                    reply = _handle(body, kernels)
+                except Exception as e:
+                    reply = _REPLY.pack(STATUS_ERROR, 0) + f"计算失败：{e}".encode("utf-8")
+                _send_frame(sock, reply)
+
+    _remove_stale_socket(path)
+    server = socketserver.ThreadingUnixStreamServer(path, Handler)
+    server.daemon_threads = True
+    return server
+
+def serve(path: Optional[str] = None):
+    path = path or default_socket_path()
+    server = make_daemon(path)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+# --- 客户端 ---
+
+class DaemonClient:
+    """
+    常驻进程客户端（保持一条连线）；连线失败拋出 OSError
+    """
+
+    def __init__(self, path: Optional[str] = None, timeout: float = 5.0):
+        self.path = path or default_socket_path()
+        _check_default_dir(self.path)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(self.path)
+        except OSError:
+            self.sock.close()
+            raise
+
+    def _call(self, body: bytes) -> Tuple[int, int, bytes]:
+        _send_frame(self.sock, body)
+        reply = _recv_frame(self.sock)
+        status, n = _REPLY.unpack_from(reply)
+        return status, n, reply[_REPLY.size:]
+
+    def ping(self) -> bool:
+        return self._call(_HEADER.pack(OP_PING, 0, 0))[0] == STATUS_OK
+
+    def evaluate_rows(self, kind: str, rows: Sequence[Sequence[float]]) -> List[Optional[dict]]:
+        data = array('d')
+        for row in rows:
+            data.extend(float(v) for v in row)
+        status, n, rest = self._call(_HEADER.pack(OP_EVALUATE, KIND_CODES[kind], len(rows)) + _le(data).tobytes())
+        if status != STATUS_OK:
+            raise RuntimeError(rest.decode("utf-8", "replace"))
+        grade = array('b', rest[:n])
+        flag = array('B', rest[n:2 * n])
+        values = _le(array('d', rest[2 * n:]))
+        width = len(VALUE_FIELDS[kind])
+        return [result_dict(kind, grade[i], flag[i], values[i * width:(i + 1) * width]) for i in range(n)]
+
+    def close(self):
+        self.sock.close()
+
+_clients: Dict[str, DaemonClient] = {}
+
+def ping(path: Optional[str] = None) -> bool:
+    try:
+        client = DaemonClient(path, timeout=1.0)
+    except OSError:
+        return False
+    try:
+        return client.ping()
+    except (OSError, ConnectionError):
+        return False
+    finally:
+        client.close()
+
+def evaluate_rows(kind: str, rows: Sequence[Sequence[float]], path: Optional[str] = None,
+                  fallback: bool = True) -> Tuple[List[Optional[dict]], bool]:
+    """
+    经常驻进程评估 n 台；无常驻进程时（fallback=True）改在本进程计算。
+    回传 (结果清单（检核不通过者为 None）, 是否经由常驻进程)
+    """
+    path = path or default_socket_path()
+    if hasattr(socket, "AF_UNIX"):
+        for attempt in (0, 1):      # 快取的连线可能已被关闭，重连一次
+            client = _clients.get(path)
+            try:
+                if client is None:
+                    client = _clients[path] = DaemonClient(path)
+                return client.evaluate_rows(kind, rows), True
+            except (OSError, ConnectionError):
+                if client is not None:
+                    client.close()
+                _clients.pop(path, None)
+                if client is None:
+                    break
+    if not fallback:
+        raise ConnectionError(f"找不到常驻进程：{path}")
+    grade, flag, values = evaluate_block(kind, rows)
+    return [result_dict(kind, g, f, v) for g, f, v in zip(grade, flag, values)], False
+
+def evaluate(input, path: Optional[str] = None) -> dict:
+    """
+    评估一台（HotWarmDispenserInput / ColdHotDispenserInput）；输入检核不通过拋出 ValueError
+    """
+    kind = COLD_HOT if isinstance(input, ColdHotDispenserInput) else HOT_WARM
+    (result,), _ = evaluate_rows(kind, [[getattr(input, k) for k in KIND_FIELDS[kind]]], path)
+    if result is None:
+        raise ValueError("输入检核不通过")
+    return result
+
+def main():
+    import csv
+    import json
+
+    args = sys.argv[1:]
+    path = None
+    if "--socket" in args:
+        i = args.index("--socket")
+        path = args[i + 1] if i + 1 < len(args) else None
+        del args[i:i + 2]
+    if not args:
+        print(__doc__)
+        return
+    command, rest = args[0], args[1:]
+
+    if command == "serve":
+        if not hasattr(socket, "AF_UNIX"):
+            print("❌ 此平台不支援 Unix domain socket，请改用 HCD3_EnergyLevel_Cal_Server.py")
+            return
+        print(f"HCD3 常驻计算进程：{path or default_socket_path()}（Ctrl+C 停止）")
+        try:
+            serve(path)
+        except KeyboardInterrupt:
+            print("\n✓ 已停止")
+        except OSError as e:
+            print(f"❌ {e}")
+    elif command == "ping":
+        print("✓ 常驻进程执行中" if ping(path) else "❌ 找不到常驻进程")
+    elif command == "eval" and len(rest) in (4, 6):
+        kind = HOT_WARM if len(rest) == 4 else COLD_HOT
+        try:
+            row = [float(v) for v in rest]
+        except ValueError:
+            print("❌ 数值格式错误")
+            return
+        (result,), via_daemon = evaluate_rows(kind, [row], path)
+        if result is None:
+            print("❌ 输入检核不通过")
+            return
+        result["limits_kWh"] = {str(g): v for g, v in result["limits_kWh"].items()}
+        print(json.dumps(result, ensure_ascii=False))
+    elif command == "batch" and rest:
+        from HCD3_EnergyLevel_Cal_Batch import write_csv
+        with open(rest[0], 'r', encoding='utf-8-sig') as f:
+            records = list(csv.DictReader(f))
+        kind = COLD_HOT if records and is_cold_hot(records[0]) else HOT_WARM
+        fields = KIND_FIELDS[kind]
+
+        def number(text):
+            try:
+                return float(text)
+            except (TypeError, ValueError):
+                return float('nan')
+
+        rows = [[number(r.get(k)) for k in fields] for r in records]
+        results, via_daemon = [], False
+        for start in range(0, len(rows), CLIENT_CHUNK_ROWS):
+            part, via_daemon = evaluate_rows(kind, rows[start:start + CLIENT_CHUNK_ROWS], path)
+            results.extend(part)
+        out = [{"序号": i, "型号": r.get("型号") or f"测试{i}",
+                "能效等级": (res["grade"] or "不合格") if res else "输入错误"}
+               for i, (r, res) in enumerate(zip(records, results), 1)]
+        print(f"✓ {len(out)} 台（{'常驻进程' if via_daemon else '本进程'}）")
+        if len(rest) > 1:
+            write_csv(rest[1], out)
+    else:
+        print(__doc__)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HCD3 备用损失测试提前终止预测器
+由进行中测试的累计电能曲线推估 E24，并计算各能效等级的机率；
+结果已确定（明确 1 级或明确不合格）的测试可提前结束以节省恒温室时间。
+
+使用方法：
+  回测归档数据：python HCD3_EnergyLevel_Cal_EarlyStop.py archive.csv [report.csv]
+
+归档索引 archive.csv 每行一台测试机，除机型字段外另含：
+  log      - 该次测试的电能记录 CSV（字段 elapsed_h, energy_kWh，energy 为累计值）
+  start_h  - 稳定期结束、24h 计量窗口起点（选填，默认 0）
+"""
+
+import csv
+import math
+import os
+from bisect import bisect_left
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from HCD3_EnergyLevel_Cal_Core import (
+    HotWarmDispenserInput, ColdHotDispenserInput,
+    E24_budget, E24_budget_cold_hot,
+    evaluate, evaluate_cold_hot, input_from_record,
+)
+
+DispenserInput = Union[HotWarmDispenserInput, ColdHotDispenserInput]
+
+TEST_HOURS = 24.0
+
+@dataclass
+class EnergyCurveFit:
+    # 累计电能曲线的拟合结果（24h 窗口内）
+    elapsed_h: float          # 已进行时数（自窗口起点）
+    measured_kWh: float       # 已量得电能
+    power_kW: float           # 拟合平均功率（曲线斜率）
+    power_stderr_kW: float    # 平均功率之标准误差
+    E24_kWh: float            # 推估 24h 备用损失
+    sigma_kWh: float          # E24 推估之标准不确定度
+
+@dataclass
+class EarlyStopDecision:
+    fit: EnergyCurveFit
+    probabilities: Dict[Optional[int], float]   # 键 1–5 为等级，None 为不合格
+    predicted_grade: Optional[int]
+    can_stop: bool
+    reason: str
+
+def _energy_at(t: float, hours: Sequence[float], energy: Sequence[float]) -> float:
+    """
+    累计电能曲线于 t 时刻之线性插值（超出范围时取端点值）
+    """
+    if t <= hours[0]:
+        return energy[0]
+    if t >= hours[-1]:
+        return energy[-1]
+    i = bisect_left(hours, t)
+    if hours[i] == t:
+        return energy[i]
+    t0, t1 = hours[i - 1], hours[i]
+    e0, e1 = energy[i - 1], energy[i]
+    return e0 + (e1 - e0) * (t - t0) / (t1 - t0)
+
+def fit_energy_curve(hours: Sequence[float], energy_kWh: Sequence[float],
+                     start_h: float = 0.0, block_h: float = 1.0,
+                     meter_rel_uncertainty: float = 0.01) -> EnergyCurveFit:
+    """
+    以定功率模型（累计电能对时间为直线）拟合窗口内已量得的曲线，推估 E24：
+      E24 = 已量得电能 + P × 剩余时数
+    加热器启停使逐点残差高度自相关，故 P 的标准误差以每 block_h 小时的
+    区块平均功率离散度估计；再与电表相对不确定度合成 E24 的不确定度。
+    区块数不足 2 时不确定度为无限大。
+    """
+    t_now = min(hours[-1], start_h + TEST_HOURS)
+    elapsed = t_now - start_h
+    e_start = _energy_at(start_h, hours, energy_kWh)
+    measured = _energy_at(t_now, hours, energy_kWh) - e_start
+    if elapsed <= 0:
+        return EnergyCurveFit(0.0, 0.0, 0.0, math.inf, math.nan, math.inf)
+
+    power = measured / elapsed
+    n_blocks = int(elapsed // block_h)
+    if n_blocks >= 2:
+        block_powers = []
+        e_prev = e_start
+        for b in range(1, n_blocks + 1):
+            e_b = _energy_at(start_h + b * block_h, hours, energy_kWh)
+            block_powers.append((e_b - e_prev) / block_h)
+            e_prev = e_b
+        mean = sum(block_powers) / n_blocks
+        var = sum((p - mean) ** 2 for p in block_powers) / (n_blocks - 1)
+        stderr = math.sqrt(var / n_blocks)
+    else:
+        stderr = math.inf
+
+    remaining = TEST_HOURS - elapsed
+    E24 = measured + power * remaining
+    sigma_proj = stderr * remaining if remaining > 0 else 0.0
+    sigma = math.hypot(sigma_proj, meter_rel_uncertainty * E24)
+    return EnergyCurveFit(elapsed, measured, power, stderr, E24, sigma)
+
+def e24_thresholds(spec: DispenserInput) -> Dict[int, float]:
+    """
+    将分级门槛换算为 E24 (kWh) 上限，即仍判定为 g 级（或更佳）的最大 E24；
+    由 Core 的反解函数求得，已含 E_st,24、K 与 V 的舍入：
+      温热型：max_E24_for_grade
+      冰温热型：max_E24_for_cold_hot_grade（经 K1 / K2 / Veq）
+    spec 的 E24_kWh 字段不参与计算。
+    """
+    if isinstance(spec, ColdHotDispenserInput):
+        return E24_budget_cold_hot(spec.T_hot_C, spec.T_cold_C, spec.T_amb_C,
+                                   spec.V_hot_L, spec.V_cold_L)
+    return E24_budget(spec.T_hot24_C, spec.T_amb_C, spec.V_marked_L)
+
+def _normal_cdf(x: float) -> float:
+    return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+
+def grade_probabilities(E24_kWh: float, sigma_kWh: float,
+                        thresholds: Dict[int, float]) -> Dict[Optional[int], float]:
+    """
+    假设 E24 ~ N(E24_kWh, sigma_kWh²)，计算落入各等级区间的机率
+    """
+    probs: Dict[Optional[int], float] = {}
+    below = 0.0
+    for g in (1, 2, 3, 4, 5):
+        if sigma_kWh > 0:
+            cdf = _normal_cdf((thresholds[g] - E24_kWh) / sigma_kWh)
+        else:
+            cdf = 1.0 if E24_kWh <= thresholds[g] else 0.0
+        cdf = max(cdf, below)
+        probs[g] = cdf - below
+        below = cdf
+    probs[None] = 1.0 - below
+    return probs
+
+def predict(spec: DispenserInput, hours: Sequence[float], energy_kWh: Sequence[float],
+            start_h: float = 0.0, confidence: float = 0.99, min_hours: float = 6.0,
+            block_h: float = 1.0, meter_rel_uncertainty: float = 0.01) -> EarlyStopDecision:
+    """
+    对进行中的测试给出推估等级及是否可提前终止：
+    已进行至少 min_hours 小时，且「1 级」或「不合格」的机率达 confidence 时可终止。
+    """
+    fit = fit_energy_curve(hours, energy_kWh, start_h, block_h, meter_rel_uncertainty)
+    if math.isnan(fit.E24_kWh):
+        probs = {g: math.nan for g in (1, 2, 3, 4, 5, None)}
+        return EarlyStopDecision(fit, probs, None, False, "尚无数据")
+
+    probs = grade_probabilities(fit.E24_kWh, fit.sigma_kWh, e24_thresholds(spec))
+    predicted = max(probs, key=lambda g: probs[g])
+
+    if fit.elapsed_h >= TEST_HOURS:
+        return EarlyStopDecision(fit, probs, predicted, False, "已完成 24h 测试")
+    if fit.elapsed_h < min_hours:
+        return EarlyStopDecision(fit, probs, predicted, False, f"未满 {min_hours:g} h")
+    if probs[1] >= confidence:
+        return EarlyStopDecision(fit, probs, 1, True, "确定 1 级")
+    if probs[None] >= confidence:
+        return EarlyStopDecision(fit, probs, None, True, "确定不合格")
+    return EarlyStopDecision(fit, probs, predicted, False, "结果未确定")
+
+# --- 归档回测 ---
+
+def read_energy_log(filename: str) -> Tuple[List[float], List[float]]:
+    """
+    读取电能记录 CSV（字段 elapsed_h, energy_kWh），依时间排序
+    """
+    with open(filename, 'r', encoding='utf-8-sig') as f:
+        rows = [(float(r['elapsed_h']), float(r['energy_kWh'])) for r in csv.DictReader(f)]
+    rows.sort()
+    return [t for t, _ in rows], [e for _, e in rows]
+
+def _final_grade(spec: DispenserInput, E24_kWh: float) -> Optional[int]:
+    actual = replace(spec, E24_kWh=E24_kWh)
+    if isinstance(actual, ColdHotDispenserInput):
+        return evaluate_cold_hot(actual)['grade']
+    return evaluate(actual)['grade']
+
+def backtest_unit(spec: DispenserInput, hours: Sequence[float], energy_kWh: Sequence[float],
+                  start_h: float = 0.0, step_h: float = 0.25, **kwargs) -> Dict:
+    """
+    以 step_h 为间隔重播单一测试的记录，找出第一个可终止的时点，
+    并与完整 24h 的实际等级比较。
+    """
+    E24_actual = (_energy_at(start_h + TEST_HOURS, hours, energy_kWh)
+                  - _energy_at(start_h, hours, energy_kWh))
+    actual = _final_grade(spec, E24_actual)
+
+    t = step_h
+    while t < TEST_HOURS:
+        n = bisect_left(hours, start_h + t) + 1
+        decision = predict(spec, hours[:n], energy_kWh[:n], start_h, **kwargs)
+        if decision.can_stop:
+            return {
+                "stopped_at_h": decision.fit.elapsed_h,
+                "hours_saved": TEST_HOURS - decision.fit.elapsed_h,
+                "E24_projected_kWh": decision.fit.E24_kWh,
+                "E24_actual_kWh": E24_actual,
+                "predicted_grade": decision.predicted_grade,
+                "actual_grade": actual,
+                "misclassified": decision.predicted_grade != actual,
+            }
+        t += step_h
+    return {
+        "stopped_at_h": TEST_HOURS,
+        "hours_saved": 0.0,
+        "E24_projected_kWh": E24_actual,
+        "E24_actual_kWh": E24_actual,
+        "predicted_grade": actual,
+        "actual_grade": actual,
+        "misclassified": False,
+    }
+
+def backtest(archive_file: str, step_h: float = 0.25, **kwargs) -> List[Dict]:
+    """
+    重播归档索引中的所有测试，log 路径相对于索引文件所在目录
+    """
+    base = os.path.dirname(os.path.abspath(archive_file))
+    results = []
+    with open(archive_file, 'r', encoding='utf-8-sig') as f:
+        for idx, row in enumerate(csv.DictReader(f), 1):
+            try:
+                spec = input_from_record(dict(row, E24_kWh="nan"))
+                hours, energy = read_energy_log(os.path.join(base, row['log']))
+                start_h = float(row.get('start_h') or 0.0)
+                r = backtest_unit(spec, hours, energy, start_h, step_h, **kwargs)
+            except (KeyError, ValueError, OSError) as e:
+                print(f"  ❌ 第 {idx} 行回测失败：{e}")
+                continue
+            r = dict({"序号": idx, "型号": row.get('型号', f'测试{idx}')}, **r)
+            results.append(r)
+    return results
+
+def summarize(results: List[Dict]) -> Dict:
+    """
+    统计节省时数与误判率（误判率以提前终止的测试为分母）
+    """
+    stopped = [r for r in results if r['hours_saved'] > 0]
+    wrong = sum(1 for r in stopped if r['misclassified'])
+    return {
+        "tests": len(results),
+        "stopped_early": len(stopped),
+        "hours_saved_total": sum(r['hours_saved'] for r in results),
+        "hours_saved_mean": (sum(r['hours_saved'] for r in results) / len(results)) if results else 0.0,
+        "misclassified": wrong,
+        "misclassification_rate": (wrong / len(stopped)) if stopped else 0.0,
+    }
+
+def main():
+    import sys
+
+    if len(sys.argv) < 2:
+        print("使用方法：python HCD3_EnergyLevel_Cal_EarlyStop.py archive.csv [report.csv]")
+        return
+
+    print("=" * 70)
+    print("提前终止预测 - 归档回测")
+    print("=" * 70)
+
+    results = backtest(sys.argv[1])
+    if not results:
+        print("❌ 没有可回测的数据")
+        return
+
+    if len(sys.argv) > 2:
+        from HCD3_EnergyLevel_Cal_Batch import write_csv
+        write_csv(sys.argv[2], results)
+
+    s = summarize(results)
+    print(f"  回测数：{s['tests']}")
+    print(f"  提前终止：{s['stopped_early']} ({s['stopped_early']/s['tests']*100:.1f}%)")
+    print(f"  节省恒温室时数：{s['hours_saved_total']:.1f} h（平均 {s['hours_saved_mean']:.2f} h/台）")
+    print(f"  误判：{s['misclassified']}（误判率 {s['misclassification_rate']*100:.2f}%）")
+    print("=" * 70)
+
+if __name__ == "__main__":
+    main()
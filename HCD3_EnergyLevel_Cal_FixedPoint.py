@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HCD3 定点整数评估（四舍五入）
+法规要求「第 4 位四舍五入」，而 Python round() 对二进制浮点数采用银行家舍入且受表示误差影响，
+恰为 5 的进位时可能与法规不同。本模块以缩放整数计算，只在法规规定处以四舍五入（half-up）舍入：
+  输入：E24 以 µkWh、温度以 m°C、容量以 mL 读入（超出精度的部分四舍五入）
+  V、V1、V2 → 0.1 L（deci-L）
+  K1、K2    → 0.001（milli）
+  E_st,24   → 0.001 kWh
+  容许基准  → 0.001 kWh
+分级上限（a × V + b）与 Veq 以有理数整数精确表示，比较时不会有浮点误差。
+系数与分段取自适用的基准版本（Core.standard）；该版本的舍入位数须与上列缩放相同。
+
+提供标量（Python int）与 NumPy int64 两种实现，并可与浮点版本逐台比对，列出判定不同的输入。
+
+使用方法：
+  python HCD3_EnergyLevel_Cal_FixedPoint.py input.csv [差异清单.csv]
+"""
+
+import math
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from HCD3_EnergyLevel_Cal_Core import (
+    HOT_WARM, COLD_HOT, HotWarmDispenserInput, ColdHotDispenserInput, standard,
+)
+
+GRADES = (1, 2, 3, 4, 5)
+
+E_SCALE = 1_000_000     # E24：µkWh
+T_SCALE = 1_000         # 温度：m°C
+V_SCALE = 1_000         # 容量：mL
+VEQ_DEN = 30_000        # Veq = Veq3 / 30000 L（V 为 deci-L、K 为 milli，再除以 3）
+V_DEN = 10              # V = V_dL / 10 L
+
+# 上列缩放对应的舍入位数（基准版本的 rounding）
+FIXED_ROUNDING = {
+    HOT_WARM: (("V", 1), ("E_st24", 3)),
+    COLD_HOT: (("V", 1), ("K", 3), ("E_standard", 3)),
+}
+
+def div_half_up(n: int, d: int) -> int:
+    """
+    整数除法 n / d 四舍五入（远离零），d ≠ 0
+    """
+    q = (2 * abs(n) + abs(d)) // (2 * abs(d))
+    return q if (n >= 0) == (d > 0) else -q
+
+def _scaled(x: float, scale: int) -> int:
+    # 浮点输入转为缩放整数（最接近的整数，恰为 .5 时进位）
+    return math.floor(x * scale + 0.5)
+
+def _milli(c: float) -> int:
+    # 系数须为 0.001 的整数倍（附表皆为 3 位小数）
+    m = round(c * 1000)
+    if abs(m - c * 1000) > 1e-6:
+        raise ValueError(f"系数 {c} 不是 0.001 的整数倍，无法以定点表示")
+    return m
+
+def _coeff_table(coeffs) -> Dict[int, Tuple[int, int]]:
+    return {g: (_milli(a), _milli(b)) for g, (a, b) in coeffs.items()}
+
+@lru_cache(maxsize=None)
+def _segments(version) -> Tuple[Tuple[int, ...], Tuple[Dict[int, Tuple[int, int]], ...]]:
+    """
+    基准版本的分段上限（mL）与各段 milli 系数表；舍入位数与定点缩放不同时拋出 ValueError
+    """
+    if version.rounding != FIXED_ROUNDING[version.kind]:
+        raise ValueError(f"{version.id}：舍入位数 {dict(version.rounding)} 与定点缩放不同，无法以定点计算")
+    bounds = tuple(_scaled(seg.upper_L, 1000) for seg in version.segments[:-1])
+    tables = tuple(_coeff_table(dict(zip(GRADES, seg.coeffs))) for seg in version.segments)
+    return bounds, tables
+
+def _segment(bounds: Tuple[int, ...], x: int, den: int) -> int:
+    # 与 Core 的分段查找相同：第一个 x / den ≤ 上限 的分段
+    for i, upper in enumerate(bounds):
+        if x * 1000 <= upper * den:
+            return i
+    return len(bounds)
+
+def _first_grade(value: int, limits: Dict[int, int]) -> Optional[int]:
+    for g in GRADES:
+        if value <= limits[g]:
+            return g
+    return None
+
+# --- 温热型 ---
+
+def evaluate_fixed(input: HotWarmDispenserInput) -> dict:
+    """
+    温热型定点评估。键与 Core.evaluate() 相同（数值换算回 float 供显示），
+    另含 *_int 键：E_st24_mkWh（0.001 kWh）、V_dL（0.1 L）、limits_e4（0.0001 kWh）。
+    """
+    E = _scaled(input.E24_kWh, E_SCALE)
+    Th = _scaled(input.T_hot24_C, T_SCALE)
+    Ta = _scaled(input.T_amb_C, T_SCALE)
+    V = div_half_up(_scaled(input.V_marked_L, V_SCALE), 100)
+
+    num = Th - Ta                   # K = num / den
+    den = 100 * T_SCALE - Ta
+    # E_st,24 = E24 / K，E24 为 µkWh → 除以 1000 得 mkWh
+    Est = div_half_up(E * den, num * 1000)
+    # 上限 a × V + b：a、b 为 milli，V 为 deci → 单位 0.0001 kWh
+    bounds, tables = _segments(standard(HOT_WARM).version)
+    limits = {g: a * V + b * 10 for g, (a, b) in tables[_segment(bounds, V, V_DEN)].items()}
+    grade = _first_grade(Est * 10, limits)
+    return {
+        "K": round(num / den, 6),
+        "E_st24_kWh": Est / 1000,
+        "limits_kWh": {g: L / 10_000 for g, L in limits.items()},
+        "MEPS_kWh": limits[5] / 10_000,
+        "grade": grade,
+        "is_meps_pass": Est * 10 <= limits[5],
+        "E_st24_mkWh": Est,
+        "V_dL": V,
+        "limits_e4": limits,
+    }
+
+# --- 冰温热型 ---
+
+def evaluate_cold_hot_fixed(input: ColdHotDispenserInput) -> dict:
+    """
+    冰温热型定点评估。键与 Core.evaluate_cold_hot() 相同，另含
+    K1_milli、K2_milli、Veq3（Veq × 30000）、E_standard_mkWh 与 limits_q（单位 1/3e7 kWh）。
+    """
+    E = _scaled(input.E24_kWh, E_SCALE)
+    Th = _scaled(input.T_hot_C, T_SCALE)
+    Tc = _scaled(input.T_cold_C, T_SCALE)
+    Ta = _scaled(input.T_amb_C, T_SCALE)
+    V1 = div_half_up(_scaled(input.V_hot_L, V_SCALE), 100)
+    V2 = div_half_up(_scaled(input.V_cold_L, V_SCALE), 100)
+
+    K1 = div_half_up((Th - Ta) * 1000, 100 * T_SCALE - Ta)
+    K2 = div_half_up((Ta - Tc) * 1000, Ta)
+    Veq3 = 3 * V1 * K1 + V2 * K2
+    bounds, tables = _segments(standard(COLD_HOT).version)
+    coeffs = tables[_segment(bounds, Veq3, VEQ_DEN)]
+    # 上限 a × Veq + b：单位 0.001 / 30000 kWh
+    limits = {g: a * Veq3 + b * VEQ_DEN for g, (a, b) in coeffs.items()}
+    E_standard = div_half_up(limits[5], VEQ_DEN)        # mkWh
+    E_q = E * 30                                        # µkWh → 1/3e7 kWh
+    margin = E_standard * 1000 - E                      # µkWh
+    # margin / (E_standard × 1000) × 100 %，计算至 0.1 %
+    margin_percent = div_half_up(margin, E_standard) / 10 if E_standard > 0 else 0
+    return {
+        "K1": K1 / 1000,
+        "K2": K2 / 1000,
+        "V_hot_L": V1 / 10,
+        "V_cold_L": V2 / 10,
+        "Veq_L": div_half_up(Veq3, 30) / 1000,
+        "E24_kWh": div_half_up(E, 1000) / 1000,
+        "E_standard_kWh": E_standard / 1000,
+        "limits_kWh": {g: L / (1000 * VEQ_DEN) for g, L in limits.items()},
+        "grade": _first_grade(E_q, limits),
+        "is_qualified": E <= E_standard * 1000,
+        "margin_kWh": div_half_up(margin, 1000) / 1000,
+        "margin_percent": margin_percent,
+        "K1_milli": K1,
+        "K2_milli": K2,
+        "Veq3": Veq3,
+        "E_standard_mkWh": E_standard,
+        "limits_q": limits,
+    }
+
+# --- NumPy int64 批量 ---
+
+def _np():
+    import numpy
+    return numpy
+
+def div_half_up_array(n, d):
+    """
+    逐元素整数除法四舍五入（远离零），int64
+    """
+    np = _np()
+    n = np.asarray(n, dtype=np.int64)
+    d = np.asarray(d, dtype=np.int64)
+    q = (2 * np.abs(n) + np.abs(d)) // (2 * np.abs(d))
+    return np.where((n >= 0) == (d > 0), q, -q)
+
+def _scaled_array(x, scale: int):
+    np = _np()
+    return np.floor(np.asarray(x, dtype=float) * scale + 0.5).astype(np.int64)
+
+def _limits_array(kind: str, x, den: int) -> Dict[int, object]:
+    # 逐元素分级上限 a × (x / den) + b，单位 0.001 / den kWh（分段以 np.searchsorted 查找）
+    np = _np()
+    bounds, tables = _segments(standard(kind).version)
+    A = np.array([[t[g][0] for g in GRADES] for t in tables], dtype=np.int64)
+    B = np.array([[t[g][1] for g in GRADES] for t in tables], dtype=np.int64)
+    seg = np.searchsorted(np.array(bounds, dtype=np.int64) * den, x * 1000, side='left')
+    return {g: A[seg, g - 1] * x + B[seg, g - 1] * den for g in GRADES}
+
+def _classify_int(value, limits: Dict[int, object]):
+    import HCD3_EnergyLevel_Cal_Vector as vec
+    np = _np()
+    grade = np.full(np.shape(value), vec.FAIL, dtype=np.int8)
+    for g in (5, 4, 3, 2, 1):
+        np.copyto(grade, g, where=value <= limits[g])
+    return grade
+
+def evaluate_fixed_columns(E24_kWh, T_hot24_C, T_amb_C, V_marked_L) -> Dict[str, object]:
+    """
+    温热型定点批量评估（int64），回传 E_st24_mkWh、V_dL、limits_e4、grade（0 为不合格）、is_meps_pass
+    """
+    np = _np()
+    E = _scaled_array(E24_kWh, E_SCALE)
+    Ta = _scaled_array(T_amb_C, T_SCALE)
+    num = _scaled_array(T_hot24_C, T_SCALE) - Ta
+    den = 100 * T_SCALE - Ta
+    V = div_half_up_array(_scaled_array(V_marked_L, V_SCALE), 100)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Est = div_half_up_array(E * den, num * 1000)
+    limits = _limits_array(HOT_WARM, V, V_DEN)
+    Est10 = Est * 10
+    return {
+        "E_st24_mkWh": Est,
+        "V_dL": V,
+        "limits_e4": limits,
+        "grade": _classify_int(Est10, limits),
+        "is_meps_pass": Est10 <= limits[5],
+    }
+
+def evaluate_cold_hot_fixed_columns(E24_kWh, T_hot_C, T_cold_C, T_amb_C, V_hot_L, V_cold_L) -> Dict[str, object]:
+    """
+    冰温热型定点批量评估（int64），回传 K1_milli、K2_milli、Veq3、E_standard_mkWh、limits_q、grade、is_qualified
+    """
+    np = _np()
+    E = _scaled_array(E24_kWh, E_SCALE)
+    Ta = _scaled_array(T_amb_C, T_SCALE)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        K1 = div_half_up_array((_scaled_array(T_hot_C, T_SCALE) - Ta) * 1000, 100 * T_SCALE - Ta)
+        K2 = div_half_up_array((Ta - _scaled_array(T_cold_C, T_SCALE)) * 1000, Ta)
+    V1 = div_half_up_array(_scaled_array(V_hot_L, V_SCALE), 100)
+    V2 = div_half_up_array(_scaled_array(V_cold_L, V_SCALE), 100)
+    Veq3 = 3 * V1 * K1 + V2 * K2
+
+    limits = _limits_array(COLD_HOT, Veq3, VEQ_DEN)
+    E_standard = div_half_up_array(limits[5], VEQ_DEN)
+    return {
+        "K1_milli": K1,
+        "K2_milli": K2,
+        "Veq3": Veq3,
+        "E_standard_mkWh": E_standard,
+        "limits_q": limits,
+        "grade": _classify_int(E * 30, limits),
+        "is_qualified": E <= E_standard * 1000,
+    }
+
+# --- 与浮点版本比对 ---
+
+def differential(kind: str, columns: Dict[str, object]) -> Dict[str, object]:
+    """
+    以 Vector（浮点，与 Core 一致）与定点批量版本评估同一批数据，
+    回传逐台 grade_float / grade_fixed、指标差异与判定不同的行号 rows（等级或合格判定不同）。
+    """
+    import HCD3_EnergyLevel_Cal_Vector as vec
+    np = _np()
+    args = [columns[k] for k in vec.fields_of(kind)]
+    if kind == vec.COLD_HOT:
+        ref = vec.evaluate_cold_hot_columns(*args)
+        fix = evaluate_cold_hot_fixed_columns(*args)
+        value_float = ref["E_standard_kWh"]
+        value_fixed = fix["E_standard_mkWh"] / 1000
+        ok_float, ok_fixed = ref["is_qualified"], fix["is_qualified"]
+        metric = "E_standard_kWh"
+    else:
+        ref = vec.evaluate_columns(*args)
+        fix = evaluate_fixed_columns(*args)
+        value_float = ref["E_st24_kWh"]
+        value_fixed = fix["E_st24_mkWh"] / 1000
+        ok_float, ok_fixed = ref["is_meps_pass"], fix["is_meps_pass"]
+        metric = "E_st24_kWh"
+    differs = (ref["grade"] != fix["grade"]) | (ok_float != ok_fixed)
+    return {
+        "metric": metric,
+        "grade_float": ref["grade"],
+        "grade_fixed": fix["grade"],
+        "value_float": value_float,
+        "value_fixed": value_fixed,
+        "value_differs": np.flatnonzero(value_float != value_fixed),
+        "rows": np.flatnonzero(differs),
+    }
+
+def main():
+    import sys
+    import time
+    import HCD3_EnergyLevel_Cal_Vector as vec
+
+    if len(sys.argv) < 2:
+        print("使用方法：python HCD3_EnergyLevel_Cal_FixedPoint.py input.csv [差异清单.csv]")
+        return
+
+    kind, columns, labels = vec.read_columns(sys.argv[1])
+    print("=" * 70)
+    print("定点整数（四舍五入）与浮点评估比对")
+    print("=" * 70)
+    t0 = time.perf_counter()
+    diff = differential(kind, columns)
+    print(f"  {len(labels):,} 台，耗时 {time.perf_counter() - t0:.2f} s")
+    print(f"  {diff['metric']} 不同：{diff['value_differs'].size:,} 台")
+    print(f"  等级 / 合格判定不同：{diff['rows'].size:,} 台")
+
+    def grade_label(g):
+        return "不合格" if g == vec.FAIL else f"{g}级"
+
+    listing: List[Dict] = []
+    for r in diff["rows"].tolist():
+        listing.append({
+            "序号": r + 1,
+            "型号": labels[r],
+            **{k: float(columns[k][r]) for k in vec.fields_of(kind)},
+            f"{diff['metric']}_浮点": f"{diff['value_float'][r]:.3f}",
+            f"{diff['metric']}_定点": f"{diff['value_fixed'][r]:.3f}",
+            "等级_浮点": grade_label(int(diff["grade_float"][r])),
+            "等级_定点": grade_label(int(diff["grade_fixed"][r])),
+        })
+    for item in listing[:20]:
+        print(f"    {item['型号']}: {item['等级_浮点']} → {item['等级_定点']}")
+    if len(sys.argv) > 2 and listing:
+        from HCD3_EnergyLevel_Cal_Batch import write_csv
+        write_csv(sys.argv[2], listing)
+    print("=" * 70)
+
+if __name__ == "__main__":
+    main()
@@ -9,8 +9,8 @@ HCD3 饮水机能源效率计算器 - GUI版本 V2
 import tkinter as tk
 from tkinter import ttk, messagebox
 from HCD3_EnergyLevel_Cal_Core import (
-    HotWarmDispenserInput, ColdHotDispenserInput,
-    evaluate, evaluate_cold_hot
+    HotWarmDispenserInput, ColdHotDispenserInput, HOT_WARM, COLD_HOT,
+    evaluate_fused, evaluate_cold_hot_fused, standard
 )
 
 # 多语言支持
@@ -38,6 +38,7 @@ LANGUAGES = {
         'Veq_label': '等效內容量 Veq:',
         'MEPS_label': '容許基準 MEPS:',
         'E_standard_label': '容許耗用能源基準:',
+        'standard_label': '適用基準版本:',
         'grade_label': '能源效率等級:',
         'energy_label_label': '節能標章:',
         'grade_thresholds': '能效分級門檻',
@@ -81,6 +82,7 @@ LANGUAGES = {
         'Veq_label': 'Equivalent Volume Veq:',
         'MEPS_label': 'MEPS Standard:',
         'E_standard_label': 'Energy Consumption Standard:',
+        'standard_label': 'Applicable Standard:',
         'grade_label': 'Energy Efficiency Grade:',
         'energy_label_label': 'Energy Label:',
         'grade_thresholds': 'Grade Thresholds',
@@ -124,6 +126,7 @@ LANGUAGES = {
         'Veq_label': '등가 용량 Veq:',
         'MEPS_label': 'MEPS 기준:',
         'E_standard_label': '에너지 소비 기준:',
+        'standard_label': '적용 기준 버전:',
         'grade_label': '에너지 효율 등급:',
         'energy_label_label': '에너지 라벨:',
         'grade_thresholds': '등급 임계값',
@@ -417,7 +420,7 @@ class CNS3910CalculatorV2:
             V_marked_L=V
         )
         
-        result = evaluate(input_data)
+        result = evaluate_fused(input_data)
         self.display_hot_warm_results(result)
     
     def calculate_cold_hot(self):
@@ -447,7 +450,7 @@ class CNS3910CalculatorV2:
             V_cold_L=V_cold
         )
         
-        result = evaluate_cold_hot(input_data)
+        result = evaluate_cold_hot_fused(input_data)
         self.display_cold_hot_results(result)
     
     def display_hot_warm_results(self, result):
@@ -461,6 +464,7 @@ class CNS3910CalculatorV2:
             (lang['K_label'], f"{result['K']:.6f}"),
             (lang['Est24_label'], f"{result['E_st24_kWh']:.3f} {lang['kWh_unit']}"),
             (lang['MEPS_label'], f"{result['MEPS_kWh']:.3f} {lang['kWh_unit']}"),
+            (lang['standard_label'], standard(HOT_WARM).version.id),
         ]
         
         for label_text, value_text in results_data:
@@ -496,6 +500,7 @@ class CNS3910CalculatorV2:
             (lang['Veq_label'], f"{result['Veq_L']:.3f} {lang['L_unit']}"),
             (lang['E_standard_label'], f"{result['E_standard_kWh']:.3f} {lang['kWh_unit']}"),
             (f"E24 {lang['kWh_unit']}", f"{result['E24_kWh']:.3f} {lang['kWh_unit']}"),
+            (lang['standard_label'], standard(COLD_HOT).version.id),
         ]
         
         for label_text, value_text in results_data:
@@ -7,7 +7,7 @@ HCD3 冰温热型饮水供应机能效计算器 - 简化版GUI
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-from HCD3_EnergyLevel_Cal_Core import ColdHotDispenserInput, evaluate_cold_hot
+from HCD3_EnergyLevel_Cal_Core import ColdHotDispenserInput, COLD_HOT, evaluate_cold_hot, standard
 
 # 多语言支持
 LANGUAGES = {
@@ -28,6 +28,7 @@ LANGUAGES = {
         'K2_label': '冰水校正係數 K2:',
         'Veq_label': '等效內容量 Veq:',
         'E_standard_label': '容許耗用能源基準:',
+        'standard_label': '適用基準版本:',
         'grade_label': '能源效率等級:',
         'grade_thresholds': '能效分級門檻',
         'grade_1': '1級 (最高效)',
@@ -63,6 +64,7 @@ LANGUAGES = {
         'K2_label': 'Cold Water Factor K2:',
         'Veq_label': 'Equivalent Volume Veq:',
         'E_standard_label': 'Energy Consumption Standard:',
+        'standard_label': 'Applicable Standard:',
         'grade_label': 'Energy Efficiency Grade:',
         'grade_thresholds': 'Grade Thresholds',
         'grade_1': 'Grade 1 (Best)',
@@ -98,6 +100,7 @@ LANGUAGES = {
         'K2_label': '냉수 보정 계수 K2:',
         'Veq_label': '등가 용량 Veq:',
         'E_standard_label': '에너지 소비 기준:',
+        'standard_label': '적용 기준 버전:',
         'grade_label': '에너지 효율 등급:',
         'grade_thresholds': '등급 임계값',
         'grade_1': '1등급 (최고 효율)',
@@ -465,6 +468,7 @@ class HCD3ColdHotCalculator:
             (lang['Veq_label'], f"{result['Veq_L']:.3f} {lang['L_unit']}"),
             (lang['E_standard_label'], f"{result['E_standard_kWh']:.3f} {lang['kWh_unit']}"),
             (f"E24 {lang['kWh_unit']}", f"{result['E24_kWh']:.3f} {lang['kWh_unit']}"),
+            (lang['standard_label'], standard(COLD_HOT).version.id),
         ]
         
         for label_text, value_text in results_data:
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HCD3 后台批量任务
+大批量不必占着 HTTP 连线等结果：提交 CSV / NDJSON 取得任务 id，
+由工作线程池以 HCD3_EnergyLevel_Cal_Batch 的处理流程（解析 → 整块检核 → 计算 → 坏行隔离）执行，
+客户端轮询进度并分页下载结果。任务状态与结果存于本机 SQLite，服务重启后未完成的任务重新排队。
+
+端点（挂在 HCD3_EnergyLevel_Cal_Server 上）：
+  POST   /jobs                          内容为 CSV（text/csv）或 NDJSON（application/x-ndjson，
+                                        或 ?format=ndjson）；回 202 {"id", "status"}，队列已满回 429
+  GET    /jobs/<id>                     状态与进度 {"status", "total", "done", "accepted", "rejected", ...}
+  GET    /jobs/<id>/results?offset=&limit=      分页结果（依序号）
+  GET    /jobs/<id>/quarantine?offset=&limit=   分页隔离行（原始字段 + 原因代码）
+  DELETE /jobs/<id>                     删除已结束的任务
+目前沿用 Batch 的温热型处理流程。
+
+使用方法：
+  python HCD3_EnergyLevel_Cal_Jobs.py [--db hcd3_jobs.sqlite] [--workers 2] [--queue 16] [--host 127.0.0.1] [--port 8765]
+"""
+
+import csv
+import io
+import json
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from HCD3_EnergyLevel_Cal_Batch import QUARANTINE_REASONS, process_rows
+from HCD3_EnergyLevel_Cal_Server import RequestError
+
+DEFAULT_DB = "hcd3_jobs.sqlite"
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE = 16              # 排队中（未开始）任务上限，超过回 429
+JOB_CHUNK_ROWS = 2048           # 每处理这么多行写入一次结果与进度
+PAGE_LIMIT = 1000               # 分页下载每页上限
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+FORMAT_CSV, FORMAT_NDJSON = "csv", "ndjson"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    format TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    done INTEGER NOT NULL DEFAULT 0,
+    accepted INTEGER NOT NULL DEFAULT 0,
+    rejected INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS job_rows (
+    job_id TEXT NOT NULL,
+    kind TEXT NOT NULL,             -- 'result' / 'quarantine'
+    seq INTEGER NOT NULL,           -- 原始序号（1 起算）
+    data TEXT NOT NULL,             -- JSON
+    PRIMARY KEY (job_id, kind, seq)
+);
+"""
+
+class JobQueueFull(Exception):
+    pass
+
+def parse_payload(payload: bytes, fmt: str) -> List[Dict]:
+    """
+    CSV（首行为字段名）或 NDJSON（每行一个 JSON 对象）解析为记录清单；数值保留原始文字
+    """
+    text = payload.decode("utf-8-sig")
+    if fmt == FORMAT_NDJSON:
+        records = []
+        for n, line in enumerate(text.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                raise ValueError(f"NDJSON 第 {n} 行格式错误")
+            if not isinstance(record, dict):
+                raise ValueError(f"NDJSON 第 {n} 行不是 JSON 对象")
+            records.append({k: ("" if v is None else str(v)) for k, v in record.items()})
+        return records
+    return list(csv.DictReader(io.StringIO(text)))
+
+class _RowSink:
+    """
+    收集隔离行（与 Batch.QuarantineWriter 相同的 add 介面）
+    """
+
+    def __init__(self):
+        self.rows: List[Tuple[int, Dict]] = []
+
+    def add(self, idx: int, row: Dict, reasons: List[Tuple[str, str]]):
+        entry = {k: v for k, v in row.items() if k is not None}
+        entry["原因代码"] = ";".join(code for _, code in reasons)
+        entry["原因说明"] = "；".join(f"{field}：{QUARANTINE_REASONS.get(code, code)}" for field, code in reasons)
+        self.rows.append((idx, entry))
+
+class JobStore:
+    """
+    SQLite 任务存储（单一连线 + 锁，供服务线程与工作线程共用）
+    """
+
+    def __init__(self, path: str = DEFAULT_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._lock, self._db:
+            if path != ":memory:":
+                self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+
+    def create(self, payload: bytes, fmt: str, total: int) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock, self._db:
+            self._db.execute("INSERT INTO jobs (id, status, format, payload, total, created) VALUES (?, ?, ?, ?, ?, ?)",
+                             (job_id, QUEUED, fmt, payload, total, time.time()))
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._db.execute("SELECT id, status, format, total, done, accepted, rejected, created, started, "
+                                   "finished, error FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def payload(self, job_id: str) -> Tuple[bytes, str]:
+        with self._lock:
+            row = self._db.execute("SELECT payload, format FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bytes(row["payload"]), row["format"]
+
+    def start(self, job_id: str):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM job_rows WHERE job_id = ?", (job_id,))
+            self._db.execute("UPDATE jobs SET status = ?, started = ?, done = 0, accepted = 0, rejected = 0 "
+                             "WHERE id = ?", (RUNNING, time.time(), job_id))
+
+    def append(self, job_id: str, results: List[Dict], rejected: List[Tuple[int, Dict]], done: int):
+        rows = [(job_id, "result", int(r["序号"]), json.dumps(r, ensure_ascii=False)) for r in results]
+        rows += [(job_id, "quarantine", idx, json.dumps(r, ensure_ascii=False)) for idx, r in rejected]
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO job_rows (job_id, kind, seq, data) VALUES (?, ?, ?, ?)", rows)
+            self._db.execute("UPDATE jobs SET done = ?, accepted = accepted + ?, rejected = rejected + ? WHERE id = ?",
+                             (done, len(results), len(rejected), job_id))
+
+    def finish(self, job_id: str, error: Optional[str] = None):
+        with self._lock, self._db:
+            self._db.execute("UPDATE jobs SET status = ?, finished = ?, error = ? WHERE id = ?",
+                             (FAILED if error else DONE, time.time(), error, job_id))
+
+    def page(self, job_id: str, kind: str, offset: int, limit: int) -> List[Dict]:
+        with self._lock:
+            rows = self._db.execute("SELECT seq, data FROM job_rows WHERE job_id = ? AND kind = ? "
+                                    "ORDER BY seq LIMIT ? OFFSET ?", (job_id, kind, limit, offset)).fetchall()
+        out = []
+        for row in rows:
+            data = json.loads(row["data"])
+            data.setdefault("序号", row["seq"])
+            out.append(data)
+        return out
+
+    def delete(self, job_id: str):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM job_rows WHERE job_id = ?", (job_id,))
+            self._db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def unfinished(self) -> List[str]:
+        """
+        排队中或执行中（上次服务中断）的任务，依建立时间排序
+        """
+        with self._lock:
+            rows = self._db.execute("SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created",
+                                    (QUEUED, RUNNING)).fetchall()
+        return [r["id"] for r in rows]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+class JobManager:
+    """
+    工作线程池：workers 个线程依序执行任务；排队中任务达 queue_limit 时 submit() 拋出 JobQueueFull
+    """
+
+    def __init__(self, store: JobStore, workers: int = DEFAULT_WORKERS, queue_limit: int = DEFAULT_QUEUE):
+        self.store = store
+        self.queue_limit = queue_limit
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._waiting = 0
+        # 上次中断的任务先排回队列（不受 queue_limit 限制）
+        for job_id in store.unfinished():
+            self._enqueue(job_id)
+        self._threads = [threading.Thread(target=self._work, name=f"hcd3-job-{i}", daemon=True)
+                         for i in range(max(workers, 1))]
+        for t in self._threads:
+            t.start()
+
+    def _enqueue(self, job_id: str):
+        with self._lock:
+            self._waiting += 1
+        self._queue.put(job_id)
+
+    def submit(self, payload: bytes, fmt: str) -> str:
+        """
+        解析并建立任务（格式错误拋出 ValueError），回传任务 id
+        """
+        records = parse_payload(payload, fmt)
+        with self._lock:
+            if self._waiting >= self.queue_limit:
+                raise JobQueueFull(f"排队中任务已达上限 {self.queue_limit}")
+            self._waiting += 1
+        try:
+            job_id = self.store.create(payload, fmt, len(records))
+        except Exception:
+            with self._lock:
+                self._waiting -= 1
+            raise
+        self._queue.put(job_id)
+        return job_id
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                break
+            with self._lock:
+                self._waiting -= 1
+            try:
+                self.run(job_id)
+            finally:
+                self._queue.task_done()
+
+    def run(self, job_id: str):
+        """
+        以 Batch.process_rows() 逐块执行，每块写入结果、隔离行与进度
+        """
+        store = self.store
+        store.start(job_id)
+        try:
+            payload, fmt = store.payload(job_id)
+            records = parse_payload(payload, fmt)
+            total = len(records)
+            for start in range(0, total, JOB_CHUNK_ROWS):
+                chunk = list(enumerate(records[start:start + JOB_CHUNK_ROWS], start + 1))
+                sink = _RowSink()
+                results, _ = process_rows(chunk, total, sink, verbose=False)
+                store.append(job_id, results, sink.rows, start + len(chunk))
+        except Exception as e:
+            store.finish(job_id, f"{type(e).__name__}: {e}")
+            return
+        store.finish(job_id)
+
+    def join(self):
+        """
+        等待目前所有任务完成（测试与脚本用）
+        """
+        self._queue.join()
+
+    def shutdown(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join()
+
+def _page_args(query: Dict[str, str]) -> Tuple[int, int]:
+    try:
+        offset = max(int(query.get("offset", 0)), 0)
+        limit = min(max(int(query.get("limit", PAGE_LIMIT)), 1), PAGE_LIMIT)
+    except ValueError:
+        raise RequestError(400, "offset / limit 须为整数")
+    return offset, limit
+
+def install(server, manager: JobManager):
+    """
+    在 Server.make_server() 建立的服务上注册 /jobs 端点
+    """
+    store = manager.store
+
+    def submit(path, query, raw, content_type):
+        if path.rstrip("/") != "/jobs":
+            raise RequestError(404, f"无此端点：{path}")
+        fmt = query.get("format") or (FORMAT_NDJSON if "ndjson" in content_type else FORMAT_CSV)
+        if fmt not in (FORMAT_CSV, FORMAT_NDJSON):
+            raise RequestError(400, f"不支持的格式：{fmt}")
+        if not raw:
+            raise RequestError(400, "任务内容为空")
+        try:
+            job_id = manager.submit(raw, fmt)
+        except JobQueueFull as e:
+            raise RequestError(429, str(e), headers={"Retry-After": "5"})
+        except (UnicodeDecodeError, ValueError, csv.Error) as e:
+            raise RequestError(400, f"内容格式错误：{e}")
+        return 202, {"id": job_id, "status": QUEUED, "status_url": f"/jobs/{job_id}"}
+
+    def _job(path) -> Tuple[Dict, List[str]]:
+        parts = path.strip("/").split("/")
+        job = store.get(parts[1]) if len(parts) >= 2 else None
+        if job is None:
+            raise RequestError(404, f"无此任务：{path}")
+        return job, parts[2:]
+
+    def get(path, query, raw, content_type):
+        job, rest = _job(path)
+        if not rest:
+            return 200, job
+        if rest in (["results"], ["quarantine"]):
+            kind = "result" if rest[0] == "results" else "quarantine"
+            offset, limit = _page_args(query)
+            rows = store.page(job["id"], kind, offset, limit)
+            count = job["accepted"] if kind == "result" else job["rejected"]
+            return 200, {"id": job["id"], "status": job["status"], "count": count,
+                         "offset": offset, "limit": limit, "rows": rows}
+        raise RequestError(404, f"无此端点：{path}")
+
+    def delete(path, query, raw, content_type):
+        job, rest = _job(path)
+        if rest:
+            raise RequestError(404, f"无此端点：{path}")
+        if job["status"] in (QUEUED, RUNNING):
+            raise RequestError(409, "任务尚未结束")
+        store.delete(job["id"])
+        return 200, {"id": job["id"], "deleted": True}
+
+    server.prefix_routes[("POST", "/jobs")] = submit
+    server.prefix_routes[("GET", "/jobs/")] = get
+    server.prefix_routes[("DELETE", "/jobs/")] = delete
+
+def main():
+    import sys
+    from HCD3_EnergyLevel_Cal_Server import DEFAULT_HOST, DEFAULT_PORT, make_server
+
+    args = sys.argv[1:]
+    opts = {"--db": DEFAULT_DB, "--workers": str(DEFAULT_WORKERS), "--queue": str(DEFAULT_QUEUE),
+            "--host": DEFAULT_HOST, "--port": str(DEFAULT_PORT)}
+    i = 0
+    while i < len(args):
+        if args[i] in opts and i + 1 < len(args):
+            opts[args[i]] = args[i + 1]
+            i += 2
+        else:
+            print(__doc__)
+            return
+
+    try:
+        store = JobStore(opts["--db"])
+        server = make_server(opts["--host"], int(opts["--port"]))
+    except (OSError, sqlite3.Error) as e:
+        print(f"❌ 无法启动服务：{e}")
+        return
+    manager = JobManager(store, int(opts["--workers"]), int(opts["--queue"]))
+    install(server, manager)
+    host, port = server.server_address[:2]
+    print("=" * 70)
+    print(f"HCD3 计算服务（含后台任务）：http://{host}:{port}")
+    print(f"  任务存储：{opts['--db']}（工作线程 {opts['--workers']}，排队上限 {opts['--queue']}）")
+    print("  POST /jobs    GET /jobs/<id>  /jobs/<id>/results  /jobs/<id>/quarantine")
+    print("  Ctrl+C 停止")
+    print("=" * 70)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n✓ 服务已停止")
+    finally:
+        server.server_close()
+        manager.shutdown()
+        store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HCD3 量测不确定度 Monte Carlo 分析
+依各输入的量测允差抽样，经批量引擎（与 evaluate() / evaluate_cold_hot() 结果一致）
+求出每台机器的等级机率分布，以及 E_st,24（温热型）或余裕量（冰温热型）的信赖区间。
+
+随机数以 SeedSequence(种子, spawn_key=(机器序号, 区块序号)) 产生，
+结果与进程数、区块分配方式无关，可完全重现。
+每台先以小样本（spawn_key=(机器序号,)）定出直方图范围，各区块在工作进程内即归并为
+摘要（总和与固定区间直方图；范围外的少数值保留原值），只有摘要回传主进程，
+内存用量与抽样次数无关。信赖区间端点落在直方图范围内时误差不超过一个区间宽度，
+落在范围外时为精确的样本分位数。
+
+使用方法：
+  python HCD3_EnergyLevel_Cal_MonteCarlo.py input.csv [output.csv] [--draws N] [--seed S]
+         [--jobs J] [--ci 0.95] [--dist uniform|normal] [--tol 字段=允差[%]] ...
+
+默认允差：温度 ±0.5 °C（热电偶），E24 ±1 %（功率计），容量不变（标示值）。
+"""
+
+from dataclasses import astuple, dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from HCD3_EnergyLevel_Cal_Core import ColdHotDispenserInput, input_from_record
+import HCD3_EnergyLevel_Cal_Vector as vec
+
+DEFAULT_DRAWS = 1_000_000
+CHUNK_DRAWS = 250_000
+PILOT_DRAWS = 10_000
+HIST_BINS = 4096
+
+@dataclass(frozen=True)
+class Tolerance:
+    # 单一输入的量测允差
+    width: float                # 半宽（uniform）或标准差（normal）
+    relative: bool = False      # True 时 width 为相对标称值的比例
+    dist: str = "uniform"       # "uniform" 或 "normal"
+
+DEFAULT_TOLERANCES: Dict[str, Tolerance] = {
+    "E24_kWh": Tolerance(0.01, relative=True),
+    "T_hot24_C": Tolerance(0.5),
+    "T_hot_C": Tolerance(0.5),
+    "T_cold_C": Tolerance(0.5),
+    "T_amb_C": Tolerance(0.5),
+}
+
+def parse_tolerance(spec: str, dist: str = "uniform") -> Tuple[str, Tolerance]:
+    """
+    解析「字段=允差」，允差以 % 结尾时为相对值，例如 E24_kWh=1%、T_amb_C=0.3
+    """
+    field, value = spec.split('=', 1)
+    value = value.strip()
+    if value.endswith('%'):
+        return field.strip(), Tolerance(float(value[:-1]) / 100, relative=True, dist=dist)
+    return field.strip(), Tolerance(float(value), dist=dist)
+
+def _draw(rng: np.random.Generator, x0: float, tol: Optional[Tolerance], n: int):
+    if tol is None or tol.width == 0:
+        return np.full(n, x0)
+    w = abs(x0) * tol.width if tol.relative else tol.width
+    if tol.dist == "normal":
+        return x0 + rng.normal(0.0, w, n)
+    return x0 + rng.uniform(-w, w, n)
+
+def _sample_metric(kind, nominal, tolerances, n, seed, key) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=key))
+    names = vec.fields_of(kind)
+    cols = {k: _draw(rng, x0, tolerances.get(k), n) for k, x0 in zip(names, nominal)}
+    result = vec.evaluate_any(kind, cols)
+    metric = result["margin_kWh"] if kind == vec.COLD_HOT else result["E_st24_kWh"]
+    return result["grade"], metric
+
+def _pilot_range(kind, nominal, tolerances, seed, u) -> Tuple[float, float]:
+    """
+    直方图范围：小样本指标的极值向两侧各延伸一半（与区块的随机数流互不重叠）
+    """
+    _, metric = _sample_metric(kind, nominal, tolerances, PILOT_DRAWS, seed, (u,))
+    finite = metric[np.isfinite(metric)]
+    if not finite.size:
+        return 0.0, 1.0
+    lo, hi = float(finite.min()), float(finite.max())
+    pad = (hi - lo) / 2 or max(abs(lo), 1.0) * 1e-6
+    return lo - pad, hi + pad
+
+class _MetricSummary:
+    """
+    指标的串流摘要：有限值个数、总和、固定范围直方图与范围外的原值。
+    工作进程以 add() 归并一个区块，主进程以 merge() 依区块顺序合并；
+    分位数在直方图内以区间线性插值求得，落在范围外时取原值的精确分位数。
+    """
+
+    def __init__(self, value_range: Tuple[float, float]):
+        self.range = value_range
+        self.n = 0
+        self.total = 0.0
+        self.hist = np.zeros(HIST_BINS, dtype=np.int64)
+        self.below = np.empty(0)
+        self.above = np.empty(0)
+
+    @property
+    def edges(self) -> np.ndarray:
+        return np.linspace(self.range[0], self.range[1], HIST_BINS + 1)
+
+    def add(self, metric: np.ndarray):
+        finite = metric[np.isfinite(metric)]
+        if not finite.size:
+            return
+        # 索引 0 为范围下方、HIST_BINS + 1 为范围上方，其余 i 为 [edges[i-1], edges[i])
+        idx = np.searchsorted(self.edges, finite, side='right')
+        self.hist += np.bincount(idx, minlength=HIST_BINS + 2)[1:-1]
+        self.below = np.sort(np.concatenate([self.below, finite[idx == 0]]))
+        self.above = np.sort(np.concatenate([self.above, finite[idx == HIST_BINS + 1]]))
+        self.n += finite.size
+        self.total += float(finite.sum())
+
+    def merge(self, other: "_MetricSummary"):
+        self.hist += other.hist
+        self.below = np.sort(np.concatenate([self.below, other.below]))
+        self.above = np.sort(np.concatenate([self.above, other.above]))
+        self.n += other.n
+        self.total += other.total
+
+    def mean(self) -> float:
+        return self.total / self.n if self.n else float('nan')
+
+    def quantile(self, q: float) -> float:
+        if not self.n:
+            return float('nan')
+        # 范围外：与 np.quantile（linear）相同的样本分位数
+        pos = q * (self.n - 1)
+        below, above = self.below.size, self.above.size
+        if np.ceil(pos) < below:
+            return float(np.quantile(self.below, pos / max(below - 1, 1)))
+        if np.floor(pos) >= self.n - above:
+            start = self.n - above
+            return float(np.quantile(self.above, (pos - start) / max(above - 1, 1)))
+        # 范围内：累积次数所在区间内线性插值
+        cum = below + np.cumsum(self.hist)
+        target = q * self.n
+        b = int(np.searchsorted(cum, target, side='left'))
+        if b >= HIST_BINS:
+            return float(self.above[0])
+        edges = self.edges
+        before = cum[b - 1] if b else below
+        if target <= before:    # q 落在范围下方与第一个非空区间之间（含 q = 0）
+            return float(self.below[-1]) if below else float(edges[np.flatnonzero(self.hist)[0]])
+        frac = (target - before) / self.hist[b]
+        return float(edges[b] + frac * (edges[b + 1] - edges[b]))
+
+def _simulate_chunk(task) -> Tuple[int, np.ndarray, _MetricSummary]:
+    """
+    进程池工作函数：抽样一个区块并评估，回传 (机器序号, 各等级次数[6], 该区块的指标摘要)；不回传样本
+    """
+    kind, nominal, tolerances, n, seed, key, value_range = task
+    grade, metric = _sample_metric(kind, nominal, tolerances, n, seed, key)
+    summary = _MetricSummary(value_range)
+    summary.add(metric)
+    return key[0], np.bincount(grade, minlength=6), summary
+
+def _tasks(units, tolerances, draws, seed):
+    for u, spec in enumerate(units):
+        kind = vec.COLD_HOT if isinstance(spec, ColdHotDispenserInput) else vec.HOT_WARM
+        nominal = astuple(spec)
+        value_range = _pilot_range(kind, nominal, tolerances, seed, u)
+        for c, start in enumerate(range(0, draws, CHUNK_DRAWS)):
+            yield kind, nominal, tolerances, min(CHUNK_DRAWS, draws - start), seed, (u, c), value_range
+
+def simulate(units: List, tolerances: Dict[str, Tolerance] = None, draws: int = DEFAULT_DRAWS,
+             seed: int = 0, jobs: int = 1, ci: float = 0.95) -> List[Dict]:
+    """
+    对每台机器执行 draws 次抽样，回传：
+      probabilities - {1..5: 机率, None: 不合格机率}
+      metric        - "E_st24_kWh"（温热型）或 "margin_kWh"（冰温热型）
+      mean / ci_low / ci_high - 指标的平均与 ci 信赖区间
+    jobs > 1 时区块分散到进程池。
+    """
+    tolerances = dict(DEFAULT_TOLERANCES if tolerances is None else tolerances)
+    counts = [np.zeros(6, dtype=np.int64) for _ in units]
+    summaries: List[Optional[_MetricSummary]] = [None] * len(units)
+
+    def collect(outputs):
+        # 依区块顺序合并，结果与进程数无关
+        for u, cnt, summary in outputs:
+            counts[u] += cnt
+            if summaries[u] is None:
+                summaries[u] = summary
+            else:
+                summaries[u].merge(summary)
+
+    tasks = _tasks(units, tolerances, draws, seed)
+    if jobs > 1:
+        from multiprocessing import Pool
+        with Pool(jobs) as pool:
+            collect(pool.imap(_simulate_chunk, tasks))      # 依序逐一取回，不一次持有全部结果
+    else:
+        collect(map(_simulate_chunk, tasks))
+
+    alpha = (1.0 - ci) / 2
+    results = []
+    for spec, cnt, summary in zip(units, counts, summaries):
+        total = cnt.sum()
+        probs: Dict[Optional[int], float] = {g: cnt[g] / total for g in (1, 2, 3, 4, 5)}
+        probs[None] = cnt[vec.FAIL] / total
+        results.append({
+            "probabilities": probs,
+            "metric": "margin_kWh" if isinstance(spec, ColdHotDispenserInput) else "E_st24_kWh",
+            "mean": summary.mean(),
+            "ci_low": summary.quantile(alpha),
+            "ci_high": summary.quantile(1.0 - alpha),
+        })
+    return results
+
+def process_batch(input_file: str, output_file: str, **kwargs):
+    """
+    批量文件（与批量工具相同格式，可混合两种机型）逐台分析并写出结果
+    """
+    from HCD3_EnergyLevel_Cal_Batch import read_csv, write_csv
+
+    rows = read_csv(input_file)
+    units, labels = [], []
+    for idx, row in enumerate(rows, 1):
+        try:
+            units.append(input_from_record(row))
+            labels.append((idx, row.get('型号', f'测试{idx}')))
+        except (KeyError, ValueError) as e:
+            print(f"  ❌ 第 {idx} 行数据格式错误：{e}")
+    if not units:
+        return []
+
+    results = simulate(units, **kwargs)
+    out = []
+    for (idx, label), r in zip(labels, results):
+        p = r["probabilities"]
+        likely = max(p, key=lambda g: p[g])
+        out.append({
+            "序号": idx,
+            "型号": label,
+            **{f"P_{g}级": f"{p[g]:.4f}" for g in (1, 2, 3, 4, 5)},
+            "P_不合格": f"{p[None]:.4f}",
+            "最可能等级": likely if likely is not None else "不合格",
+            "指标": r["metric"],
+            "平均": f"{r['mean']:.4f}",
+            "区间下限": f"{r['ci_low']:.4f}",
+            "区间上限": f"{r['ci_high']:.4f}",
+        })
+        print(f"  [{idx}] {label}: " + " ".join(
+            f"{g if g else '✗'}:{p[g]*100:.1f}%" for g in (1, 2, 3, 4, 5, None) if p[g] > 0))
+    write_csv(output_file, out)
+    return out
+
+def main():
+    import sys
+
+    args = sys.argv[1:]
+    opts = {"--draws": str(DEFAULT_DRAWS), "--seed": "0", "--jobs": "1", "--ci": "0.95", "--dist": "uniform"}
+    tol_specs, files = [], []
+    i = 0
+    while i < len(args):
+        if args[i] == "--tol":
+            tol_specs.append(args[i + 1])
+            i += 2
+        elif args[i] in opts:
+            opts[args[i]] = args[i + 1]
+            i += 2
+        else:
+            files.append(args[i])
+            i += 1
+    if not files:
+        print(__doc__)
+        return
+
+    tolerances = {k: Tolerance(t.width, t.relative, opts["--dist"]) for k, t in DEFAULT_TOLERANCES.items()}
+    tolerances.update(parse_tolerance(s, opts["--dist"]) for s in tol_specs)
+
+    print("=" * 70)
+    print(f"Monte Carlo 量测不确定度分析（每台 {int(opts['--draws']):,} 次抽样）")
+    print("=" * 70)
+    process_batch(files[0], files[1] if len(files) > 1 else "mc_output.csv",
+                  tolerances=tolerances, draws=int(opts["--draws"]), seed=int(opts["--seed"]),
+                  jobs=int(opts["--jobs"]), ci=float(opts["--ci"]))
+    print("=" * 70)
+
+if __name__ == "__main__":
+    main()
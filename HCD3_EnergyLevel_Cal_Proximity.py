@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HCD3 等级边界邻近索引
+对一份结果集建立一次「至最近分级门槛距离」的排序索引，之后以二分搜索快速回答：
+  - 距任一门槛 ε kWh 以内或 x % 以内的机器（送复测）
+  - 最接近门槛的前 k 台
+  - 各门槛附近的机器数量
+评定值：温热型为 E_st,24，冰温热型为 E24；门槛为 5 条分级上限。
+
+使用方法：
+  python HCD3_EnergyLevel_Cal_Proximity.py input.csv [--eps 0.01] [--pct 1] [--top 20] [--out 复测清单.csv]
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import HCD3_EnergyLevel_Cal_Vector as vec
+
+GRADES = (1, 2, 3, 4, 5)
+
+class BoundaryIndex:
+    """
+    distance_kWh[g] / distance_pct[g] - 各门槛距离的排序阵列（升序），order_*[g] 为对应行号
+    nearest_kWh / nearest_pct         - 至最近门槛距离的排序阵列与行号
+    """
+
+    def __init__(self, value, limits: Dict[int, np.ndarray]):
+        value = np.asarray(value, dtype=float)
+        self.n_rows = value.size
+        dist = np.stack([np.abs(value - limits[g]) for g in GRADES])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct = np.stack([np.abs(value - limits[g]) / np.abs(limits[g]) * 100 for g in GRADES])
+        # nan（无效行）排到最后，不会被范围查询选中
+        dist = np.where(np.isnan(dist), np.inf, dist)
+        pct = np.where(np.isnan(pct), np.inf, pct)
+
+        self.order_kWh, self.distance_kWh = {}, {}
+        self.order_pct, self.distance_pct = {}, {}
+        for i, g in enumerate(GRADES):
+            self.order_kWh[g], self.distance_kWh[g] = self._sorted(dist[i])
+            self.order_pct[g], self.distance_pct[g] = self._sorted(pct[i])
+
+        self.boundary = (np.argmin(dist, axis=0) + 1).astype(np.int8)   # 最近门槛（以 kWh 计）
+        self.nearest_order_kWh, self.nearest_kWh = self._sorted(dist.min(axis=0))
+        self.nearest_order_pct, self.nearest_pct = self._sorted(pct.min(axis=0))
+
+    @staticmethod
+    def _sorted(d: np.ndarray):
+        order = np.argsort(d, kind='stable')
+        return order, d[order]
+
+    @classmethod
+    def from_columns(cls, kind: str, columns: Dict[str, np.ndarray]) -> "BoundaryIndex":
+        result = vec.evaluate_any(kind, columns)
+        value = result["E24_kWh"] if kind == vec.COLD_HOT else result["E_st24_kWh"]
+        return cls(value, result["limits_kWh"])
+
+    # --- 查询 ---
+
+    def within(self, eps_kWh: Optional[float] = None, pct: Optional[float] = None) -> np.ndarray:
+        """
+        距任一门槛 ≤ eps_kWh 或 ≤ pct % 的行号（依距离升序；两者皆给时取联集，依行号排序）
+        """
+        parts = []
+        if eps_kWh is not None:
+            k = np.searchsorted(self.nearest_kWh, eps_kWh, side='right')
+            parts.append(self.nearest_order_kWh[:k])
+        if pct is not None:
+            k = np.searchsorted(self.nearest_pct, pct, side='right')
+            parts.append(self.nearest_order_pct[:k])
+        if not parts:
+            raise ValueError("须指定 eps_kWh 或 pct")
+        if len(parts) == 1:
+            return parts[0]
+        return np.union1d(*parts)
+
+    def top_k(self, k: int) -> np.ndarray:
+        """
+        最接近任一门槛的前 k 行号
+        """
+        return self.nearest_order_kWh[:k]
+
+    def count_per_boundary(self, eps_kWh: Optional[float] = None, pct: Optional[float] = None) -> Dict[int, int]:
+        """
+        各门槛 ±eps_kWh（或 ±pct %）以内的机器数；同一台可计入多条门槛
+        """
+        if eps_kWh is not None:
+            return {g: int(np.searchsorted(self.distance_kWh[g], eps_kWh, side='right')) for g in GRADES}
+        if pct is not None:
+            return {g: int(np.searchsorted(self.distance_pct[g], pct, side='right')) for g in GRADES}
+        raise ValueError("须指定 eps_kWh 或 pct")
+
+    def distance(self, rows) -> np.ndarray:
+        """
+        指定行至最近门槛的距离 (kWh)
+        """
+        inverse = np.empty(self.n_rows, dtype=np.intp)
+        inverse[self.nearest_order_kWh] = np.arange(self.n_rows)
+        return self.nearest_kWh[inverse[np.asarray(rows)]]
+
+    # --- 保存 / 载入 ---
+
+    def save(self, filename: str):
+        arrays = {"n_rows": np.asarray(self.n_rows), "boundary": self.boundary,
+                  "nearest_order_kWh": self.nearest_order_kWh, "nearest_kWh": self.nearest_kWh,
+                  "nearest_order_pct": self.nearest_order_pct, "nearest_pct": self.nearest_pct}
+        for g in GRADES:
+            arrays[f"order_kWh_{g}"] = self.order_kWh[g]
+            arrays[f"distance_kWh_{g}"] = self.distance_kWh[g]
+            arrays[f"order_pct_{g}"] = self.order_pct[g]
+            arrays[f"distance_pct_{g}"] = self.distance_pct[g]
+        np.savez(filename, **arrays)
+
+    @classmethod
+    def load(cls, filename: str) -> "BoundaryIndex":
+        index = cls.__new__(cls)
+        with np.load(filename) as z:
+            index.n_rows = int(z["n_rows"])
+            for name in ("boundary", "nearest_order_kWh", "nearest_kWh", "nearest_order_pct", "nearest_pct"):
+                setattr(index, name, z[name])
+            index.order_kWh = {g: z[f"order_kWh_{g}"] for g in GRADES}
+            index.distance_kWh = {g: z[f"distance_kWh_{g}"] for g in GRADES}
+            index.order_pct = {g: z[f"order_pct_{g}"] for g in GRADES}
+            index.distance_pct = {g: z[f"distance_pct_{g}"] for g in GRADES}
+        return index
+
+def main():
+    import sys
+
+    args = sys.argv[1:]
+    opts = {"--eps": None, "--pct": None, "--top": "20", "--out": None}
+    files = []
+    i = 0
+    while i < len(args):
+        if args[i] in opts:
+            opts[args[i]] = args[i + 1]
+            i += 2
+        else:
+            files.append(args[i])
+            i += 1
+    if not files:
+        print("使用方法：python HCD3_EnergyLevel_Cal_Proximity.py input.csv [--eps 0.01] [--pct 1] [--top 20] [--out 复测清单.csv]")
+        return
+
+    kind, columns, labels = vec.read_columns(files[0])
+    index = BoundaryIndex.from_columns(kind, columns)
+
+    print("=" * 70)
+    print(f"等级边界邻近索引（{index.n_rows:,} 台）")
+    print("=" * 70)
+
+    eps = float(opts["--eps"]) if opts["--eps"] else None
+    pct = float(opts["--pct"]) if opts["--pct"] else None
+    rows: List[int]
+    if eps is None and pct is None:
+        rows = index.top_k(int(opts["--top"])).tolist()
+        print(f"\n  最接近门槛的前 {len(rows)} 台：")
+    else:
+        rows = index.within(eps, pct).tolist()
+        cond = " 或 ".join(s for s in (eps and f"±{eps:g} kWh", pct and f"±{pct:g}%") if s)
+        print(f"\n  距门槛 {cond} 以内：{len(rows)} 台")
+        counts = index.count_per_boundary(eps, None) if eps is not None else index.count_per_boundary(None, pct)
+        for g, n in counts.items():
+            print(f"    {g}级门槛：{n}")
+
+    distances = index.distance(rows) if rows else []
+    listing = [{"行号": r + 1, "型号": labels[r], "最近门槛": f"{index.boundary[r]}级",
+                "距离_kWh": f"{d:.4f}"} for r, d in zip(rows, distances)]
+    for item in listing[:int(opts["--top"])]:
+        print(f"    {item['型号']}: {item['最近门槛']} ± {item['距离_kWh']} kWh")
+    if opts["--out"] and listing:
+        from HCD3_EnergyLevel_Cal_Batch import write_csv
+        write_csv(opts["--out"], listing)
+    print("=" * 70)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HCD3 法规草案重新分级模拟（what-if）
+以现行公式（Core / Vector 引擎）与候选系数（草案）在同一次分块向量化扫描中评估整份归档，输出：
+  - 6×6 等级转移矩阵（现行等级 × 草案等级，含不合格）
+  - 等级改变的机型清单
+  - 余裕量变化（草案余裕 - 现行余裕；余裕 = 5 级上限 / 容许基准 - 评定值）
+
+候选系数来自基准登记表（--version）或草案文件（--draft，格式同登记表中的一个版本，
+或只含一个版本的登记表）。归档可为 CSV 或 Vector.save_columns() 产生的 .npz。
+
+使用方法：
+  python HCD3_EnergyLevel_Cal_Regrade.py 归档.npz --draft 草案.json [--out 受影响机型.csv] [--matrix 转移矩阵.csv]
+  python HCD3_EnergyLevel_Cal_Regrade.py 归档.csv --version 版本id [--registry 登记表.json]
+"""
+
+import json
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import HCD3_EnergyLevel_Cal_Vector as vec
+from HCD3_EnergyLevel_Cal_Standards import Kernel, load_registry, parse_version
+
+CHUNK_ROWS = 1 << 21
+
+# 转移矩阵的行 / 列顺序：1–5 级、不合格（阵列索引即 int8 等级码，0 为 FAIL）
+ORDER = (1, 2, 3, 4, 5, vec.FAIL)
+
+def load_draft(filename: str) -> Kernel:
+    """
+    读取草案文件：单一版本，或只含一个版本的登记表
+    """
+    with open(filename, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if "versions" in data:
+        if len(data["versions"]) != 1:
+            raise ValueError(f"草案文件须只含一个版本（现有 {len(data['versions'])} 个），请改用 --version 指定")
+        data = data["versions"][0]
+    return Kernel(parse_version(data))
+
+def _margin(kind: str, result: Dict) -> np.ndarray:
+    if kind == vec.COLD_HOT:
+        return result["E_standard_kWh"] - result["E24_kWh"]
+    return result["MEPS_kWh"] - result["E_st24_kWh"]
+
+def regrade(kind: str, columns: Dict[str, np.ndarray], candidate: Kernel,
+            chunk_rows: int = CHUNK_ROWS) -> Dict[str, np.ndarray]:
+    """
+    逐块以两套公式评估，回传：
+      transitions      - int64 [6, 6]，transitions[现行码, 草案码]（码 0 为不合格）
+      grade_current / grade_candidate - int8 逐台等级
+      margin_current / margin_shift_kWh - float32 逐台余裕与余裕变化
+    """
+    if candidate.kind != kind:
+        raise ValueError(f"草案机型为 {candidate.kind}，归档为 {kind}")
+    names = vec.fields_of(kind)
+    n = len(columns[names[0]])
+    grade_cur = np.empty(n, dtype=np.int8)
+    grade_new = np.empty(n, dtype=np.int8)
+    margin_cur = np.empty(n, dtype=np.float32)
+    shift = np.empty(n, dtype=np.float32)
+
+    for start in range(0, n, chunk_rows):
+        part = slice(start, min(start + chunk_rows, n))
+        chunk = {k: np.asarray(columns[k][part], dtype=float) for k in names}
+        cur = vec.evaluate_any(kind, chunk)
+        new = candidate.evaluate_any(chunk)
+        grade_cur[part] = cur["grade"]
+        grade_new[part] = new["grade"]
+        m_cur = _margin(kind, cur)
+        margin_cur[part] = m_cur
+        shift[part] = _margin(kind, new) - m_cur
+
+    transitions = np.bincount(grade_cur.astype(np.intp) * 6 + grade_new, minlength=36).reshape(6, 6)
+    return {
+        "transitions": transitions,
+        "grade_current": grade_cur,
+        "grade_candidate": grade_new,
+        "margin_current": margin_cur,
+        "margin_shift_kWh": shift,
+    }
+
+def summarize(result: Dict[str, np.ndarray]) -> Dict[str, object]:
+    """
+    降级 / 升级 / 新增不合格台数与余裕变化统计
+    """
+    cur, new = result["grade_current"], result["grade_candidate"]
+    # 以 1–5、不合格(6) 的顺序比较好坏
+    rank_cur = np.where(cur == vec.FAIL, 6, cur)
+    rank_new = np.where(new == vec.FAIL, 6, new)
+    shift = result["margin_shift_kWh"]
+    finite = shift[np.isfinite(shift)]
+    return {
+        "units": int(cur.size),
+        "downgraded": int(np.count_nonzero(rank_new > rank_cur)),
+        "upgraded": int(np.count_nonzero(rank_new < rank_cur)),
+        "newly_failing": int(np.count_nonzero((new == vec.FAIL) & (cur != vec.FAIL))),
+        "shift_mean_kWh": float(finite.mean()) if finite.size else float('nan'),
+        "shift_min_kWh": float(finite.min()) if finite.size else float('nan'),
+        "shift_max_kWh": float(finite.max()) if finite.size else float('nan'),
+    }
+
+def _grade_label(code: int) -> str:
+    return "不合格" if code == vec.FAIL else f"{code}级"
+
+def transition_rows(transitions: np.ndarray) -> List[Dict]:
+    """
+    转移矩阵转为 CSV 行（行：现行，列：草案）
+    """
+    rows = []
+    for c in ORDER:
+        row = {"现行 \\ 草案": _grade_label(c)}
+        row.update({_grade_label(d): int(transitions[c, d]) for d in ORDER})
+        rows.append(row)
+    return rows
+
+def affected_rows(result: Dict[str, np.ndarray], labels: List[str]) -> List[Dict]:
+    """
+    等级改变的机型清单（依余裕变化由差到好排序）
+    """
+    cur, new = result["grade_current"], result["grade_candidate"]
+    rows = np.flatnonzero(cur != new)
+    rows = rows[np.argsort(result["margin_shift_kWh"][rows], kind='stable')]
+    margin = result["margin_current"]
+    shift = result["margin_shift_kWh"]
+    return [{
+        "序号": int(r) + 1,
+        "型号": labels[r] if r < len(labels) else f"测试{r + 1}",
+        "现行等级": _grade_label(int(cur[r])),
+        "草案等级": _grade_label(int(new[r])),
+        "现行余裕_kWh": f"{margin[r]:.3f}",
+        "草案余裕_kWh": f"{margin[r] + shift[r]:.3f}",
+        "余裕变化_kWh": f"{shift[r]:+.3f}",
+    } for r in rows.tolist()]
+
+def main():
+    import sys
+    import time
+
+    args = sys.argv[1:]
+    opts = {"--draft": None, "--version": None, "--registry": None, "--out": None, "--matrix": None}
+    files = []
+    i = 0
+    while i < len(args):
+        if args[i] in opts:
+            opts[args[i]] = args[i + 1]
+            i += 2
+        else:
+            files.append(args[i])
+            i += 1
+    if not files or not (opts["--draft"] or opts["--version"]):
+        print(__doc__)
+        return
+
+    from HCD3_EnergyLevel_Cal_Batch import write_csv
+
+    try:
+        if opts["--draft"]:
+            candidate = load_draft(opts["--draft"])
+        else:
+            candidate = load_registry(opts["--registry"]).kernel(opts["--version"])
+    except (OSError, KeyError, ValueError) as e:
+        print(f"❌ 无法载入候选系数：{e}")
+        return
+
+    print("=" * 70)
+    print(f"重新分级模拟：现行公式 → {candidate.version.id}")
+    print("=" * 70)
+    t0 = time.perf_counter()
+    kind, columns, labels = vec.read_columns(files[0])
+    t1 = time.perf_counter()
+    try:
+        result = regrade(kind, columns, candidate)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    t2 = time.perf_counter()
+    summary = summarize(result)
+    print(f"  {summary['units']:,} 台（载入 {t1 - t0:.1f} s，评估 {t2 - t1:.1f} s）")
+
+    print("\n【等级转移矩阵】（行：现行，列：草案）")
+    matrix = transition_rows(result["transitions"])
+    header = list(matrix[0])
+    print("  " + "".join(f"{h:>10}" for h in header))
+    for row in matrix:
+        print("  " + "".join(f"{row[h]:>10}" for h in header))
+
+    n = max(summary["units"], 1)
+    print("\n【影响】")
+    print(f"  降级：{summary['downgraded']:,} 台（{summary['downgraded'] / n * 100:.1f}%）")
+    print(f"  升级：{summary['upgraded']:,} 台（{summary['upgraded'] / n * 100:.1f}%）")
+    print(f"  新增不合格：{summary['newly_failing']:,} 台（{summary['newly_failing'] / n * 100:.1f}%）")
+    print(f"  余裕变化：平均 {summary['shift_mean_kWh']:+.4f} kWh，"
+          f"最差 {summary['shift_min_kWh']:+.4f}，最好 {summary['shift_max_kWh']:+.4f}")
+
+    if opts["--matrix"]:
+        write_csv(opts["--matrix"], matrix)
+    if opts["--out"]:
+        write_csv(opts["--out"], affected_rows(result, labels))
+    print("=" * 70)
+
+if __name__ == "__main__":
+    main()
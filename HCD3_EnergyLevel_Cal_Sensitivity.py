@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HCD3 一阶灵敏度与允差报告
+以解析偏导数（向量化）求出评定值对各输入的灵敏度，并以线性化估计
+使等级改变所需的最小单一输入扰动。计算量与一次批量评估同级，可作为批量输出的附加字段。
+
+温热型：E_st,24 = E24 / K，K = (Th - Ta) / (100 - Ta)
+  ∂E_st/∂E24 = 1/K
+  ∂E_st/∂Th  = -E24 / (K² (100 - Ta))
+  ∂E_st/∂Ta  = -E24 (Th - 100) / (K² (100 - Ta)²)
+  分级上限 L_g = a_g V + b_g → ∂L_g/∂V = a_g
+冰温热型：以 E24 比较 L_g = a_g Veq + b_g，Veq = V1 K1 + V2 K2 / 3
+  ∂Veq/∂Th = V1 / (100 - Ta)     ∂Veq/∂Tc = -V2 / (3 Ta)
+  ∂Veq/∂Ta = V1 (Th - 100) / (100 - Ta)² + V2 Tc / (3 Ta²)
+  ∂Veq/∂V1 = K1                  ∂Veq/∂V2 = K2 / 3
+  余裕量 = 容许基准 - E24 → ∂余裕/∂x = a_5 ∂Veq/∂x - ∂E24/∂x（a_5 为 Veq 所在分段的 5 级斜率）
+
+线性化忽略 3 位小数舍入的阶梯，翻转扰动为一阶近似。
+"""
+
+from typing import Dict
+
+import numpy as np
+
+import HCD3_EnergyLevel_Cal_Vector as vec
+
+# 用于比较不同单位扰动的参考允差（与 Monte Carlo 默认值一致；容量取舍入步长之半）
+REFERENCE_TOLERANCE = {
+    "E24_kWh": 0.01,        # 相对值 1 %
+    "T_hot24_C": 0.5,
+    "T_hot_C": 0.5,
+    "T_cold_C": 0.5,
+    "T_amb_C": 0.5,
+    "V_marked_L": 0.05,
+    "V_hot_L": 0.05,
+    "V_cold_L": 0.05,
+}
+
+def _neighbour_bounds(grade: np.ndarray, limits: Dict[int, np.ndarray], slopes):
+    """
+    slopes 为 1–5 级斜率 a（形状 (5,) 或 (5,) + 逐台形状）。
+    回传目前等级上、下两条边界的 (上限值, 斜率 a)：
+      变差边界 - 目前等级的上限（不合格者无）
+      变好边界 - 上一级的上限（1 级者无；不合格者为 5 级上限）
+    不存在的边界以 nan 表示。
+    """
+    L = np.stack(np.broadcast_arrays(*(limits[g] for g in (1, 2, 3, 4, 5))))
+    a = np.asarray(slopes, dtype=float)
+    a = np.broadcast_to(a.reshape(a.shape + (1,) * (L.ndim - a.ndim)), L.shape)
+    g = np.broadcast_to(np.asarray(grade, dtype=np.intp), L.shape[1:])
+    has_up = g != vec.FAIL
+    has_dn = g != 1
+    up_idx = np.where(has_up, g - 1, 0)
+    dn_idx = np.where(g == vec.FAIL, 4, np.maximum(g - 2, 0))
+    def pick(table, idx):
+        return np.take_along_axis(table, idx[None], axis=0)[0]
+
+    L_up = np.where(has_up, pick(L, up_idx), np.nan)
+    L_dn = np.where(has_dn, pick(L, dn_idx), np.nan)
+    return (L_up, np.where(has_up, pick(a, up_idx), np.nan)), (L_dn, np.where(has_dn, pick(a, dn_idx), np.nan))
+
+def _flip_delta(f_up, f_dn, df_up, df_dn) -> np.ndarray:
+    """
+    两条边界各自的线性化穿越量 Δx = -f / f'，取绝对值较小者（带正负号）
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d_up = np.where(df_up != 0, -f_up / df_up, np.inf)
+        d_dn = np.where(df_dn != 0, -f_dn / df_dn, np.inf)
+    d_up = np.where(np.isnan(d_up), np.inf, d_up)
+    d_dn = np.where(np.isnan(d_dn), np.inf, d_dn)
+    return np.where(np.abs(d_up) <= np.abs(d_dn), d_up, d_dn)
+
+def _closest_input(flips: Dict[str, np.ndarray], nominal: Dict[str, np.ndarray]):
+    """
+    以参考允差正规化各输入的翻转扰动，回传 (最敏感输入名称阵列, 允差倍数)
+    """
+    names = list(flips)
+    ratios = []
+    for k in names:
+        tol = REFERENCE_TOLERANCE[k] * (np.abs(nominal[k]) if k == "E24_kWh" else 1.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios.append(np.abs(flips[k]) / tol)
+    ratios = np.stack(ratios)
+    ratios = np.where(np.isnan(ratios), np.inf, ratios)
+    best = np.argmin(ratios, axis=0)
+    return np.asarray(names)[best], np.take_along_axis(ratios, best[None], axis=0)[0]
+
+def hot_warm_sensitivity(E24_kWh, T_hot24_C, T_amb_C, V_marked_L, result: Dict = None) -> Dict[str, np.ndarray]:
+    """
+    温热型：E_st,24 对各输入的偏导数、各输入的翻转扰动与最敏感输入。
+    result 可传入已算好的 Vector.evaluate_columns() 结果以免重复计算。
+    """
+    E = np.asarray(E24_kWh, dtype=float)
+    Th = np.asarray(T_hot24_C, dtype=float)
+    Ta = np.asarray(T_amb_C, dtype=float)
+    if result is None:
+        result = vec.evaluate_columns(E, Th, Ta, V_marked_L)
+    Est = result["E_st24_kWh"]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        K = (Th - Ta) / (100.0 - Ta)
+        d_E24 = 1.0 / K
+        d_Th = -E / (K * K * (100.0 - Ta))
+        d_Ta = -E * (Th - 100.0) / (K * K * (100.0 - Ta) ** 2)
+
+    slopes, _ = vec.segment_coeffs(vec.HOT_WARM, vec.round_to(vec.HOT_WARM, "V", V_marked_L))
+    (L_up, a_up), (L_dn, a_dn) = _neighbour_bounds(result["grade"], result["limits_kWh"], slopes)
+    f_up, f_dn = Est - L_up, Est - L_dn
+    flips = {
+        "E24_kWh": _flip_delta(f_up, f_dn, d_E24, d_E24),
+        "T_hot24_C": _flip_delta(f_up, f_dn, d_Th, d_Th),
+        "T_amb_C": _flip_delta(f_up, f_dn, d_Ta, d_Ta),
+        "V_marked_L": _flip_delta(f_up, f_dn, -a_up, -a_dn),
+    }
+    nominal = {"E24_kWh": E}
+    closest, ratio = _closest_input(flips, nominal)
+    return {
+        "dEst_dE24": d_E24,
+        "dEst_dT_hot": d_Th,
+        "dEst_dT_amb": d_Ta,
+        "dEst_dV": np.zeros_like(d_E24),
+        **{f"flip_{k}": v for k, v in flips.items()},
+        "flip_input": closest,
+        "flip_tolerance_ratio": ratio,
+    }
+
+def cold_hot_sensitivity(E24_kWh, T_hot_C, T_cold_C, T_amb_C, V_hot_L, V_cold_L,
+                         result: Dict = None) -> Dict[str, np.ndarray]:
+    """
+    冰温热型：容许基准与余裕量对各输入的偏导数、各输入的翻转扰动与最敏感输入
+    """
+    E = np.asarray(E24_kWh, dtype=float)
+    Th = np.asarray(T_hot_C, dtype=float)
+    Tc = np.asarray(T_cold_C, dtype=float)
+    Ta = np.asarray(T_amb_C, dtype=float)
+    if result is None:
+        result = vec.evaluate_cold_hot_columns(E, Th, Tc, Ta, V_hot_L, V_cold_L)
+    V1, V2 = result["V_hot_L"], result["V_cold_L"]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dVeq = {
+            "T_hot_C": V1 / (100.0 - Ta),
+            "T_cold_C": -V2 / (3.0 * Ta),
+            "T_amb_C": V1 * (Th - 100.0) / (100.0 - Ta) ** 2 + V2 * Tc / (3.0 * Ta * Ta),
+            "V_hot_L": result["K1"] * np.ones_like(E),
+            "V_cold_L": result["K2"] / 3.0 * np.ones_like(E),
+        }
+    Veq = vec.calc_Veq(V1, V2, result["K1"], result["K2"])
+    slopes, _ = vec.cold_hot_coeffs(Veq)
+    a5 = slopes[4]
+
+    (L_up, a_up), (L_dn, a_dn) = _neighbour_bounds(result["grade"], result["limits_kWh"], slopes)
+    f_up, f_dn = E - L_up, E - L_dn
+    flips = {"E24_kWh": _flip_delta(f_up, f_dn, np.ones_like(E), np.ones_like(E))}
+    for k, dv in dVeq.items():
+        flips[k] = _flip_delta(f_up, f_dn, -a_up * dv, -a_dn * dv)
+
+    out = {"dLimit_dE24": np.zeros_like(E), "dMargin_dE24": -np.ones_like(E)}
+    for k, dv in dVeq.items():
+        short = k.replace("_C", "").replace("_L", "")
+        out[f"dLimit_d{short}"] = a5 * dv
+        out[f"dMargin_d{short}"] = a5 * dv
+    closest, ratio = _closest_input(flips, {"E24_kWh": E})
+    out.update({f"flip_{k}": v for k, v in flips.items()})
+    out["flip_input"] = closest
+    out["flip_tolerance_ratio"] = ratio
+    return out
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HCD3 本机 HTTP JSON 计算服务
+常驻进程，免去每台测试都启动一次 Core.exe（解压 + 解释器启动）的开销。
+仅用标准库（ThreadingHTTPServer，HTTP/1.1 keep-alive，每个连接一个线程）。
+
+端点（POST，请求 / 回应皆为 JSON）：
+  /evaluate/hot-warm   {"E24_kWh", "T_hot24_C", "T_amb_C", "V_marked_L"}               → 同 Core.evaluate()
+  /evaluate/cold-hot   {"E24_kWh", "T_hot_C", "T_cold_C", "T_amb_C", "V_hot_L", "V_cold_L"} → 同 Core.evaluate_cold_hot()
+  /evaluate/batch      [记录, ...] 或 {"records": [...]}（机型依 T_cold_C 字段判别）
+                       → {"results": [结果或 null, ...], "errors": [{"index", "field", "reason", "message"}, ...]}
+  GET /health          → {"status": "ok"}
+结果中 limits_kWh 的键为字符串 "1"–"5"；grade 为 null 表示不合格。
+输入检核不通过回 422 与错误表，JSON 格式错误回 400。
+
+使用方法：
+  python HCD3_EnergyLevel_Cal_Server.py [--host 127.0.0.1] [--port 8765] [--verbose]
+"""
+
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Tuple
+from urllib.parse import parse_qsl
+
+from HCD3_EnergyLevel_Cal_Core import (
+    HotWarmDispenserInput, ColdHotDispenserInput, HOT_WARM_FIELDS, COLD_HOT_FIELDS,
+    INVALID_REASONS, evaluate_fused, evaluate_cold_hot_fused, is_cold_hot, validate_columns, validate_record,
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 64 << 20
+
+class RequestError(Exception):
+    """
+    以 HTTP 状态码与 JSON 内容回应的请求错误
+    """
+
+    def __init__(self, status: int, message: str, errors: List[Dict] = None, headers: Dict[str, str] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+        self.payload = {"error": message}
+        if errors is not None:
+            self.payload["errors"] = errors
+
+def result_json(result: dict) -> dict:
+    """
+    evaluate() / evaluate_cold_hot() 结果转为可 JSON 序列化的 dict（limits_kWh 键改为字符串）
+    """
+    out = dict(result)
+    out["limits_kWh"] = {str(g): v for g, v in result["limits_kWh"].items()}
+    return out
+
+def _fields(record: Dict, fields: Tuple[str, ...]) -> List[float]:
+    if not isinstance(record, dict):
+        raise RequestError(400, "记录须为 JSON 对象")
+    missing = [k for k in fields if k not in record]
+    if missing:
+        raise RequestError(400, f"缺少字段：{', '.join(missing)}")
+    try:
+        return [float(record[k]) for k in fields]
+    except (TypeError, ValueError):
+        raise RequestError(400, "数值格式错误")
+
+def _error_table(report: Dict, index: List[int]) -> List[Dict]:
+    return [{"index": index[r], "field": f, "reason": c, "message": INVALID_REASONS[c]}
+            for r, f, c in zip(report["row"].tolist(), report["field"].tolist(), report["reason"].tolist())]
+
+def _evaluate_one(record: Dict, cold_hot: bool) -> dict:
+    fields = COLD_HOT_FIELDS if cold_hot else HOT_WARM_FIELDS
+    values = _fields(record, fields)
+    # 单台以纯 Python 检核，首个请求不必载入 NumPy
+    errors = validate_record(dict(zip(fields, values)))
+    if errors:
+        raise RequestError(422, "输入检核不通过", [{"index": 0, "field": f, "reason": c, "message": INVALID_REASONS[c]}
+                                                   for f, c in errors])
+    if cold_hot:
+        return result_json(evaluate_cold_hot_fused(ColdHotDispenserInput(*values)))
+    return result_json(evaluate_fused(HotWarmDispenserInput(*values)))
+
+def handle_hot_warm(body) -> Tuple[int, object]:
+    return 200, _evaluate_one(body, cold_hot=False)
+
+def handle_cold_hot(body) -> Tuple[int, object]:
+    return 200, _evaluate_one(body, cold_hot=True)
+
+def evaluate_records(records: List[Dict]) -> Dict[str, list]:
+    """
+    批量评估（依机型分组整块检核，检核通过的逐台以快速路径计算）：
+    回传 {"results": [结果或 None], "errors": [错误表]}，index 为记录在清单中的位置
+    """
+    results: List[object] = [None] * len(records)
+    errors: List[Dict] = []
+    groups = {True: [], False: []}
+    for i, record in enumerate(records):
+        groups[isinstance(record, dict) and is_cold_hot(record)].append(i)
+    for cold_hot, index in groups.items():
+        if not index:
+            continue
+        fields = COLD_HOT_FIELDS if cold_hot else HOT_WARM_FIELDS
+        build, evaluate_one = ((ColdHotDispenserInput, evaluate_cold_hot_fused) if cold_hot
+                               else (HotWarmDispenserInput, evaluate_fused))
+        parsed, parsed_index = [], []
+        for i in index:
+            try:
+                parsed.append(_fields(records[i], fields))
+                parsed_index.append(i)
+            except RequestError as e:
+                errors.append({"index": i, "field": "", "reason": "bad_record", "message": str(e)})
+        if not parsed:
+            continue
+        report = validate_columns({k: [row[j] for row in parsed] for j, k in enumerate(fields)})
+        errors.extend(_error_table(report, parsed_index))
+        for ok, i, values in zip(report["valid"].tolist(), parsed_index, parsed):
+            if ok:
+                results[i] = result_json(evaluate_one(build(*values)))
+    errors.sort(key=lambda e: e["index"])
+    return {"results": results, "errors": errors}
+
+def handle_batch(body) -> Tuple[int, object]:
+    records = body.get("records") if isinstance(body, dict) else body
+    if not isinstance(records, list):
+        raise RequestError(400, "须为记录清单或 {\"records\": [...]}")
+    return 200, evaluate_records(records)
+
+# 路由表：(方法, 路径) → 处理函数(body) → (状态码, JSON 内容)
+# 每个服务建立时复制一份（server.routes）；其他模块以 server.routes / server.prefix_routes 注册端点
+ROUTES: Dict[Tuple[str, str], Callable] = {
+    ("POST", "/evaluate/hot-warm"): handle_hot_warm,
+    ("POST", "/evaluate/cold-hot"): handle_cold_hot,
+    ("POST", "/evaluate/batch"): handle_batch,
+    ("GET", "/health"): lambda body: (200, {"status": "ok"}),
+}
+
+class EvaluationHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive：每个回应都带 Content-Length
+    disable_nagle_algorithm = True  # 小回应立即送出，避免与 delayed ACK 互等约 40 ms
+    verbose = False
+
+    def _send(self, status: int, payload, headers: Dict[str, str] = None):
+        data = json.dumps(payload, ensure_ascii=False, allow_nan=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _route(self, method: str, path: str):
+        routes, prefix_routes = self.server.routes, self.server.prefix_routes
+        if (method, path) in routes:
+            return routes[(method, path)], False
+        for (m, prefix), fn in prefix_routes.items():
+            if m == method and path.startswith(prefix):
+                return fn, True
+        if any(p == path for _, p in routes) or any(path.startswith(p) for _, p in prefix_routes):
+            raise RequestError(405, f"{path} 不支持 {method}")
+        raise RequestError(404, f"无此端点：{path}")
+
+    def _read_body(self) -> bytes:
+        """
+        依 Content-Length 读取请求内容；非十进制整数、负值（rfile.read(-1) 会阻塞至断线）或过大时，
+        内容未读取、无法继续使用此连接，故关闭连接并回应 400 / 413
+        """
+        close = {"Connection": "close"}    # send_header 随之设定 close_connection
+        value = (self.headers.get("Content-Length") or "0").strip()
+        if not (value.isascii() and value.isdigit()):
+            raise RequestError(400, f"Content-Length 无效：{value}", headers=close)
+        length = int(value)
+        if length > MAX_BODY_BYTES:
+            raise RequestError(413, "请求内容过大", headers=close)
+        return self.rfile.read(length) if length else b""
+
+    def _dispatch(self, method: str):
+        path, _, query = self.path.partition("?")
+        headers = None
+        try:
+            raw = self._read_body()
+            route, raw_body = self._route(method, path)
+            if raw_body:
+                # 前缀路由：处理函数(路径, 查询参数, 原始内容, Content-Type)
+                status, payload = route(path, dict(parse_qsl(query)), raw, self.headers.get("Content-Type", ""))
+            else:
+                try:
+                    body = json.loads(raw) if raw else None
+                except (UnicodeDecodeError, ValueError):
+                    raise RequestError(400, "JSON 格式错误")
+                status, payload = route(body)
+        except RequestError as e:
+            status, payload, headers = e.status, e.payload, e.headers
+        except Exception as e:
+            status, payload = 500, {"error": f"计算失败：{e}"}
+        self._send(status, payload, headers)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+class EvaluationServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128        # 多个客户端同时连线时的 listen backlog
+
+    def __init__(self, address, handler):
+        super().__init__(address, handler)
+        self.routes: Dict[Tuple[str, str], Callable] = dict(ROUTES)
+        self.prefix_routes: Dict[Tuple[str, str], Callable] = {}
+
+def make_server(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, verbose: bool = False) -> EvaluationServer:
+    """
+    建立服务（未启动）；port=0 时由系统指定，实际端口见 server.server_address
+    """
+    handler = type("Handler", (EvaluationHandler,), {"verbose": verbose})
+    return EvaluationServer((host, port), handler)
+
+def main():
+    import sys
+
+    args = sys.argv[1:]
+    opts = {"--host": DEFAULT_HOST, "--port": str(DEFAULT_PORT)}
+    verbose = "--verbose" in args
+    args = [a for a in args if a != "--verbose"]
+    i = 0
+    while i < len(args):
+        if args[i] in opts and i + 1 < len(args):
+            opts[args[i]] = args[i + 1]
+            i += 2
+        else:
+            print(__doc__)
+            return
+
+    try:
+        server = make_server(opts["--host"], int(opts["--port"]), verbose)
+    except OSError as e:
+        print(f"❌ 无法启动服务：{e}")
+        return
+    host, port = server.server_address[:2]
+    print("=" * 70)
+    print(f"HCD3 计算服务：http://{host}:{port}")
+    print("  POST /evaluate/hot-warm  /evaluate/cold-hot  /evaluate/batch    GET /health")
+    print("  Ctrl+C 停止")
+    print("=" * 70)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n✓ 服务已停止")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
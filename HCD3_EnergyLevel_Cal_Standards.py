@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HCD3 能效基准版本登记表
+由数据文件（默认 HCD3_EnergyLevel_Standards.json）载入各版本的生效日、机型、舍入规则、
+分段与分级系数，法规修订时只需更新数据文件，不必修改程序。
+Core 的所有计算（含 GUI、批量、Vector 引擎）皆经 Core.standard(机型) 取得此处编译的核心；
+打包为 exe 时，exe 所在目录的数据文件优先于打包在 exe 内的副本，故修订不必重新打包。
+
+每个版本在第一次使用时编译为核心（Kernel）并缓存：
+  kernel.evaluate(input)            - 标量，结果字典与 Core.evaluate() / evaluate_cold_hot() 相同
+  kernel.evaluate_columns(*列)       - NumPy 批量，结果与 Vector 引擎相同（首次调用时才编译）
+  kernel.evaluate_any(列字典)
+  kernel.coeffs(容量)               - 该容量所在分段的 {等级: (a, b)}
+  kernel.rounders[项目](值)          - 依版本舍入位数舍入（未规定位数时原值）
+系数、分段边界与舍入位数在编译时固定于闭包中，执行时不再查表或解析。
+分段查找：标量以 bisect，阵列以 np.searchsorted；上限 upper_L 含本身。
+
+使用方法：
+  python HCD3_EnergyLevel_Cal_Standards.py [登记表.json] [--type hot_warm|cold_hot] [--date YYYY-MM-DD]
+"""
+
+import json
+import os
+import sys
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from HCD3_EnergyLevel_Cal_Core import (
+    HOT_WARM_GRADE_COEFFS, COLD_HOT_VEQ_BOUNDS, COLD_HOT_SEGMENT_COEFFS, HOT_WARM_FIELDS, COLD_HOT_FIELDS,
+)
+
+HOT_WARM = "hot_warm"       # 与 Vector.HOT_WARM 相同
+COLD_HOT = "cold_hot"       # 与 Vector.COLD_HOT 相同
+
+GRADES = (1, 2, 3, 4, 5)
+
+# 各机型可设置的舍入项目（小数位数）
+ROUNDING_KEYS = {
+    HOT_WARM: ("V", "E_st24"),
+    COLD_HOT: ("V", "K", "E_standard"),
+}
+
+STANDARDS_FILE = "HCD3_EnergyLevel_Standards.json"
+
+@dataclass(frozen=True)
+class Segment:
+    # 分段：容量（温热型 V / 冰温热型 Veq）≤ upper_L 时适用；None 为无上限
+    upper_L: Optional[float]
+    coeffs: Tuple[Tuple[float, float], ...]     # 1–5 级的 (a, b)
+
+@dataclass(frozen=True)
+class StandardVersion:
+    id: str
+    kind: str
+    effective: Optional[date]
+    title: str
+    rounding: Tuple[Tuple[str, Optional[int]], ...]
+    segments: Tuple[Segment, ...]
+
+    def digits(self, key: str) -> Optional[int]:
+        return dict(self.rounding).get(key)
+
+def parse_version(record: Dict) -> StandardVersion:
+    """
+    解析登记表中的一个版本；内容不完整或不一致时抛出 ValueError
+    """
+    vid = record.get("id")
+    if not vid:
+        raise ValueError("版本缺少 id")
+    kind = record.get("type")
+    if kind not in ROUNDING_KEYS:
+        raise ValueError(f"{vid}：type 须为 {HOT_WARM} 或 {COLD_HOT}，而非 {kind!r}")
+
+    effective = record.get("effective")
+    effective = date.fromisoformat(effective) if effective else None
+
+    rounding = record.get("rounding", {})
+    unknown = set(rounding) - set(ROUNDING_KEYS[kind])
+    if unknown:
+        raise ValueError(f"{vid}：未知的舍入项目 {sorted(unknown)}")
+    rounding = tuple((k, rounding.get(k)) for k in ROUNDING_KEYS[kind])
+
+    segments = []
+    for seg in record.get("segments", []):
+        try:
+            coeffs = tuple((float(seg["coeffs"][str(g)][0]), float(seg["coeffs"][str(g)][1])) for g in GRADES)
+        except (KeyError, IndexError, TypeError) as e:
+            raise ValueError(f"{vid}：分段系数须包含 1–5 级的 [a, b]（{e}）")
+        upper = seg.get("upper_L")
+        segments.append(Segment(None if upper is None else float(upper), coeffs))
+    if not segments:
+        raise ValueError(f"{vid}：至少须有一个分段")
+    uppers = [s.upper_L for s in segments]
+    if uppers[-1] is not None or None in uppers[:-1]:
+        raise ValueError(f"{vid}：仅最后一个分段可为无上限（upper_L: null），且最后一段必须无上限")
+    if any(a >= b for a, b in zip(uppers[:-2], uppers[1:-1])):
+        raise ValueError(f"{vid}：分段 upper_L 须严格递增")
+
+    return StandardVersion(vid, kind, effective, record.get("title", ""), rounding, tuple(segments))
+
+def _rounder(digits: Optional[int]) -> Callable[[float], float]:
+    if digits is None:
+        return lambda x: x
+    return lambda x: round(x, digits)
+
+def _vector_rounder(digits: Optional[int]):
+    import HCD3_EnergyLevel_Cal_Vector as vec
+    if digits is None:
+        return lambda x: x
+    return lambda x: vec.py_round(x, digits)
+
+# --- 编译：标量核心 ---
+
+def _segment_lookup(version: StandardVersion):
+    """
+    回传 f(容量) → {等级: (a, b)}；仅一个分段时不做查找
+    """
+    tables = [dict(zip(GRADES, s.coeffs)) for s in version.segments]
+    if len(tables) == 1:
+        only = tables[0]
+        return lambda x: only
+    bounds = [s.upper_L for s in version.segments[:-1]]
+    return lambda x: tables[bisect_left(bounds, x)]
+
+def _segment_tables(version: StandardVersion):
+    """
+    回传 (各分段 5 级 (a, b) 元组, 分段上限)；仅一个分段时上限为 None（不做查找）
+    """
+    tables = tuple(tuple(s.coeffs) for s in version.segments)
+    bounds = [s.upper_L for s in version.segments[:-1]] or None
+    return tables, bounds
+
+# 标量核心逐台呼叫（GUI、批次、服务），每台只有数微秒：
+# 捨入位数、分段与 5 个等级都在编译时展开，每台不建中间 dict、不经由捨入函数或查找函数分派。
+
+def _compile_hot_warm(version: StandardVersion):
+    dV, dE = version.digits("V"), version.digits("E_st24")
+    tables, bounds = _segment_tables(version)
+    only = tables[0]
+
+    def evaluate(input) -> dict:
+        T_amb = input.T_amb_C
+        K = (input.T_hot24_C - T_amb) / (100.0 - T_amb)
+        Est24 = input.E24_kWh / K
+        if dE is not None:
+            Est24 = round(Est24, dE)
+        V = input.V_marked_L
+        if dV is not None:
+            V = round(V, dV)
+        (a1, b1), (a2, b2), (a3, b3), (a4, b4), (a5, b5) = (
+            only if bounds is None else tables[bisect_left(bounds, V)])
+        L1, L2, L3, L4, L5 = a1 * V + b1, a2 * V + b2, a3 * V + b3, a4 * V + b4, a5 * V + b5
+        return {
+            "K": round(K, 6),
+            "E_st24_kWh": Est24,
+            "limits_kWh": {1: L1, 2: L2, 3: L3, 4: L4, 5: L5},
+            "MEPS_kWh": L5,
+            "grade": (1 if Est24 <= L1 else 2 if Est24 <= L2 else 3 if Est24 <= L3
+                      else 4 if Est24 <= L4 else 5 if Est24 <= L5 else None),
+            "is_meps_pass": Est24 <= L5,
+        }
+    return evaluate
+
+def _compile_cold_hot(version: StandardVersion):
+    dV, dK, dS = version.digits("V"), version.digits("K"), version.digits("E_standard")
+    tables, bounds = _segment_tables(version)
+    only = tables[0]
+
+    def evaluate(input) -> dict:
+        T_amb = input.T_amb_C
+        K1 = (input.T_hot_C - T_amb) / (100.0 - T_amb)
+        K2 = (T_amb - input.T_cold_C) / T_amb
+        if dK is not None:
+            K1, K2 = round(K1, dK), round(K2, dK)
+        V1, V2 = input.V_hot_L, input.V_cold_L
+        if dV is not None:
+            V1, V2 = round(V1, dV), round(V2, dV)
+        Veq = V1 * K1 + (V2 * K2) / 3
+        (a1, b1), (a2, b2), (a3, b3), (a4, b4), (a5, b5) = (
+            only if bounds is None else tables[bisect_left(bounds, Veq)])
+        L1, L2, L3, L4, L5 = (a1 * Veq + b1, a2 * Veq + b2, a3 * Veq + b3,
+                              a4 * Veq + b4, a5 * Veq + b5)
+        E_standard = L5 if dS is None else round(L5, dS)
+        E24 = input.E24_kWh
+        margin_kWh = E_standard - E24
+        margin_percent = (margin_kWh / E_standard * 100) if E_standard > 0 else 0
+        return {
+            "K1": K1,
+            "K2": K2,
+            "V_hot_L": V1,
+            "V_cold_L": V2,
+            "Veq_L": round(Veq, 3),
+            "E24_kWh": round(E24, 3),
+            "E_standard_kWh": E_standard,
+            "limits_kWh": {1: L1, 2: L2, 3: L3, 4: L4, 5: L5},
+            "grade": (1 if E24 <= L1 else 2 if E24 <= L2 else 3 if E24 <= L3
+                      else 4 if E24 <= L4 else 5 if E24 <= L5 else None),
+            "is_qualified": E24 <= E_standard,
+            "margin_kWh": round(margin_kWh, 3),
+            "margin_percent": round(margin_percent, 1),
+        }
+    return evaluate
+
+# --- 编译：NumPy 批量核心 ---
+
+def _vector_limits(version: StandardVersion):
+    """
+    回传 f(容量阵列) → {等级: 上限阵列}；多分段时以 np.searchsorted 一次取得各元素的系数
+    """
+    import numpy as np
+
+    if len(version.segments) == 1:
+        coeffs = dict(zip(GRADES, version.segments[0].coeffs))
+        return lambda x: {g: a * x + b for g, (a, b) in coeffs.items()}
+    bounds = np.array([s.upper_L for s in version.segments[:-1]])
+    A = np.array([[c[0] for c in s.coeffs] for s in version.segments])
+    B = np.array([[c[1] for c in s.coeffs] for s in version.segments])
+
+    def limits(x):
+        idx = np.searchsorted(bounds, x, side='left')
+        return {g: A[idx, g - 1] * x + B[idx, g - 1] for g in GRADES}
+    return limits
+
+def _compile_hot_warm_columns(version: StandardVersion):
+    import numpy as np
+    import HCD3_EnergyLevel_Cal_Vector as vec
+
+    round_V = _vector_rounder(version.digits("V"))
+    round_E = _vector_rounder(version.digits("E_st24"))
+    limits_of = _vector_limits(version)
+
+    def evaluate_columns(E24_kWh, T_hot24_C, T_amb_C, V_marked_L) -> Dict[str, object]:
+        K = vec.temp_correction_factor(T_hot24_C, T_amb_C)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            Est24 = round_E(np.asarray(E24_kWh, dtype=float) / K)
+        limits = limits_of(round_V(np.asarray(V_marked_L, dtype=float)))
+        meps = limits[5]
+        return {
+            "K": vec.py_round(K, 6),
+            "E_st24_kWh": Est24,
+            "limits_kWh": limits,
+            "MEPS_kWh": meps,
+            "grade": vec.classify(Est24, limits),
+            "is_meps_pass": Est24 <= meps,
+        }
+    return evaluate_columns
+
+def _compile_cold_hot_columns(version: StandardVersion):
+    import numpy as np
+    import HCD3_EnergyLevel_Cal_Vector as vec
+
+    round_V = _vector_rounder(version.digits("V"))
+    round_K = _vector_rounder(version.digits("K"))
+    round_S = _vector_rounder(version.digits("E_standard"))
+    limits_of = _vector_limits(version)
+
+    def evaluate_columns(E24_kWh, T_hot_C, T_cold_C, T_amb_C, V_hot_L, V_cold_L) -> Dict[str, object]:
+        E24 = np.asarray(E24_kWh, dtype=float)
+        Ta = np.asarray(T_amb_C, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            K1 = round_K((np.asarray(T_hot_C, dtype=float) - Ta) / (100.0 - Ta))
+            K2 = round_K((Ta - T_cold_C) / Ta)
+        V1 = round_V(np.asarray(V_hot_L, dtype=float))
+        V2 = round_V(np.asarray(V_cold_L, dtype=float))
+        Veq = V1 * K1 + (V2 * K2) / 3
+        limits = limits_of(Veq)
+        E_standard = round_S(limits[5])
+        margin_kWh = E_standard - E24
+        with np.errstate(divide='ignore', invalid='ignore'):
+            margin_percent = np.where(E_standard > 0, margin_kWh / E_standard * 100, 0.0)
+        return {
+            "K1": K1,
+            "K2": K2,
+            "V_hot_L": V1,
+            "V_cold_L": V2,
+            "Veq_L": vec.py_round(Veq, 3),
+            "E24_kWh": vec.py_round(E24, 3),
+            "E_standard_kWh": E_standard,
+            "limits_kWh": limits,
+            "grade": vec.classify(E24, limits),
+            "is_qualified": E24 <= E_standard,
+            "margin_kWh": vec.py_round(margin_kWh, 3),
+            "margin_percent": vec.py_round(margin_percent, 1),
+        }
+    return evaluate_columns
+
+class Kernel:
+    """
+    一个基准版本编译后的评估函数；标量部分不依赖 NumPy（GUI / exe 可直接使用）
+    """
+
+    def __init__(self, version: StandardVersion):
+        self.version = version
+        self.kind = version.kind
+        self.fields = COLD_HOT_FIELDS if version.kind == COLD_HOT else HOT_WARM_FIELDS
+        self.evaluate = (_compile_cold_hot if version.kind == COLD_HOT else _compile_hot_warm)(version)
+        self.coeffs = _segment_lookup(version)
+        self.rounders = {key: _rounder(digits) for key, digits in version.rounding}
+        self._columns = None
+
+    @property
+    def evaluate_columns(self):
+        if self._columns is None:
+            compile_columns = _compile_cold_hot_columns if self.kind == COLD_HOT else _compile_hot_warm_columns
+            self._columns = compile_columns(self.version)
+        return self._columns
+
+    def evaluate_any(self, columns: Dict) -> Dict[str, object]:
+        return self.evaluate_columns(*(columns[k] for k in self.fields))
+
+class StandardsRegistry:
+    def __init__(self, versions: List[StandardVersion]):
+        self.versions = sorted(versions, key=lambda v: (v.kind, v.effective or date.min))
+        self._by_id = {}
+        for v in self.versions:
+            if v.id in self._by_id:
+                raise ValueError(f"版本 id 重复：{v.id}")
+            self._by_id[v.id] = v
+        self._kernels: Dict[str, Kernel] = {}
+
+    def get(self, version_id: str) -> StandardVersion:
+        try:
+            return self._by_id[version_id]
+        except KeyError:
+            raise KeyError(f"登记表中无此版本：{version_id}（现有：{', '.join(self._by_id)}）") from None
+
+    def select(self, kind: str, on: Optional[date] = None) -> StandardVersion:
+        """
+        指定日期（默认今天）当时有效的版本：生效日不晚于该日期者中最新的一个
+        """
+        on = on or date.today()
+        current = None
+        for v in self.versions:
+            if v.kind == kind and (v.effective or date.min) <= on:
+                current = v
+        if current is None:
+            raise LookupError(f"{on.isoformat()} 时无有效的 {kind} 基准")
+        return current
+
+    def kernel(self, version_id: Optional[str] = None, kind: str = HOT_WARM,
+               on: Optional[date] = None) -> Kernel:
+        """
+        取得编译好的核心（每个版本只编译一次）；未指定 version_id 时依 kind / on 选择
+        """
+        version = self.get(version_id) if version_id else self.select(kind, on)
+        if version.id not in self._kernels:
+            self._kernels[version.id] = Kernel(version)
+        return self._kernels[version.id]
+
+def builtin_registry() -> StandardsRegistry:
+    """
+    由 Core 内建系数建立的登记表（找不到数据文件时使用）
+    """
+    def segments(bounds, tables):
+        return tuple(Segment(upper, tuple(coeffs[g] for g in GRADES))
+                     for upper, coeffs in zip(tuple(bounds) + (None,), tables))
+    return StandardsRegistry([
+        StandardVersion("CNS3910", HOT_WARM, None, "", (("V", 1), ("E_st24", 3)),
+                        segments((), (HOT_WARM_GRADE_COEFFS,))),
+        StandardVersion("能技字第10705015570号", COLD_HOT, date(2019, 9, 1), "",
+                        (("V", 1), ("K", 3), ("E_standard", 3)),
+                        segments(COLD_HOT_VEQ_BOUNDS, COLD_HOT_SEGMENT_COEFFS)),
+    ])
+
+def _default_path() -> str:
+    # 打包为 exe 时先找 exe 旁的数据文件（修订时直接替换），其次为打包在 exe 内的副本（解包目录）
+    if getattr(sys, "frozen", False):
+        beside = os.path.join(os.path.dirname(sys.executable), STANDARDS_FILE)
+        if os.path.exists(beside):
+            return beside
+    base = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base, STANDARDS_FILE)
+
+@lru_cache(maxsize=None)
+def load_registry(path: Optional[str] = None) -> StandardsRegistry:
+    """
+    载入登记表（同一路径只解析一次）；未指定路径且默认文件不存在时使用内建系数
+    """
+    if path is None:
+        path = _default_path()
+        if not os.path.exists(path):
+            return builtin_registry()
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return StandardsRegistry([parse_version(v) for v in data.get("versions", [])])
+
+def main():
+    args = sys.argv[1:]
+    opts = {"--type": None, "--date": None}
+    files = []
+    i = 0
+    while i < len(args):
+        if args[i] in opts:
+            opts[args[i]] = args[i + 1]
+            i += 2
+        else:
+            files.append(args[i])
+            i += 1
+
+    try:
+        registry = load_registry(files[0] if files else None)
+    except (OSError, ValueError) as e:
+        print(f"❌ 无法载入登记表：{e}")
+        return
+
+    print("=" * 70)
+    print("能效基准版本登记表")
+    print("=" * 70)
+    for v in registry.versions:
+        when = v.effective.isoformat() if v.effective else "（未记载）"
+        print(f"\n  {v.id}  [{v.kind}]  生效日 {when}")
+        if v.title:
+            print(f"    {v.title}")
+        print("    舍入：" + "，".join(f"{k}={d if d is not None else '不舍入'}" for k, d in v.rounding))
+        lower = "0"
+        for s in v.segments:
+            upper = f"{s.upper_L:g}" if s.upper_L is not None else "∞"
+            close = "]" if s.upper_L is not None else ")"
+            print(f"    容量 ({lower}, {upper}{close} L：" + "  ".join(
+                f"{g}级 {a:.3f}×V+{b:.3f}" for g, (a, b) in zip(GRADES, s.coeffs)))
+            lower = upper
+
+    kinds = [opts["--type"]] if opts["--type"] else [HOT_WARM, COLD_HOT]
+    on = date.fromisoformat(opts["--date"]) if opts["--date"] else date.today()
+    print(f"\n  {on.isoformat()} 有效版本：")
+    for kind in kinds:
+        try:
+            print(f"    {kind}: {registry.select(kind, on).id}")
+        except LookupError as e:
+            print(f"    ❌ {e}")
+    print("=" * 70)
+
+if __name__ == "__main__":
+    main()
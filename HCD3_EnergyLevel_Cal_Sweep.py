@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HCD3 设计空间扫描 - 等级地图
+对每个输入给定取值范围，以广播方式评估完整笛卡儿网格，分块计算限制内存，
+结果（等级立方体与余裕量立方体）直接写入磁盘 .npy 文件。
+
+使用方法：
+  python HCD3_EnergyLevel_Cal_Sweep.py hot-warm 输出目录 E24_kWh=0.2:2:100 T_hot24_C=80:95:100 T_amb_C=20:30:100 V_marked_L=0.5:10:50
+  python HCD3_EnergyLevel_Cal_Sweep.py cold-hot 输出目录 E24_kWh=0.2:1.5:50 T_hot_C=85:95:11 T_cold_C=4:10:7 T_amb_C=25 V_hot_L=1,2,3 V_cold_L=2:6:5
+
+取值格式：
+  起:止:点数 - 含两端的等距点（同 np.linspace）
+  a,b,c      - 列举值
+  a          - 单一值
+
+输出目录内容：
+  grade.npy      - int8，1–5 为等级，0 为不合格
+  margin_kWh.npy - float32，5 级上限（MEPS / 容许基准）减去评定值（未舍入），正值为合格余裕
+  axes.json      - 机型、各轴名称与取值
+"""
+
+import json
+import os
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+import HCD3_EnergyLevel_Cal_Vector as vec
+
+DEFAULT_CHUNK_ELEMS = 1 << 22    # 每块约 4M 个网格点
+
+def parse_range(spec: str) -> np.ndarray:
+    """
+    解析取值格式（起:止:点数 / 列举值 / 单一值）
+    """
+    spec = spec.strip()
+    if ':' in spec:
+        start, stop, num = spec.split(':')
+        return np.linspace(float(start), float(stop), int(num))
+    return np.array([float(v) for v in spec.split(',')], dtype=float)
+
+def _grid_chunks(shape: Tuple[int, ...], max_elems: int) -> Iterator[Tuple[slice, ...]]:
+    """
+    将网格切成每块不超过 max_elems 个点的区块（以前导轴切分），回传各区块的切片
+    """
+    d = 0
+    while d < len(shape) - 1 and int(np.prod(shape[d + 1:])) > max_elems:
+        d += 1
+    inner = int(np.prod(shape[d + 1:]))
+    step = max(1, max_elems // inner)
+    for outer in np.ndindex(*shape[:d]):
+        head = tuple(slice(k, k + 1) for k in outer)
+        for a in range(0, shape[d], step):
+            yield head + (slice(a, min(a + step, shape[d])),)
+
+def _broadcast_axes(axes: Sequence[np.ndarray], key: Tuple[slice, ...]) -> List[np.ndarray]:
+    """
+    取出区块内各轴的取值，并重塑为可互相广播的形状（第 i 轴为 -1，其余为 1）
+    """
+    n = len(axes)
+    out = []
+    for i, values in enumerate(axes):
+        part = values[key[i]] if i < len(key) else values
+        shape = [1] * n
+        shape[i] = -1
+        out.append(part.reshape(shape))
+    return out
+
+def _hot_warm_chunk(E24, T_hot24, T_amb, V) -> Tuple[np.ndarray, np.ndarray]:
+    Est24 = vec.est24(E24, T_hot24, T_amb)
+    limits = vec.grade_thresholds_kWh(V)
+    return vec.classify(Est24, limits), limits[5] - Est24
+
+def _cold_hot_chunk(E24, T_hot, T_cold, T_amb, V_hot, V_cold) -> Tuple[np.ndarray, np.ndarray]:
+    K1 = vec.calc_K1(T_hot, T_amb)
+    K2 = vec.calc_K2(T_cold, T_amb)
+    Veq = vec.calc_Veq(V_hot, V_cold, K1, K2)
+    limits = vec.cold_hot_grade_thresholds(Veq)
+    return vec.classify(E24, limits), vec.energy_standard_limit(Veq) - E24
+
+def sweep(kind: str, axes: Dict[str, np.ndarray], out_dir: str,
+          chunk_elems: int = DEFAULT_CHUNK_ELEMS) -> Dict:
+    """
+    评估完整网格并写入 out_dir；axes 须包含该机型所有输入字段。
+    轴的顺序依输入数据类字段顺序（HotWarmDispenserInput / ColdHotDispenserInput）。
+    """
+    names = vec.fields_of(kind)
+    missing = [k for k in names if k not in axes]
+    if missing:
+        raise KeyError(f"缺少扫描轴：{', '.join(missing)}")
+    values = [np.asarray(axes[k], dtype=float).ravel() for k in names]
+    shape = tuple(len(v) for v in values)
+    kernel = _cold_hot_chunk if kind == vec.COLD_HOT else _hot_warm_chunk
+
+    os.makedirs(out_dir, exist_ok=True)
+    grade = np.lib.format.open_memmap(os.path.join(out_dir, "grade.npy"),
+                                      mode='w+', dtype=np.int8, shape=shape)
+    margin = np.lib.format.open_memmap(os.path.join(out_dir, "margin_kWh.npy"),
+                                       mode='w+', dtype=np.float32, shape=shape)
+    counts = np.zeros(6, dtype=np.int64)
+    for key in _grid_chunks(shape, chunk_elems):
+        g, m = kernel(*_broadcast_axes(values, key))
+        # 广播结果可能在某些轴上仍为 1，写入前展开为区块形状
+        block = grade[key].shape
+        g = np.broadcast_to(g, block)
+        grade[key] = g
+        margin[key] = np.broadcast_to(m, block)
+        counts += np.bincount(g.ravel(), minlength=6)
+    grade.flush()
+    margin.flush()
+
+    meta = {
+        "kind": kind,
+        "axes": [{"name": k, "values": v.tolist()} for k, v in zip(names, values)],
+        "shape": list(shape),
+        "grade_counts": {("不合格" if g == vec.FAIL else str(g)): int(counts[g]) for g in range(6)},
+    }
+    with open(os.path.join(out_dir, "axes.json"), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return meta
+
+def load(out_dir: str) -> Tuple[Dict, np.ndarray, np.ndarray]:
+    """
+    以只读 mmap 方式载入扫描结果：(axes.json 内容, 等级立方体, 余裕量立方体)
+    """
+    with open(os.path.join(out_dir, "axes.json"), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    grade = np.load(os.path.join(out_dir, "grade.npy"), mmap_mode='r')
+    margin = np.load(os.path.join(out_dir, "margin_kWh.npy"), mmap_mode='r')
+    return meta, grade, margin
+
+def main():
+    import sys
+    import time
+
+    args = sys.argv[1:]
+    if len(args) < 3 or args[0] not in ("hot-warm", "cold-hot"):
+        print("使用方法：python HCD3_EnergyLevel_Cal_Sweep.py hot-warm|cold-hot 输出目录 字段=取值 ...")
+        return
+
+    kind = vec.COLD_HOT if args[0] == "cold-hot" else vec.HOT_WARM
+    axes = {}
+    for item in args[2:]:
+        name, spec = item.split('=', 1)
+        axes[name.strip()] = parse_range(spec)
+
+    print("=" * 70)
+    print("设计空间扫描")
+    print("=" * 70)
+    t0 = time.perf_counter()
+    try:
+        meta = sweep(kind, axes, args[1])
+    except (KeyError, ValueError) as e:
+        print(f"❌ {e}")
+        return
+    elapsed = time.perf_counter() - t0
+
+    total = int(np.prod(meta["shape"]))
+    print(f"  网格：{' × '.join(str(n) for n in meta['shape'])} = {total:,} 点")
+    print(f"  耗时：{elapsed:.2f} s（{total / elapsed / 1e6:.1f} M 点/s）")
+    print("\n  等级分布：")
+    for label, count in meta["grade_counts"].items():
+        if count:
+            name = label if label == "不合格" else f"{label}级"
+            print(f"    {name}: {count:,} ({count / total * 100:.1f}%)")
+    print(f"\n✓ 结果已保存至：{args[1]}")
+    print("=" * 70)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HCD3 合成测试数据产生器（负载测试用）
+以固定种子逐块产生温热型 / 冰温热型测试记录，直接串流写出，内存用量与总行数无关：
+  .csv      与批量工具相同的字段（型号 + 输入字段），坏行含非数值、空白等文字
+  .parquet  需安装 pyarrow；数值字段为 float64，无法表示的坏行值为 null
+  .bin      固定长度记录（各字段 <f8，无标头、无型号），
+            以 BinaryLog(文件, RecordLayout.from_spec(layout_spec(机型))) 读取；坏行文字值为 NaN
+
+分布（可用 --spec JSON 覆写，格式见 DEFAULT_SPEC）：
+  各输入字段为 {"choice": [...], "weights": [...]}、{"normal": [平均, 标准差], "clip": [下限, 上限]}
+  或 {"uniform": [下限, 上限]}；E24 不直接抽样，而是依 grade_mix 先抽目标等级（"fail" 为不合格），
+  再以反算求出的该等级 E24 区间内均匀抽样，故等级分布即为 grade_mix。
+  malformed_rate 比例的行改为坏行（种类见 MALFORMED_KINDS，各种类机率相同）。
+同一种子、机型、行数与分布必得相同的文件（与输出格式无关：各格式的数值完全相同）。
+
+使用方法：
+  python HCD3_EnergyLevel_Cal_Synth.py 输出文件(.csv|.parquet|.bin) 行数 [--kind hot_warm|cold_hot] [--seed 0] [--spec 分布.json]
+"""
+
+import copy
+import json
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from HCD3_EnergyLevel_Cal_Core import max_E24_for_grade, max_E24_for_cold_hot_grade
+import HCD3_EnergyLevel_Cal_Vector as vec
+
+CHUNK_ROWS = 1 << 16        # 每块行数（固定：块大小会影响随机序列）
+
+DEFAULT_SPEC: Dict[str, Dict] = {
+    vec.HOT_WARM: {
+        "T_hot24_C": {"normal": [88.0, 3.0], "clip": [75.0, 98.0]},
+        "T_amb_C": {"normal": [25.0, 3.0], "clip": [15.0, 35.0]},
+        "V_marked_L": {"choice": [1.0, 1.4, 2.0, 3.0, 4.0, 5.0, 8.0, 10.0],
+                       "weights": [2, 3, 3, 2, 1, 1, 1, 1]},
+        "grade_mix": {"1": 0.10, "2": 0.20, "3": 0.30, "4": 0.20, "5": 0.10, "fail": 0.10},
+        "malformed_rate": 0.01,
+    },
+    vec.COLD_HOT: {
+        "T_hot_C": {"normal": [90.0, 2.5], "clip": [80.0, 98.0]},
+        "T_cold_C": {"normal": [6.0, 1.5], "clip": [2.0, 12.0]},
+        "T_amb_C": {"normal": [25.0, 3.0], "clip": [15.0, 35.0]},
+        "V_hot_L": {"choice": [1.0, 1.5, 2.0, 2.5, 3.0, 5.0]},
+        "V_cold_L": {"choice": [1.5, 2.0, 3.0, 4.0, 6.0, 8.0]},
+        "grade_mix": {"1": 0.10, "2": 0.20, "3": 0.30, "4": 0.20, "5": 0.10, "fail": 0.10},
+        "malformed_rate": 0.01,
+    },
+}
+
+# 坏行种类：文字（非数值 / 空白）与可解析但检核不通过的值
+MALFORMED_TEXT = "text"
+MALFORMED_EMPTY = "empty"
+MALFORMED_NAN = "nan"
+MALFORMED_NEGATIVE = "negative"
+MALFORMED_HOT_LE_AMB = "hot_le_amb"
+MALFORMED_AMB_100 = "amb_100"
+MALFORMED_KINDS = (MALFORMED_TEXT, MALFORMED_EMPTY, MALFORMED_NAN,
+                   MALFORMED_NEGATIVE, MALFORMED_HOT_LE_AMB, MALFORMED_AMB_100)
+_BAD_TEXT = ("abc", "N/A", "--", "1.2.3")
+
+# CSV 各字段格式（与实验室记录的有效位数相近）
+_FORMATS = {"E24_kWh": "%.3f", "T_hot24_C": "%.1f", "T_hot_C": "%.1f", "T_cold_C": "%.1f",
+            "T_amb_C": "%.1f", "V_marked_L": "%r", "V_hot_L": "%r", "V_cold_L": "%r"}
+_DECIMALS = {"E24_kWh": 3, "T_hot24_C": 1, "T_hot_C": 1, "T_cold_C": 1, "T_amb_C": 1}
+
+def _quantize(values: np.ndarray, decimals: int) -> np.ndarray:
+    # 取最接近 k / 10^d 的 float64，与 CSV 文字读回的值完全相同
+    scale = 10.0 ** decimals
+    return np.round(values * scale) / scale
+
+def load_spec(kind: str, filename: Optional[str] = None) -> Dict:
+    """
+    机型的分布设定：DEFAULT_SPEC 以 JSON 档（{机型: {字段: 分布, ...}} 或单一机型的 {字段: 分布}）覆写
+    """
+    spec = copy.deepcopy(DEFAULT_SPEC[kind])
+    if filename:
+        with open(filename, 'r', encoding='utf-8') as f:
+            override = json.load(f)
+        if vec.HOT_WARM in override or vec.COLD_HOT in override:
+            override = override.get(kind, {})
+        spec.update(override)
+    return spec
+
+def _draw(rng: np.random.Generator, dist: Dict, n: int) -> np.ndarray:
+    if "choice" in dist:
+        weights = np.asarray(dist.get("weights") or [1.0] * len(dist["choice"]), dtype=float)
+        return rng.choice(np.asarray(dist["choice"], dtype=float), size=n, p=weights / weights.sum())
+    if "normal" in dist:
+        mean, sd = dist["normal"]
+        values = rng.normal(mean, sd, n)
+    elif "uniform" in dist:
+        values = rng.uniform(*dist["uniform"], n)
+    else:
+        raise ValueError(f"未知的分布：{dist}")
+    if "clip" in dist:
+        values = np.clip(values, *dist["clip"])
+    return values
+
+def _grade_limits(kind: str, columns: Dict[str, np.ndarray]) -> Dict[int, np.ndarray]:
+    # 各等级（或更佳）的最大 E24：等级 g 的 E24 区间为 (上限[g-1], 上限[g]]
+    if kind == vec.HOT_WARM:
+        args = (columns["T_hot24_C"], columns["T_amb_C"], columns["V_marked_L"])
+        return {g: max_E24_for_grade(g, *args) for g in (1, 2, 3, 4, 5)}
+    args = tuple(columns[k] for k in vec.fields_of(kind)[1:])
+    return {g: np.asarray(max_E24_for_cold_hot_grade(g, *args), dtype=float) for g in (1, 2, 3, 4, 5)}
+
+def _draw_E24(rng: np.random.Generator, kind: str, columns: Dict[str, np.ndarray],
+              grade_mix: Dict[str, float], n: int) -> np.ndarray:
+    labels = list(grade_mix)
+    p = np.asarray([grade_mix[k] for k in labels], dtype=float)
+    target = rng.choice(len(labels), size=n, p=p / p.sum())
+    limits = _grade_limits(kind, columns)
+    bounds = {g: limits[g] for g in (1, 2, 3, 4, 5)}
+    bounds[0] = 0.5 * limits[1]
+    bounds[6] = 1.5 * limits[5]             # 不合格：超过 5 级上限至其 1.5 倍
+    grade = np.asarray([6 if labels[t] == "fail" else int(labels[t]) for t in range(len(labels))])[target]
+    lo = np.choose(grade - 1, [bounds[g] for g in range(6)])
+    hi = np.choose(grade - 1, [bounds[g] for g in range(1, 7)])
+    # 记录至 3 位小数：无条件舍去后仍 ≤ hi，且区间内留 0.001 使其 > lo
+    E = lo + 0.001 + rng.random(n) * np.maximum(hi - lo - 0.001, 0.0)
+    return np.floor(E * 1000) / 1000
+
+def _malform(rng: np.random.Generator, kind: str, columns: Dict[str, np.ndarray],
+             rate: float, n: int) -> List[Tuple[int, str, str]]:
+    """
+    就地改写坏行的数值，回传 CSV 需改为文字的 [(行, 字段, 文字)]（数值以 NaN 表示）
+    """
+    fields = vec.fields_of(kind)
+    hot_key = fields[1]
+    rows = np.flatnonzero(rng.random(n) < rate)
+    kinds = rng.integers(0, len(MALFORMED_KINDS), rows.size)
+    picks = rng.integers(0, len(fields), rows.size)
+    words = rng.integers(0, len(_BAD_TEXT), rows.size)
+    text = []
+    for r, k, f, w in zip(rows.tolist(), kinds.tolist(), picks.tolist(), words.tolist()):
+        what = MALFORMED_KINDS[k]
+        if what in (MALFORMED_TEXT, MALFORMED_EMPTY):
+            columns[fields[f]][r] = np.nan
+            text.append((r, fields[f], _BAD_TEXT[w] if what == MALFORMED_TEXT else ""))
+        elif what == MALFORMED_NAN:
+            columns[fields[f]][r] = np.nan
+        elif what == MALFORMED_NEGATIVE:
+            columns["E24_kWh"][r] = -columns["E24_kWh"][r] - 0.001
+        elif what == MALFORMED_HOT_LE_AMB:
+            columns[hot_key][r] = columns["T_amb_C"][r] - 1.0
+        else:
+            columns["T_amb_C"][r] = 100.0
+    return text
+
+def generate_chunks(kind: str, n: int, seed: int = 0, spec: Optional[Dict] = None
+                    ) -> Iterator[Tuple[int, Dict[str, np.ndarray], List[Tuple[int, str, str]]]]:
+    """
+    逐块产生 (起始行号（0 起算）, {字段: float64 阵列}, 文字坏值 [(块内行, 字段, 文字)])，
+    每块至多 CHUNK_ROWS 行
+    """
+    spec = spec or DEFAULT_SPEC[kind]
+    rng = np.random.default_rng(seed)
+    fields = vec.fields_of(kind)
+    for start in range(0, n, CHUNK_ROWS):
+        m = min(CHUNK_ROWS, n - start)
+        columns = {}
+        for k in fields[1:]:
+            values = _draw(rng, spec[k], m)
+            columns[k] = _quantize(values, _DECIMALS[k]) if k in _DECIMALS else values
+        columns["E24_kWh"] = _draw_E24(rng, kind, columns, spec["grade_mix"], m)
+        columns = {k: columns[k] for k in fields}
+        text = _malform(rng, kind, columns, spec.get("malformed_rate", 0.0), m)
+        for k in ("E24_kWh", fields[1], "T_amb_C"):     # 坏行改写过的字段
+            columns[k] = _quantize(columns[k], _DECIMALS[k])
+        yield start, columns, text
+
+def layout_spec(kind: str) -> str:
+    """
+    .bin 的记录格式（供 RecordLayout.from_spec）
+    """
+    return ",".join(f"{k}:<f8" for k in vec.fields_of(kind))
+
+def _write_csv(filename: str, kind: str, chunks):
+    fields = vec.fields_of(kind)
+    line = "%s," + ",".join(_FORMATS[k] for k in fields) + "\n"
+    with open(filename, 'w', encoding='utf-8-sig', newline='') as f:
+        f.write("型号," + ",".join(fields) + "\n")
+        for start, columns, text in chunks:
+            values = list(zip(*(columns[k].tolist() for k in fields)))
+            lines = [line % ((f"SYN{start + i + 1:08d}",) + row) for i, row in enumerate(values)]
+            for r, field, word in text:
+                cells = [f"SYN{start + r + 1:08d}"] + [_FORMATS[k] % v for k, v in zip(fields, values[r])]
+                cells[1 + fields.index(field)] = word
+                lines[r] = ",".join(cells) + "\n"
+            f.write("".join(lines))
+
+def _write_parquet(filename: str, kind: str, chunks):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("parquet 格式需要 pyarrow（pip install pyarrow）")
+    fields = vec.fields_of(kind)
+    schema = pa.schema([("型号", pa.string())] + [(k, pa.float64()) for k in fields])
+    with pq.ParquetWriter(filename, schema) as writer:
+        for start, columns, text in chunks:
+            n = len(columns[fields[0]])
+            labels = pa.array([f"SYN{start + i + 1:08d}" for i in range(n)], pa.string())
+            arrays = [labels] + [pa.array(columns[k], pa.float64(), from_pandas=True) for k in fields]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+def _write_binary(filename: str, kind: str, chunks):
+    fields = vec.fields_of(kind)
+    dtype = np.dtype([(k, "<f8") for k in fields])
+    with open(filename, 'wb') as f:
+        for _, columns, _ in chunks:
+            records = np.empty(len(columns[fields[0]]), dtype=dtype)
+            for k in fields:
+                records[k] = columns[k]
+            records.tofile(f)
+
+WRITERS = {".csv": _write_csv, ".parquet": _write_parquet, ".bin": _write_binary}
+
+def write_dataset(filename: str, kind: str, n: int, seed: int = 0, spec: Optional[Dict] = None) -> int:
+    """
+    产生 n 行写入 filename（格式依扩展名：.csv / .parquet / .bin），回传行数
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    if ext not in WRITERS:
+        raise ValueError(f"不支持的格式：{ext}（可用 {', '.join(WRITERS)}）")
+    if kind not in DEFAULT_SPEC:
+        raise ValueError(f"未知的机型：{kind}")
+    WRITERS[ext](filename, kind, generate_chunks(kind, n, seed, spec))
+    return n
+
+def main():
+    import sys
+    import time
+
+    args = sys.argv[1:]
+    opts = {"--kind": vec.HOT_WARM, "--seed": "0", "--spec": None}
+    positional = []
+    i = 0
+    while i < len(args):
+        if args[i] in opts and i + 1 < len(args):
+            opts[args[i]] = args[i + 1]
+            i += 2
+        elif not args[i].startswith("--"):
+            positional.append(args[i])
+            i += 1
+        else:
+            print(__doc__)
+            return
+    if len(positional) != 2:
+        print(__doc__)
+        return
+
+    filename, kind = positional[0], opts["--kind"]
+    try:
+        n = int(float(positional[1]))
+        spec = load_spec(kind, opts["--spec"]) if kind in DEFAULT_SPEC else None
+        print("=" * 70)
+        print(f"合成测试数据：{kind} × {n:,} 行（种子 {opts['--seed']}）")
+        print("=" * 70)
+        t0 = time.perf_counter()
+        write_dataset(filename, kind, n, int(opts["--seed"]), spec)
+        elapsed = time.perf_counter() - t0
+    except (ValueError, ImportError, OSError) as e:
+        print(f"❌ {e}")
+        return
+    print(f"✓ 已写入：{filename}（{os.path.getsize(filename) / 1e6:,.1f} MB，{n / max(elapsed, 1e-9):,.0f} 行/秒）")
+    if filename.lower().endswith(".bin"):
+        print(f"  记录格式：{layout_spec(kind)}")
+    print("=" * 70)
+
+if __name__ == "__main__":
+    main()
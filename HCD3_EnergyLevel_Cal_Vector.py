@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HCD3 能效计算 - NumPy 批量引擎
+与 HCD3_EnergyLevel_Cal_Core 的公式一一对应，逐元素结果与标量函数完全一致（含舍入）。
+所有函数皆支持 NumPy 广播，可直接用于网格扫描或整列数据。
+系数、分段与舍入位数取自 Core.standard(机型)（适用的基准版本），与标量计算相同。
+
+等级阵列以 int8 表示：1–5 为等级，0（FAIL）为不合格（对应标量 API 的 None）。
+"""
+
+import csv
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from HCD3_EnergyLevel_Cal_Core import HOT_WARM_FIELDS, COLD_HOT_FIELDS, standard
+
+FAIL = 0
+
+HOT_WARM = "hot_warm"
+COLD_HOT = "cold_hot"
+
+# --- 与内建 round() 完全一致的向量化舍入 ---
+
+_SPLIT = 134217729.0    # 2**27 + 1，Veltkamp 分割常数
+_EXACT_LIMIT = 2.0 ** 52
+
+def _two_prod(a: np.ndarray, b: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Dekker 无误差乘积：a × b = p + e（p 为浮点乘积，e 为其精确误差）
+    """
+    p = a * b
+    c = _SPLIT * a
+    a_hi = c - (c - a)
+    a_lo = a - a_hi
+    c = _SPLIT * b
+    b_hi = c - (c - b)
+    b_lo = b - b_hi
+    e = ((a_hi * b_hi - p) + a_hi * b_lo + a_lo * b_hi) + a_lo * b_lo
+    return p, e
+
+def py_round(x, ndigits: int) -> np.ndarray:
+    """
+    逐元素等同 Python 内建 round(x, ndigits)：
+    依二进制浮点数的真实值舍入，恰为中点时取偶数，再转回最接近的浮点数。
+    （np.round 先乘 10**ndigits 再取整，乘法的舍入误差会使部分元素结果不同。）
+    """
+    x = np.asarray(x, dtype=float)
+    s = 10.0 ** ndigits
+    a = np.abs(x)
+    with np.errstate(invalid='ignore', over='ignore'):
+        special = ~(a * s < _EXACT_LIMIT)       # 含 nan / inf / 极大值
+    a = np.where(special, 0.0, a)
+    p, e = _two_prod(a, s)
+    m = np.floor(p)
+    # p 与 m + 0.5 相近时相减无误差，故 (d + e) 的正负号即真实值与中点比较的结果
+    r = (p - (m + 0.5)) + e
+    m += (r > 0) | ((r == 0) & (np.fmod(m, 2.0) == 1.0))
+    out = np.copysign(m / s, x)
+    if special.any():
+        out[special] = [round(v, ndigits) for v in x[special].tolist()]
+    return out
+
+# --- 适用基准的舍入与分段系数 ---
+
+def round_to(kind: str, key: str, x) -> np.ndarray:
+    """
+    依适用基准规定的位数舍入（key 为 V、E_st24、K、E_standard）；基准未规定位数时原值
+    """
+    digits = standard(kind).version.digits(key)
+    x = np.asarray(x, dtype=float)
+    return x if digits is None else py_round(x, digits)
+
+@lru_cache(maxsize=None)
+def _segment_table(version) -> Tuple[np.ndarray, np.ndarray, np.ndarray, bool]:
+    # (分段上限, A[段, 等级], B[段, 等级], 各段系数是否相同)
+    bounds = np.array([seg.upper_L for seg in version.segments[:-1]], dtype=float)
+    A = np.array([[c[0] for c in seg.coeffs] for seg in version.segments])
+    B = np.array([[c[1] for c in seg.coeffs] for seg in version.segments])
+    return bounds, A, B, bool((A == A[0]).all() and (B == B[0]).all())
+
+def segment_coeffs(kind: str, x) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    逐元素取得容量 x（温热型为舍入后的 V，冰温热型为 Veq）所在分段的 1–5 级系数，
+    回传 (a, b)，形状皆为 (5,) + x.shape；
+    分段以 np.searchsorted 查找（与标量 bisect_left 相同，上限含本身）。
+    各分段系数相同时直接广播，不做查找。
+    """
+    x = np.asarray(x, dtype=float)
+    bounds, A, B, uniform = _segment_table(standard(kind).version)
+    if uniform:
+        tail = (5,) + (1,) * x.ndim
+        return np.broadcast_to(A[0].reshape(tail), (5,) + x.shape), \
+               np.broadcast_to(B[0].reshape(tail), (5,) + x.shape)
+    seg = np.searchsorted(bounds, x, side='left')
+    return np.moveaxis(A[seg], -1, 0), np.moveaxis(B[seg], -1, 0)
+
+# --- 温热型（CNS 3910）---
+
+def temp_correction_factor(T_hot24_C, T_amb_C) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (np.asarray(T_hot24_C, dtype=float) - T_amb_C) / (100.0 - np.asarray(T_amb_C, dtype=float))
+
+def est24(E24_kWh, T_hot24_C, T_amb_C, rounding: int = None) -> np.ndarray:
+    K = temp_correction_factor(T_hot24_C, T_amb_C)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Est24 = np.asarray(E24_kWh, dtype=float) / K
+    if rounding is None:
+        return round_to(HOT_WARM, "E_st24", Est24)
+    return py_round(Est24, rounding)
+
+def grade_thresholds_kWh(V_marked_L) -> Dict[int, np.ndarray]:
+    V = round_to(HOT_WARM, "V", V_marked_L)
+    a, b = segment_coeffs(HOT_WARM, V)
+    return {g: a[g - 1] * V + b[g - 1] for g in (1, 2, 3, 4, 5)}
+
+def meps_limit_kWh(V_marked_L) -> np.ndarray:
+    return grade_thresholds_kWh(V_marked_L)[5]
+
+def classify(value, limits: Dict[int, np.ndarray]) -> np.ndarray:
+    """
+    逐元素回传第一个满足 value ≤ limits[g] 的等级，均不满足为 FAIL；
+    与标量 classify_grade 的判定顺序相同，且不假设门槛递增。
+    """
+    value = np.asarray(value)
+    shape = np.broadcast_shapes(value.shape, *(np.shape(limits[g]) for g in limits))
+    grade = np.full(shape, FAIL, dtype=np.int8)
+    for g in (5, 4, 3, 2, 1):
+        np.copyto(grade, g, where=value <= limits[g])
+    return grade
+
+def evaluate_columns(E24_kWh, T_hot24_C, T_amb_C, V_marked_L) -> Dict[str, object]:
+    """
+    温热型批量评估，键与 Core.evaluate() 相同；
+    limits_kWh 为 {等级: 阵列}，grade 以 FAIL 表示不合格。
+    即适用基准编译后的 Kernel.evaluate_columns。
+    """
+    return standard(HOT_WARM).evaluate_columns(E24_kWh, T_hot24_C, T_amb_C, V_marked_L)
+
+# --- 冰温热型（节能标章）---
+
+def calc_K1(T_hot_C, T_amb_C) -> np.ndarray:
+    return round_to(COLD_HOT, "K", temp_correction_factor(T_hot_C, T_amb_C))
+
+def calc_K2(T_cold_C, T_amb_C) -> np.ndarray:
+    T_amb_C = np.asarray(T_amb_C, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return round_to(COLD_HOT, "K", (T_amb_C - T_cold_C) / T_amb_C)
+
+def calc_Veq(V_hot_L, V_cold_L, K1, K2) -> np.ndarray:
+    V1 = round_to(COLD_HOT, "V", V_hot_L)
+    V2 = round_to(COLD_HOT, "V", V_cold_L)
+    return V1 * K1 + (V2 * K2) / 3
+
+def cold_hot_coeffs(Veq) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    逐元素取得 Veq 所在分段的 1–5 级系数，见 segment_coeffs
+    """
+    return segment_coeffs(COLD_HOT, Veq)
+
+def energy_standard_limit(Veq) -> np.ndarray:
+    Veq = np.asarray(Veq, dtype=float)
+    a, b = cold_hot_coeffs(Veq)
+    return round_to(COLD_HOT, "E_standard", a[4] * Veq + b[4])
+
+def cold_hot_grade_thresholds(Veq) -> Dict[int, np.ndarray]:
+    Veq = np.asarray(Veq, dtype=float)
+    a, b = cold_hot_coeffs(Veq)
+    return {g: a[g - 1] * Veq + b[g - 1] for g in (1, 2, 3, 4, 5)}
+
+def evaluate_cold_hot_columns(E24_kWh, T_hot_C, T_cold_C, T_amb_C, V_hot_L, V_cold_L) -> Dict[str, object]:
+    """
+    冰温热型批量评估，键与 Core.evaluate_cold_hot() 相同（即适用基准的 Kernel.evaluate_columns）
+    """
+    return standard(COLD_HOT).evaluate_columns(E24_kWh, T_hot_C, T_cold_C, T_amb_C, V_hot_L, V_cold_L)
+
+# --- 列式数据读写 ---
+
+def fields_of(kind: str) -> Tuple[str, ...]:
+    return COLD_HOT_FIELDS if kind == COLD_HOT else HOT_WARM_FIELDS
+
+def evaluate_any(kind: str, columns: Dict[str, np.ndarray]) -> Dict[str, object]:
+    """
+    依机型以列字典评估
+    """
+    args = [columns[k] for k in fields_of(kind)]
+    if kind == COLD_HOT:
+        return evaluate_cold_hot_columns(*args)
+    return evaluate_columns(*args)
+
+def _to_float(text: str) -> float:
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return float('nan')
+
+def read_columns(filename: str) -> Tuple[str, Dict[str, np.ndarray], List[str]]:
+    """
+    读取 CSV（与批量工具相同格式）为列阵列：
+      回传 (机型, {字段: float 阵列}, 型号列表)
+    表头含 T_cold_C 者视为冰温热型；无法解析的数值为 nan。
+    .npz 文件（save_columns 输出）直接载入。
+    """
+    if filename.endswith(".npz"):
+        with np.load(filename, allow_pickle=False) as z:
+            kind = str(z["kind"])
+            columns = {k: z[k] for k in fields_of(kind)}
+            labels = z["型号"].tolist() if "型号" in z else []
+        return kind, columns, labels
+
+    with open(filename, 'r', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        kind = COLD_HOT if "T_cold_C" in (reader.fieldnames or []) else HOT_WARM
+        names = fields_of(kind)
+        values: Dict[str, list] = {k: [] for k in names}
+        labels = []
+        for idx, row in enumerate(reader, 1):
+            for k in names:
+                values[k].append(_to_float(row.get(k)))
+            labels.append(row.get('型号') or f'测试{idx}')
+    return kind, {k: np.array(v, dtype=float) for k, v in values.items()}, labels
+
+def save_columns(filename: str, kind: str, columns: Dict[str, np.ndarray], labels: List[str] = None):
+    """
+    以 .npz 保存列阵列，供大量归档快速重复载入
+    """
+    arrays = {k: np.asarray(columns[k], dtype=float) for k in fields_of(kind)}
+    if labels is not None:
+        arrays["型号"] = np.asarray(labels, dtype=str)
+    np.savez(filename, kind=np.asarray(kind), **arrays)
@@ -6,24 +6,34 @@ echo 打包工具
 echo ========================================
 echo.
 
+rem 基准版本登记表：以 --add-data 打包进每个 exe 作为内建副本，并复制到 dist\ 放在 exe 旁；
+rem 法规修订时只需替换 dist\HCD3_EnergyLevel_Standards.json（exe 优先读取旁边的文件），不必重新打包
+set STANDARDS=--add-data "HCD3_EnergyLevel_Standards.json;."
+
+rem GUI 与交互式工具只用标量计算，不打包 NumPy：onefile 每次启动都要解压整个包，体积直接影响冷启动时间
+rem （启动时间预算见 HCD3_EnergyLevel_Startup_Budget.json，以 python HCD3_EnergyLevel_Cal_Bench.py startup 检查）
 echo 正在打包简化版GUI程序...
-pyinstaller --onefile --windowed --name "HCD3_EnergyLevel_Cal_GUI_Simple" HCD3_EnergyLevel_Cal_GUI_Simple.py
+pyinstaller --onefile %STANDARDS% --windowed --exclude-module numpy --name "HCD3_EnergyLevel_Cal_GUI_Simple" HCD3_EnergyLevel_Cal_GUI_Simple.py
 
 echo.
 echo 正在打包完整版GUI程序...
-pyinstaller --onefile --windowed --name "HCD3_EnergyLevel_Cal_GUI" HCD3_EnergyLevel_Cal_GUI.py
+pyinstaller --onefile %STANDARDS% --windowed --exclude-module numpy --name "HCD3_EnergyLevel_Cal_GUI" HCD3_EnergyLevel_Cal_GUI.py
 
 echo.
 echo 正在打包核心计算模块...
-pyinstaller --onefile --console --name "HCD3_EnergyLevel_Cal_Core" HCD3_EnergyLevel_Cal_Core.py
+pyinstaller --onefile %STANDARDS% --console --name "HCD3_EnergyLevel_Cal_Core" HCD3_EnergyLevel_Cal_Core.py
 
 echo.
 echo 正在打包交互式命令行工具...
-pyinstaller --onefile --console --name "HCD3_EnergyLevel_Cal_Interactive" HCD3_EnergyLevel_Cal_Interactive.py
+pyinstaller --onefile %STANDARDS% --console --exclude-module numpy --name "HCD3_EnergyLevel_Cal_Interactive" HCD3_EnergyLevel_Cal_Interactive.py
 
 echo.
 echo 正在打包批量处理工具...
-pyinstaller --onefile --console --name "HCD3_EnergyLevel_Cal_Batch" HCD3_EnergyLevel_Cal_Batch.py
+pyinstaller --onefile %STANDARDS% --console --name "HCD3_EnergyLevel_Cal_Batch" HCD3_EnergyLevel_Cal_Batch.py
+
+echo.
+echo 正在复制基准版本登记表...
+copy /Y HCD3_EnergyLevel_Standards.json dist\ >nul
 
 echo.
 echo ========================================
@@ -36,6 +46,7 @@ echo   dist\HCD3_EnergyLevel_Cal_GUI.exe         - 完整版GUI
 echo   dist\HCD3_EnergyLevel_Cal_Core.exe        - 核心计算模块
 echo   dist\HCD3_EnergyLevel_Cal_Interactive.exe - 交互式命令行
 echo   dist\HCD3_EnergyLevel_Cal_Batch.exe       - 批量处理工具
+echo   dist\HCD3_EnergyLevel_Standards.json      - 基准版本登记表（修订时替换此文件即可）
 echo.
 echo 双击运行 HCD3_EnergyLevel_Cal_GUI_Simple.exe 开始使用！
 echo.
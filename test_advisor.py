@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试升级建议：每项建议改变量代回 evaluate() / evaluate_cold_hot() 恰好达到目标等级，
+且少改一步（E24 减少量 1 ulp、容量 0.1 L、温度 1e-6 °C）即未达标
+"""
+
+import math
+from dataclasses import replace
+
+import numpy as np
+
+import HCD3_EnergyLevel_Cal_Vector as vec
+from HCD3_EnergyLevel_Cal_Advisor import advise
+from HCD3_EnergyLevel_Cal_Core import (
+    ColdHotDispenserInput, HotWarmDispenserInput, evaluate, evaluate_cold_hot,
+)
+
+TEMP_STEP = 1e-6
+
+def _hot_warm_columns(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "E24_kWh": rng.uniform(0.35, 1.1, n),
+        "T_hot24_C": rng.uniform(85.0, 92.0, n),
+        "T_amb_C": rng.uniform(20.0, 30.0, n),
+        "V_marked_L": np.round(rng.uniform(1.0, 8.0, n), 1),
+    }
+
+def _cold_hot_columns(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "E24_kWh": rng.uniform(0.8, 3.0, n),
+        "T_hot_C": rng.uniform(85.0, 92.0, n),
+        "T_cold_C": rng.uniform(5.0, 10.0, n),
+        "T_amb_C": rng.uniform(20.0, 30.0, n),
+        "V_hot_L": np.round(rng.uniform(1.0, 6.0, n), 1),
+        "V_cold_L": np.round(rng.uniform(1.0, 6.0, n), 1),
+    }
+
+def _grade(judge, spec, field, value):
+    g = judge(replace(spec, **{field: value}))['grade']
+    return 6 if g is None else g
+
+def _check(kind, columns, spec_type, judge):
+    advice = advise(kind, columns)
+    fields = vec.fields_of(kind)
+    levers = [k for k in fields if f"d_{k}" in advice]
+    checked = 0
+    for r in range(len(columns["E24_kWh"])):
+        target = int(advice["target_grade"][r])
+        if target == 0:
+            assert all(math.isnan(advice[f"d_{k}"][r]) for k in levers)
+            continue
+        spec = spec_type(*(float(columns[k][r]) for k in fields))
+        E = spec.E24_kWh
+        required = float(advice["required_dE24_kWh"][r])
+        assert _grade(judge, spec, "E24_kWh", E - required) == target
+        assert _grade(judge, spec, "E24_kWh", E - math.nextafter(required, -math.inf)) > target
+        for k in levers:
+            d = float(advice[f"d_{k}"][r])
+            if math.isnan(d):
+                continue
+            x = getattr(spec, k)
+            step = 0.1 if k.startswith("V") else TEMP_STEP
+            less = d - math.copysign(step, d)
+            assert _grade(judge, spec, k, x + d) == target, (r, k, d)
+            assert _grade(judge, spec, k, x + less) > target, (r, k, d)
+            checked += 1
+    assert checked > 0
+
+def test_hot_warm_advice_is_exact_and_minimal():
+    _check(vec.HOT_WARM, _hot_warm_columns(), HotWarmDispenserInput, evaluate)
+
+def test_cold_hot_advice_is_exact_and_minimal():
+    _check(vec.COLD_HOT, _cold_hot_columns(), ColdHotDispenserInput, evaluate_cold_hot)
+
+if __name__ == "__main__":
+    test_hot_warm_advice_is_exact_and_minimal()
+    test_cold_hot_advice_is_exact_and_minimal()
+    print("✓ 升级建议测试通过")
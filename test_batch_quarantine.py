@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试批量坏行隔离与修正后重送合并
+"""
+
+import csv
+import os
+import pathlib
+import tempfile
+
+from HCD3_EnergyLevel_Cal_Batch import process_batch, replay_quarantine, read_csv
+
+ROWS = [
+    ["型号", "E24_kWh", "T_hot24_C", "T_amb_C", "V_marked_L"],
+    ["A", "0.500", "85.0", "25.0", "2.0"],
+    ["B", "abc", "85.0", "25.0", "2.0"],
+    ["C", "0.800", "20.0", "24.0", "3.0"],
+    ["D", "0.600", "88.0", "24.0", "2.0"],
+]
+
+def _write(filename, rows):
+    with open(filename, 'w', encoding='utf-8-sig', newline='') as f:
+        csv.writer(f).writerows(rows)
+
+def test_quarantine_and_replay(tmp_path):
+    folder = str(tmp_path)
+    src, out, quarantine = (os.path.join(folder, n) for n in ("in.csv", "out.csv", "q.csv"))
+    _write(src, ROWS)
+    process_batch(src, out, quarantine_file=quarantine)
+
+    assert [r["序号"] for r in read_csv(out)] == ["1", "4"]
+    bad = {r["序号"]: r for r in read_csv(quarantine)}
+    assert bad["2"]["原因代码"] == "bad_number" and bad["2"]["E24_kWh"] == "abc"
+    assert bad["3"]["原因代码"] == "t_hot_le_amb"
+
+    # 修正 B，C 仍错误
+    fixed = os.path.join(folder, "fixed.csv")
+    with open(quarantine, 'r', encoding='utf-8-sig') as f:
+        rows = list(csv.reader(f))
+    rows = [[c if c != "abc" else "0.450" for c in r] for r in rows]
+    _write(fixed, rows)
+    still = os.path.join(folder, "q2.csv")
+    replay_quarantine(fixed, out, still)
+
+    merged = read_csv(out)
+    assert [(r["序号"], r["型号"]) for r in merged] == [("1", "A"), ("2", "B"), ("4", "D")]
+    assert [r["序号"] for r in read_csv(still)] == ["3"]
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        test_quarantine_and_replay(pathlib.Path(folder))
+    print("✓ 坏行隔离与重送合并正确")
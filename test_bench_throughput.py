@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试吞吐量基准：回归比较器的判定、整栏与批量流程量测
+"""
+
+import numpy as np
+
+from HCD3_EnergyLevel_Cal_Bench import (
+    BASELINE_FILE, batch_rows_per_second, columns_rows_per_second, compare_throughput, load_baseline,
+)
+from HCD3_EnergyLevel_Cal_FixedPoint import evaluate_fixed_columns
+
+def test_compare_flags_regression():
+    baseline = {"evaluate": 1000.0, "classify_grade": 1000.0, "batch_pipeline@1000": 1000.0}
+    current = {"evaluate": 860.0, "classify_grade": 840.0, "extra": 1.0}
+    rows = compare_throughput(current, baseline, tolerance_pct=15)
+    assert [(r["项目"], r["回归"]) for r in rows] == [("evaluate", False), ("classify_grade", True)]
+    assert rows[1]["变化_%"] == -16.0
+
+def test_batch_stages_measured():
+    rates = batch_rows_per_second(200, repeat=1)
+    assert set(rates) == {"read_csv", "process", "write_csv", "pipeline"}
+    assert all(v > 0 for v in rates.values()) and rates["pipeline"] < rates["process"]
+
+def test_fixed_point_columns_measured():
+    columns = [np.full(500, v) for v in (0.5, 87.0, 25.0, 2.0)]
+    assert columns_rows_per_second(evaluate_fixed_columns, columns, repeat=2) > 0
+    assert {"fixed_point_columns", "fixed_point_columns_cold_hot"} <= set(load_baseline(BASELINE_FILE)["results"])
+
+if __name__ == "__main__":
+    test_compare_flags_regression()
+    test_batch_stages_measured()
+    test_fixed_point_columns_measured()
+    print("✓ 吞吐量基准比较正确")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试二进制记录读取器：窗口索引、梯形积分对照解析解、计数差值与超出记录范围的错误、
+温度平均先套用热电偶校正
+"""
+
+import os
+import pathlib
+import tempfile
+
+import numpy as np
+
+import HCD3_EnergyLevel_Cal_BinaryLog as binlog
+from HCD3_EnergyLevel_Cal_BinaryLog import BinaryLog, RecordLayout
+from HCD3_EnergyLevel_Cal_Calibration import CalibrationRegistry
+
+SPEC = "t_s:<f8,P_W:<f4,E_kWh:<f8"
+STEP_H = 0.25
+HOURS = 30.0
+
+def _power(t_h):
+    return 100.0 + 10.0 * t_h
+
+def _energy_Wh(a, b):
+    # ∫ (100 + 10 t) dt，功率为线性时梯形法与插值皆为精确值
+    return 100.0 * (b - a) + 5.0 * (b * b - a * a)
+
+def _write_log(tmp_path) -> BinaryLog:
+    layout = RecordLayout.from_spec(SPEC, header_bytes=8)
+    t_h = np.arange(0.0, HOURS + STEP_H / 2, STEP_H)
+    records = np.zeros(t_h.size, dtype=layout.dtype)
+    records["t_s"] = t_h * 3600.0
+    records["P_W"] = _power(t_h)
+    records["E_kWh"] = 0.1 * t_h
+    filename = os.path.join(str(tmp_path), "log.bin")
+    with open(filename, 'wb') as f:
+        f.write(b"HCD3LOG\0")
+        f.write(records.tobytes())
+        f.write(b"\1\2\3")  # 不完整的尾端记录
+    return BinaryLog(filename, layout)
+
+def test_window_and_integral(tmp_path):
+    log = _write_log(tmp_path)
+    assert len(log) == int(HOURS / STEP_H) + 1
+    assert log.window(1.1, 24.0) == (5, 101)
+    assert log.window(0.0, 24.0) == (0, 97)
+    for start, hours in ((1.1, 24.0), (0.0, 24.0), (2.05, 0.1), (0.0, HOURS)):
+        expected = _energy_Wh(start, start + hours) / 1000.0
+        assert abs(log.integrate_power_kWh("P_W", start, hours) - expected) < 1e-9
+    assert abs(log.counter_delta_kWh("E_kWh", 1.1, 24.0) - 2.4) < 1e-9
+    assert log.mean("P_W", 0.0, 24.0) == _power(12.0)
+
+def test_out_of_coverage(tmp_path):
+    log = _write_log(tmp_path)
+    assert log.covers(0.0, HOURS) and not log.covers(10.0, 24.0) and not log.covers(-0.5, 24.0)
+    for start, hours in ((10.0, 24.0), (-0.5, 24.0), (HOURS + 1, 1.0)):
+        for call in (lambda: log.integrate_power_kWh("P_W", start, hours),
+                     lambda: log.counter_delta_kWh("E_kWh", start, hours)):
+            try:
+                call()
+            except ValueError as e:
+                assert "超出记录范围" in str(e)
+            else:
+                raise AssertionError(f"{start} h + {hours} h 应超出记录范围")
+
+def test_calibrated_means(tmp_path):
+    layout = RecordLayout.from_spec("t_s:<f8,T_hot_C:<f4,T_amb_C:<f4")
+    t_h = np.arange(0.0, 26.0, 0.1)
+    records = np.zeros(t_h.size, dtype=layout.dtype)
+    records["t_s"] = t_h * 3600.0
+    records["T_hot_C"] = 85.0 + 5.0 * np.sin(t_h)
+    records["T_amb_C"] = 25.0 + 0.5 * np.cos(t_h)
+    filename = os.path.join(str(tmp_path), "temps.bin")
+    records.tofile(filename)
+    log = BinaryLog(filename, layout)
+
+    registry = CalibrationRegistry()
+    registry.register("TC-1", [(0.0, 0.5), (50.0, 50.0), (100.0, 99.0)])
+    registry.assign("T_hot_C", "TC-1")
+    names = ["T_hot_C", "T_amb_C"]
+    i, j = log.window(1.0, 24.0)
+    expected = registry.corrected_means({k: records[k][i:j] for k in names})
+
+    chunk = binlog.CHUNK_RECORDS
+    binlog.CHUNK_RECORDS = 7     # 多个分块
+    try:
+        got = log.means(names, 1.0, 24.0, calibration=registry)
+    finally:
+        binlog.CHUNK_RECORDS = chunk
+    assert abs(got["T_hot_C"] - expected["T_hot_C"]) < 1e-9
+    assert got["T_amb_C"] == log.mean("T_amb_C", 1.0, 24.0)      # 未指定感温器：不校正
+    assert abs(got["T_hot_C"] - log.mean("T_hot_C", 1.0, 24.0)) > 0.1
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        test_window_and_integral(pathlib.Path(folder))
+    with tempfile.TemporaryDirectory() as folder:
+        test_out_of_coverage(pathlib.Path(folder))
+    with tempfile.TemporaryDirectory() as folder:
+        test_calibrated_means(pathlib.Path(folder))
+    print("✓ 二进制记录测试通过")
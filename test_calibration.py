@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试热电偶校正：已知校正点的分段插值、两端区段外插与登录表查找
+"""
+
+import os
+import pathlib
+import tempfile
+
+import numpy as np
+
+from HCD3_EnergyLevel_Cal_Calibration import CalibrationRegistry, SensorCalibration
+
+# 指示 → 参考：0→0.5、50→50.0、100→99.0（两段斜率 0.99、0.98）
+POINTS = [(100.0, 99.0), (0.0, 0.5), (50.0, 50.0)]
+
+def test_interpolation_and_extrapolation():
+    cal = SensorCalibration("TC-1", POINTS)
+    x = [0.0, 25.0, 50.0, 75.0, 100.0, -10.0, 110.0]
+    expected = [0.5, 25.25, 50.0, 74.5, 99.0, 0.5 - 10 * 0.99, 99.0 + 10 * 0.98]
+    assert np.allclose(cal.apply(x), expected, rtol=0, atol=1e-12)
+    # 单点证书整段平移
+    assert np.allclose(SensorCalibration("TC-2", [(25.0, 25.3)]).apply([0.0, 90.0]), [0.3, 90.3])
+    for bad in ([], [(10.0, 10.1), (10.0, 10.2)]):
+        try:
+            SensorCalibration("TC-3", bad)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("应拒绝无效的校正点")
+
+def test_registry_lookup(tmp_path):
+    folder = str(tmp_path)
+    certs = os.path.join(folder, "certs.csv")
+    channels = os.path.join(folder, "channels.csv")
+    with open(certs, 'w', encoding='utf-8') as f:
+        f.write("serial,indicated_C,reference_C\n")
+        f.writelines(f"TC-1,{i},{r}\n" for i, r in POINTS)
+        f.write("TC-2,25.0,25.3\n")
+    with open(channels, 'w', encoding='utf-8') as f:
+        f.write("channel,serial\nT_hot_C,TC-1\nT_amb_C, TC-2\n")
+
+    registry = CalibrationRegistry.from_csv(certs, channels)
+    assert "TC-1" in registry and "TC-2" in registry and "TC-9" not in registry
+    assert registry.get("TC-1").serial == "TC-1"
+    try:
+        registry.get("TC-9")
+    except KeyError as e:
+        assert "TC-9" in e.args[0]
+    else:
+        raise AssertionError("未登录的感温器应抛出 KeyError")
+
+    means = registry.corrected_means({
+        "T_hot_C": [25.0, 75.0],       # → 25.25、74.5
+        "T_amb_C": [24.7, 25.3],       # → +0.3
+        "T_cold_C": [8.0, 10.0],       # 未指定感温器：原值
+    })
+    assert abs(means["T_hot_C"] - 49.875) < 1e-12
+    assert abs(means["T_amb_C"] - 25.3) < 1e-12
+    assert means["T_cold_C"] == 9.0
+
+if __name__ == "__main__":
+    test_interpolation_and_extrapolation()
+    with tempfile.TemporaryDirectory() as folder:
+        test_registry_lookup(pathlib.Path(folder))
+    print("✓ 热电偶校正测试通过")
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试统一命令行：子命令的机器可读输出与结束码
+"""
+
+import contextlib
+import io
+import json
+import os
+import pathlib
+import tempfile
+
+from HCD3_EnergyLevel_Cal_CLI import main, EXIT_INPUT
+from HCD3_EnergyLevel_Cal_Core import HotWarmDispenserInput, evaluate
+
+def _run(argv):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(io.StringIO()):
+        code = main(argv)
+    return code, out.getvalue()
+
+def test_evaluate_and_batch_json(tmp_path):
+    code, text = _run(["evaluate", "1.152", "87", "25", "1.4"])
+    ref = evaluate(HotWarmDispenserInput(1.152, 87.0, 25.0, 1.4))
+    (row,) = json.loads(text)
+    assert code == 0 and row["E_st24_kWh"] == ref["E_st24_kWh"] and row["limit_5_kWh"] == ref["limits_kWh"][5]
+    assert _run(["evaluate", "1.2", "88", "8", "0", "2.5", "3"])[0] == EXIT_INPUT
+
+    src = os.path.join(str(tmp_path), "in.csv")
+    with open(src, 'w', encoding='utf-8-sig') as f:
+        f.write("型号,E24_kWh,T_hot24_C,T_amb_C,V_marked_L\nA,0.5,85,25,2\nB,x,87,25,1.4\n")
+    code, text = _run(["batch", src, "--format", "json", "--quiet"])
+    rows = json.loads(text)
+    assert code == 0 and rows[0]["grade"] == 3 and rows[0]["error"] is None
+    assert rows[1]["E24_kWh"] is None and rows[1]["error"] == "E24_kWh:not_finite"
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        test_evaluate_and_batch_json(pathlib.Path(folder))
+    print("✓ 命令行输出正确")
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试引擎一致性差分：现有引擎逐位元一致，植入的舍入差异会被抓到并缩减为最小重现案例
+"""
+
+import numpy as np
+
+import HCD3_EnergyLevel_Cal_Vector as vec
+from HCD3_EnergyLevel_Cal_Conformance import (
+    CATEGORIES, KIND_FIELDS, KIND_INPUT, _scalar_engine, compare, conformance, engines,
+    generate_block, mismatching_fields, reference, shrink,
+)
+from HCD3_EnergyLevel_Cal_Core import evaluate
+
+def test_engines_agree():
+    report = conformance(n=4000, seed=1, block_rows=2000)
+    assert report["rows"] == 8000 and report["mismatches"] == [] and report["cases"] == []
+
+def test_planted_rounding_bug_is_caught():
+    def np_round_est24(x):
+        # 以 np.round 舍入 E_st,24（先乘 1000 再取整，平手点附近与 round() 不同）
+        result = evaluate(x)
+        K = (x.T_hot24_C - x.T_amb_C) / (100.0 - x.T_amb_C)
+        result["E_st24_kWh"] = float(np.round(x.E24_kWh / K, 3))
+        return result
+
+    table = engines()
+    table[vec.HOT_WARM]["np_round"] = _scalar_engine(np_round_est24)
+    cols, category = generate_block(vec.HOT_WARM, 0, 0, 20000)
+    fields = KIND_FIELDS[vec.HOT_WARM]
+    inputs = [KIND_INPUT[vec.HOT_WARM](*row) for row in zip(*(cols[k].tolist() for k in fields))]
+    bad = compare(reference(vec.HOT_WARM, inputs), table[vec.HOT_WARM]["np_round"](vec.HOT_WARM, inputs))
+    rows = bad["E_st24_kWh"]
+    assert rows.size and CATEGORIES.index("tie") in category[rows].tolist()
+
+    case = {"kind": vec.HOT_WARM, "engine": "np_round", "field": "E_st24_kWh",
+            "input": {k: float(cols[k][rows[0]]) for k in fields}}
+    minimal = shrink(case, table)
+    assert "E_st24_kWh" in mismatching_fields(vec.HOT_WARM, "np_round", minimal, table)
+    assert sum(len(repr(v)) for v in minimal.values()) <= sum(len(repr(v)) for v in case["input"].values())
+
+if __name__ == "__main__":
+    test_engines_agree()
+    test_planted_rounding_bug_is_caught()
+    print("✓ 引擎一致性差分正确")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试常驻计算进程：经 socket 与本进程备援的结果皆与 Core 相同；
+默认 socket 位于权限 0700 的每用户目录，只删除无人监听的残留 socket
+"""
+
+import os
+import pathlib
+import random
+import socket
+import stat
+import tempfile
+import threading
+
+import HCD3_EnergyLevel_Cal_Daemon as daemon
+from HCD3_EnergyLevel_Cal_Core import HotWarmDispenserInput, ColdHotDispenserInput, evaluate, evaluate_cold_hot
+
+def _rows(n, seed):
+    rng = random.Random(seed)
+    return [[round(rng.uniform(0.2, 1.5), 3), round(rng.uniform(85, 95), 1), round(rng.uniform(2, 12), 1),
+             round(rng.uniform(15, 35), 1), round(rng.uniform(0.5, 10), 1), round(rng.uniform(0.5, 20), 1)]
+            for _ in range(n)]
+
+def _check(path):
+    rows = _rows(200, 45)
+    rows[7][3] = 0.0                        # T_amb = 0 → 检核不通过
+    for block in (rows[:5], rows):          # 标量路径与批量路径
+        results, _ = daemon.evaluate_rows(daemon.COLD_HOT, block, path)
+        for row, result in zip(block, results):
+            if row[3] == 0.0:
+                assert result is None
+            else:
+                assert result == evaluate_cold_hot(ColdHotDispenserInput(*row))
+    x = HotWarmDispenserInput(1.152, 87.0, 25.0, 1.4)
+    assert daemon.evaluate(x, path) == evaluate(x)
+
+def test_daemon_and_fallback(tmp_path):
+    path = os.path.join(str(tmp_path), "hcd3.sock")
+    _, via = daemon.evaluate_rows(daemon.HOT_WARM, [[0.5, 85.0, 25.0, 2.0]], path)
+    assert via is False
+    _check(path)
+    if not hasattr(socket, "AF_UNIX"):
+        return
+    server = daemon.make_daemon(path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        assert daemon.ping(path)
+        _, via = daemon.evaluate_rows(daemon.HOT_WARM, [[0.5, 85.0, 25.0, 2.0]], path)
+        assert via is True
+        _check(path)
+    finally:
+        server.shutdown()
+        server.server_close()
+        os.unlink(path)
+
+def _expect_oserror(call):
+    try:
+        call()
+    except OSError as e:
+        return e
+    raise AssertionError("应拋出 OSError")
+
+def test_socket_path_safety(tmp_path):
+    if not hasattr(socket, "AF_UNIX"):
+        return
+    saved = {k: os.environ.pop(k, None) for k in ("HCD3_SOCKET", "XDG_RUNTIME_DIR")}
+    os.environ["XDG_RUNTIME_DIR"] = str(tmp_path)
+    try:
+        path = daemon.default_socket_path()
+        folder = os.path.dirname(path)
+        server = daemon.make_daemon()
+        server.server_close()
+        assert server.server_address == path
+        assert stat.S_IMODE(os.stat(folder).st_mode) == 0o700
+        assert stat.S_ISSOCK(os.lstat(path).st_mode)
+
+        # 残留 socket（无人监听）会被取代；监听中的 socket 与一般文件不删除
+        server = daemon.make_daemon()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            assert "执行" in str(_expect_oserror(daemon.make_daemon))
+            assert daemon.ping()
+        finally:
+            server.shutdown()
+            server.server_close()
+        os.unlink(path)
+        with open(path, 'w') as f:
+            f.write("not a socket")
+        _expect_oserror(daemon.make_daemon)
+        assert os.path.isfile(path)
+        os.unlink(path)
+
+        # 其他人可存取的目录：服务端拒绝启动，客户端改在本进程计算
+        os.chmod(folder, 0o755)
+        _expect_oserror(daemon.make_daemon)
+        _, via = daemon.evaluate_rows(daemon.HOT_WARM, [[0.5, 85.0, 25.0, 2.0]])
+        assert via is False
+    finally:
+        for k, v in saved.items():
+            os.environ.pop(k, None)
+            if v is not None:
+                os.environ[k] = v
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        test_daemon_and_fallback(pathlib.Path(folder))
+    with tempfile.TemporaryDirectory() as folder:
+        test_socket_path_safety(pathlib.Path(folder))
+    print("✓ 常驻进程与备援结果一致")
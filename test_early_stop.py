@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试提前终止预测器：定功率曲线拟合、E24 门槛与实际判定一致、等级机率总和与归档回测
+"""
+
+import math
+import os
+import pathlib
+import tempfile
+from dataclasses import replace
+
+from HCD3_EnergyLevel_Cal_Core import (
+    ColdHotDispenserInput, HotWarmDispenserInput, evaluate, evaluate_cold_hot,
+)
+from HCD3_EnergyLevel_Cal_EarlyStop import (
+    backtest, e24_thresholds, fit_energy_curve, grade_probabilities, summarize,
+)
+
+HOT_WARM = HotWarmDispenserInput(math.nan, 87.0, 25.0, 2.0)
+COLD_HOT = ColdHotDispenserInput(math.nan, 88.0, 8.0, 25.0, 2.0, 3.0)
+
+def _constant_log(power_kW, hours=24.0, step_h=0.1):
+    t = [k * step_h for k in range(int(round(hours / step_h)) + 1)]
+    return t, [power_kW * h for h in t]
+
+def test_fit_constant_power():
+    hours, energy = _constant_log(0.025, hours=10.0)
+    fit = fit_energy_curve(hours, energy, block_h=1.0, meter_rel_uncertainty=0.01)
+    assert abs(fit.elapsed_h - 10.0) < 1e-9
+    assert abs(fit.power_kW - 0.025) < 1e-12
+    assert fit.power_stderr_kW < 1e-12
+    assert abs(fit.E24_kWh - 0.6) < 1e-9
+    assert abs(fit.sigma_kWh - 0.006) < 1e-9
+
+def test_thresholds_match_evaluate():
+    for spec, judge in ((HOT_WARM, evaluate), (COLD_HOT, evaluate_cold_hot)):
+        limits = e24_thresholds(spec)
+        for g in (1, 2, 3, 4, 5):
+            assert judge(replace(spec, E24_kWh=limits[g]))['grade'] <= g
+            worse = judge(replace(spec, E24_kWh=math.nextafter(limits[g], math.inf)))['grade']
+            assert worse is None or worse > g
+
+def test_probabilities_sum_to_one():
+    limits = e24_thresholds(HOT_WARM)
+    for E24 in (0.2, limits[1], 0.55, limits[5], 1.5):
+        for sigma in (0.0, 0.001, 0.05, 1.0):
+            probs = grade_probabilities(E24, sigma, limits)
+            assert set(probs) == {1, 2, 3, 4, 5, None}
+            assert all(p >= 0 for p in probs.values())
+            assert abs(sum(probs.values()) - 1.0) < 1e-12
+
+def test_backtest_complete_logs(tmp_path):
+    folder = str(tmp_path)
+    rows = []
+    for name, E24 in (("A", 0.288), ("B", 0.53), ("C", 1.2)):
+        hours, energy = _constant_log(E24 / 24.0, hours=26.0)
+        with open(os.path.join(folder, f"{name}.csv"), 'w', encoding='utf-8') as f:
+            f.write("elapsed_h,energy_kWh\n")
+            f.writelines(f"{t:.1f},{e!r}\n" for t, e in zip(hours, energy))
+        rows.append(f"{name},87.0,25.0,2.0,{name}.csv,1.0\n")
+    archive = os.path.join(folder, "archive.csv")
+    with open(archive, 'w', encoding='utf-8') as f:
+        f.write("型号,T_hot24_C,T_amb_C,V_marked_L,log,start_h\n")
+        f.writelines(rows)
+
+    results = backtest(archive)
+    assert [r["型号"] for r in results] == ["A", "B", "C"]
+    for r, E24 in zip(results, (0.288, 0.53, 1.2)):
+        assert abs(r["E24_actual_kWh"] - E24) < 1e-9
+        assert r["actual_grade"] == evaluate(replace(HOT_WARM, E24_kWh=r["E24_actual_kWh"]))['grade']
+        assert r["predicted_grade"] == r["actual_grade"]
+    assert [r["actual_grade"] for r in results] == [1, 3, None]
+    assert results[1]["hours_saved"] == 0.0
+    s = summarize(results)
+    assert s["stopped_early"] == 2 and s["misclassified"] == 0
+
+if __name__ == "__main__":
+    test_fit_constant_power()
+    test_thresholds_match_evaluate()
+    test_probabilities_sum_to_one()
+    with tempfile.TemporaryDirectory() as folder:
+        test_backtest_complete_logs(pathlib.Path(folder))
+    print("✓ 提前终止预测测试通过")
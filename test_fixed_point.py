@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试定点模式：四舍五入（half-up）、逐台与批量一致、与浮点版本的差异清单
+"""
+
+import math
+import random
+
+import numpy as np
+
+import HCD3_EnergyLevel_Cal_Vector as vec
+from HCD3_EnergyLevel_Cal_Core import (
+    HotWarmDispenserInput, ColdHotDispenserInput, evaluate_cold_hot, max_E24_for_cold_hot_grade,
+)
+from HCD3_EnergyLevel_Cal_FixedPoint import (
+    div_half_up, div_half_up_array, evaluate_fixed, evaluate_cold_hot_fixed,
+    evaluate_fixed_columns, evaluate_cold_hot_fixed_columns, differential,
+)
+
+def test_half_up_rounding():
+    assert div_half_up(5, 2) == 3
+    assert div_half_up(-5, 2) == -3
+    assert div_half_up(4, 3) == 1
+    assert div_half_up_array(np.array([5, -5, 7]), np.array([2, 2, -2])).tolist() == [3, -3, -4]
+    # K1 = 65 / 80 = 0.8125：Core 的 round() 为 0.812，定点为 0.813
+    d = ColdHotDispenserInput(0.4, 85.0, 8.0, 20.0, 2.5, 3.0)
+    assert evaluate_cold_hot(d)["K1"] == 0.812
+    assert evaluate_cold_hot_fixed(d)["K1_milli"] == 813
+
+def test_scalar_matches_columns():
+    rng = random.Random(38)
+    hw = [(round(rng.uniform(0.3, 1.5), 3), round(rng.uniform(80, 95), 1), round(rng.uniform(15, 35), 1),
+           round(rng.uniform(0.5, 10), 2)) for _ in range(500)]
+    cols = evaluate_fixed_columns(*(np.array(c) for c in zip(*hw)))
+    for i, r in enumerate(hw):
+        one = evaluate_fixed(HotWarmDispenserInput(*r))
+        assert (one["grade"] or vec.FAIL) == cols["grade"][i]
+        assert one["E_st24_mkWh"] == cols["E_st24_mkWh"][i]
+
+    ch = [(round(rng.uniform(0.2, 1.5), 3), round(rng.uniform(85, 95), 1), round(rng.uniform(2, 12), 1),
+           round(rng.uniform(15, 35), 1), round(rng.uniform(0.5, 10), 1), round(rng.uniform(0.5, 20), 1))
+          for _ in range(500)]
+    cols = evaluate_cold_hot_fixed_columns(*(np.array(c) for c in zip(*ch)))
+    for i, r in enumerate(ch):
+        one = evaluate_cold_hot_fixed(ColdHotDispenserInput(*r))
+        assert (one["grade"] or vec.FAIL) == cols["grade"][i]
+        assert one["E_standard_mkWh"] == cols["E_standard_mkWh"][i]
+
+def test_differential_reports_tie_flip():
+    # 刚好超过浮点 1 级上限：浮点为 2 级，定点因 K1 进位、上限较高而为 1 级
+    design = (85.0, 8.0, 20.0, 2.5, 3.0)
+    E = math.nextafter(max_E24_for_cold_hot_grade(1, *design), math.inf)
+    columns = {"E24_kWh": np.array([0.3, E])}
+    for k, v in zip(vec.fields_of(vec.COLD_HOT)[1:], design):
+        columns[k] = np.full(2, v)
+    result = differential(vec.COLD_HOT, columns)
+    assert result["rows"].tolist() == [1]
+    assert result["grade_float"][1] == 2 and result["grade_fixed"][1] == 1
+
+if __name__ == "__main__":
+    test_half_up_rounding()
+    test_scalar_matches_columns()
+    test_differential_reports_tie_flip()
+    print("✓ 定点模式测试通过")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试整栏输入检核：错误表的行号与错误代码、合格行可安全计算；各入口的机型判别一致
+"""
+
+import numpy as np
+
+from HCD3_EnergyLevel_Cal_Core import (
+    ColdHotDispenserInput, HotWarmDispenserInput, evaluate_cold_hot, evaluate_fused, input_from_record,
+    is_cold_hot, validate_columns, validate_record, validation_errors,
+    INVALID_NOT_FINITE, INVALID_RANGE, INVALID_T_AMB_0, INVALID_T_AMB_100,
+    INVALID_T_HOT_ORDER, INVALID_T_COLD_ORDER,
+)
+from HCD3_EnergyLevel_Cal_Server import evaluate_records
+
+def test_cold_hot_reason_codes():
+    columns = {
+        "E24_kWh":  [1.0, np.nan, 1.0, 1.0, -1.0, 1.0],
+        "T_hot_C":  [90.0, 90.0, 20.0, 90.0, 90.0, 90.0],
+        "T_cold_C": [5.0, 5.0, 5.0, 30.0, -5.0, 5.0],
+        "T_amb_C":  [25.0, 25.0, 25.0, 25.0, 0.0, 100.0],
+        "V_hot_L":  [2.5] * 6,
+        "V_cold_L": [3.0] * 6,
+    }
+    report = validate_columns(columns)
+    assert report["valid"].tolist() == [True, False, False, False, False, False]
+    got = {(e["row"], e["reason"]) for e in validation_errors(report)}
+    assert got == {(1, INVALID_NOT_FINITE), (2, INVALID_T_HOT_ORDER), (3, INVALID_T_COLD_ORDER),
+                   (4, INVALID_RANGE), (4, INVALID_T_AMB_0), (5, INVALID_T_AMB_100),
+                   (5, INVALID_T_HOT_ORDER)}
+    assert report["row"].tolist() == sorted(report["row"].tolist())
+
+    # 单台检核与整栏检核的单行结果（含顺序）一致
+    for r in range(6):
+        record = {k: columns[k][r] for k in columns}
+        got = validate_record(record)
+        assert got == [(e["field"], e["reason"]) for e in validation_errors(validate_columns(
+            {k: [v] for k, v in record.items()}))]
+        assert (not got) == bool(report["valid"][r])
+
+    for r in np.flatnonzero(report["valid"]).tolist():
+        evaluate_cold_hot(ColdHotDispenserInput(*(float(columns[k][r]) for k in columns)))
+
+def test_hot_warm_clean_columns():
+    report = validate_columns({"E24_kWh": np.array([0.5, 1.2]), "T_hot24_C": np.array([87.0, 90.0]),
+                               "T_amb_C": np.array([25.0, 20.0]), "V_marked_L": np.array([1.4, 3.0])})
+    assert report["valid"].all() and report["row"].size == 0
+
+def test_kind_detection_agrees():
+    # T_cold_C 缺栏、None 或空字符串（CSV 空栏）皆为温热型，各入口判别相同
+    hot_warm = {"E24_kWh": "0.5", "T_hot24_C": "87", "T_amb_C": "25", "V_marked_L": "1.4"}
+    expected = evaluate_fused(HotWarmDispenserInput(0.5, 87.0, 25.0, 1.4))
+    for cold in ({}, {"T_cold_C": None}, {"T_cold_C": ""}):
+        record = {**hot_warm, **cold}
+        assert not is_cold_hot(record)
+        assert isinstance(input_from_record(record), HotWarmDispenserInput)
+        assert validate_record(record) == []
+        assert validate_columns({k: [v] for k, v in record.items() if v not in (None, "")})["valid"].all()
+        assert evaluate_records([record])["results"][0]["E_st24_kWh"] == expected["E_st24_kWh"]
+    assert is_cold_hot({"T_cold_C": "8"}) and is_cold_hot({"T_cold_C": 0.0})
+    assert is_cold_hot({"T_cold_C": np.array([5.0, 8.0])})
+
+if __name__ == "__main__":
+    test_cold_hot_reason_codes()
+    test_hot_warm_clean_columns()
+    test_kind_detection_agrees()
+    print("✓ 输入检核错误表正确")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试反算：最大允许 E24 恰落在等级边界上
+"""
+
+import math
+import random
+
+import numpy as np
+
+from HCD3_EnergyLevel_Cal_Core import (
+    HotWarmDispenserInput, ColdHotDispenserInput, evaluate, evaluate_cold_hot,
+    max_E24_for_grade, max_E24_for_cold_hot_grade, E24_budget, E24_budget_cold_hot,
+)
+
+def _at_most(grade, g) -> bool:
+    return grade is not None and grade <= g
+
+def test_hot_warm_boundary_exact():
+    rng = random.Random(3)
+    designs = [(round(rng.uniform(80, 95), 1), round(rng.uniform(15, 35), 1), round(rng.uniform(0.5, 10), 2))
+               for _ in range(300)]
+    table = E24_budget(*(np.array(c) for c in zip(*designs)))
+    for i, (th, ta, v) in enumerate(designs):
+        for g in (1, 2, 3, 4, 5):
+            E = max_E24_for_grade(g, th, ta, v)
+            assert E == table[g][i]
+            assert _at_most(evaluate(HotWarmDispenserInput(E, th, ta, v))["grade"], g)
+            above = math.nextafter(E, math.inf)
+            assert not _at_most(evaluate(HotWarmDispenserInput(above, th, ta, v))["grade"], g)
+
+def test_cold_hot_boundary_exact():
+    rng = random.Random(4)
+    designs = [(round(rng.uniform(85, 95), 1), round(rng.uniform(2, 12), 1), round(rng.uniform(15, 35), 1),
+                round(rng.uniform(0.5, 10), 2), round(rng.uniform(0.5, 10), 2)) for _ in range(300)]
+    table = E24_budget_cold_hot(*(np.array(c) for c in zip(*designs)))
+    for i, d in enumerate(designs):
+        for g in (1, 2, 3, 4, 5):
+            E = max_E24_for_cold_hot_grade(g, *d)
+            assert E == table[g][i]
+            assert _at_most(evaluate_cold_hot(ColdHotDispenserInput(E, *d))["grade"], g)
+            above = math.nextafter(E, math.inf)
+            assert not _at_most(evaluate_cold_hot(ColdHotDispenserInput(above, *d))["grade"], g)
+
+def test_invalid_temperature_gives_nan():
+    assert math.isnan(max_E24_for_grade(1, 25.0, 25.0, 2.0))
+    assert np.isnan(max_E24_for_grade(1, np.array([20.0, 87.0]), 25.0, 2.0)[0])
+
+if __name__ == "__main__":
+    test_hot_warm_boundary_exact()
+    test_cold_hot_boundary_exact()
+    test_invalid_temperature_gives_nan()
+    print("✓ 反算结果与正算边界一致")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试后台批量任务：提交、进度、分页结果、隔离行、排队上限与重启后保留
+"""
+
+import http.client
+import json
+import os
+import pathlib
+import tempfile
+import threading
+
+from HCD3_EnergyLevel_Cal_Jobs import JobManager, JobQueueFull, JobStore, install, DONE
+from HCD3_EnergyLevel_Cal_Server import make_server
+
+CSV = "型号,E24_kWh,T_hot24_C,T_amb_C,V_marked_L\n" + "".join(
+    f"M{i},{0.5 + i / 1000:.3f},87.0,25.0,2.0\n" for i in range(30)) + "BAD,abc,87.0,25.0,2.0\n"
+
+def _request(conn, method, path, body=None, content_type="text/csv"):
+    conn.request(method, path, body, {"Content-Type": content_type} if body is not None else {})
+    resp = conn.getresponse()
+    return resp.status, json.loads(resp.read())
+
+def test_job_lifecycle(tmp_path):
+    db = os.path.join(str(tmp_path), "jobs.sqlite")
+    store = JobStore(db)
+    manager = JobManager(store, workers=2, queue_limit=4)
+    server = make_server("127.0.0.1", 0)
+    install(server, manager)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        conn = http.client.HTTPConnection(*server.server_address[:2], timeout=5)
+        status, body = _request(conn, "POST", "/jobs", CSV.encode("utf-8"))
+        assert status == 202
+        job_id = body["id"]
+        ndjson = "\n".join(json.dumps({"E24_kWh": 0.6, "T_hot24_C": 88, "T_amb_C": 24, "V_marked_L": 2}) for _ in range(3))
+        status, body = _request(conn, "POST", "/jobs?format=ndjson", ndjson.encode("utf-8"))
+        assert status == 202
+        manager.join()
+
+        status, job = _request(conn, "GET", f"/jobs/{job_id}")
+        assert status == 200 and job["status"] == DONE
+        assert (job["total"], job["done"], job["accepted"], job["rejected"]) == (31, 31, 30, 1)
+        _, page = _request(conn, "GET", f"/jobs/{job_id}/results?offset=10&limit=5")
+        assert [r["序号"] for r in page["rows"]] == [11, 12, 13, 14, 15]
+        _, bad = _request(conn, "GET", f"/jobs/{job_id}/quarantine")
+        assert bad["rows"][0]["序号"] == 31 and bad["rows"][0]["原因代码"] == "bad_number"
+        assert _request(conn, "GET", "/jobs/nope")[0] == 404
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+        manager.shutdown()
+        store.close()
+
+    # 重启后任务仍在；排队上限为 0 时拒绝新任务
+    store = JobStore(db)
+    manager = JobManager(store, workers=1, queue_limit=0)
+    try:
+        assert store.get(job_id)["accepted"] == 30
+        try:
+            manager.submit(CSV.encode("utf-8"), "csv")
+            assert False, "应拒绝"
+        except JobQueueFull:
+            pass
+    finally:
+        manager.shutdown()
+        store.close()
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        test_job_lifecycle(pathlib.Path(folder))
+    print("✓ 后台任务测试通过")
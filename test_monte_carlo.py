@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试 Monte Carlo 分析：单进程与多进程结果一致、已知解析机率与串流信赖区间
+"""
+
+import numpy as np
+
+import HCD3_EnergyLevel_Cal_Core as core
+from HCD3_EnergyLevel_Cal_Core import ColdHotDispenserInput, HotWarmDispenserInput
+from HCD3_EnergyLevel_Cal_MonteCarlo import CHUNK_DRAWS, HIST_BINS, Tolerance, _MetricSummary, simulate
+
+UNITS = [
+    HotWarmDispenserInput(0.55, 87.0, 25.0, 2.0),
+    ColdHotDispenserInput(1.2, 88.0, 8.0, 25.0, 2.0, 3.0),
+]
+
+def test_seed_reproducible_across_jobs():
+    draws = CHUNK_DRAWS + 1000  # 两个区块
+    single = simulate(UNITS, draws=draws, seed=7, jobs=1)
+    pooled = simulate(UNITS, draws=draws, seed=7, jobs=2)
+    assert single == pooled
+    assert simulate(UNITS, draws=draws, seed=8, jobs=1) != single
+
+def test_analytic_probability():
+    # 仅 E24 以 ±w 均匀抽样：E_st24 = round(E24 / K, 3) ≤ 1 级上限 t ⇔ E24 < K × (t + 0.0005)
+    T_hot, T_amb, V = 87.0, 25.0, 2.0
+    K = core.temp_correction_factor(T_hot, T_amb)
+    edge = K * (core.grade_thresholds_kWh(V)[1] + 0.0005)
+    E0, w = edge - 0.005, 0.02
+    [r] = simulate([HotWarmDispenserInput(E0, T_hot, T_amb, V)],
+                   tolerances={"E24_kWh": Tolerance(w)}, draws=400_000, seed=1)
+    expected = (edge - (E0 - w)) / (2 * w)
+    p = r["probabilities"]
+    assert abs(p[1] - expected) < 0.005
+    assert abs(p[2] - (1 - expected)) < 0.005
+    assert p[3] == p[4] == p[5] == p[None] == 0
+    # E_st24 近似均匀分布于 (E0 ± w) / K
+    assert abs(r["mean"] - E0 / K) < 1e-3
+    assert abs(r["ci_low"] - (E0 - 0.95 * w) / K) < 2e-3
+    assert abs(r["ci_high"] - (E0 + 0.95 * w) / K) < 2e-3
+
+def test_summary_matches_exact_quantiles():
+    rng = np.random.default_rng(0)
+    parts = [rng.normal(0.0, 1.0, 50_000), rng.normal(0.5, 2.0, 50_000)]
+    value_range = (-2.0, 2.0)     # 第二块有相当部分落在范围外
+    width = 4.0 / HIST_BINS
+    merged = _MetricSummary(value_range)
+    for part in parts:
+        chunk = _MetricSummary(value_range)
+        chunk.add(np.append(part, np.nan))
+        merged.merge(chunk)
+    values = np.concatenate(parts)
+    assert merged.n == values.size and merged.hist.sum() + merged.below.size + merged.above.size == values.size
+    assert abs(merged.mean() - values.mean()) < 1e-9
+    for q in (0.0, 0.01, 0.025, 0.5, 0.975, 0.99, 1.0):
+        exact = np.quantile(values, q)
+        if value_range[0] <= exact < value_range[1]:
+            assert abs(merged.quantile(q) - exact) <= width     # 范围内：不超过一个区间宽度
+        else:
+            assert abs(merged.quantile(q) - exact) < 1e-12      # 范围外：精确的样本分位数
+
+if __name__ == "__main__":
+    test_seed_reproducible_across_jobs()
+    test_analytic_probability()
+    test_summary_matches_exact_quantiles()
+    print("✓ Monte Carlo 测试通过")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试等级边界邻近索引：范围查询、前 k 台与各门槛计数与逐行暴力扫描一致，保存 / 载入可往返
+"""
+
+import os
+import pathlib
+import tempfile
+
+import numpy as np
+
+import HCD3_EnergyLevel_Cal_Core as core
+import HCD3_EnergyLevel_Cal_Vector as vec
+from HCD3_EnergyLevel_Cal_Proximity import GRADES, BoundaryIndex
+
+def _columns(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = {
+        "E24_kWh": rng.uniform(0.3, 0.9, n),
+        "T_hot24_C": rng.uniform(85.0, 92.0, n),
+        "T_amb_C": rng.uniform(20.0, 30.0, n),
+        "V_marked_L": rng.choice([1.0, 2.0, 3.5, 5.0], n),
+    }
+    columns["E24_kWh"][::97] = np.nan   # 无效行
+    return columns
+
+def _brute_force(columns):
+    # 逐行以标量函数计算各门槛距离
+    n = len(columns["E24_kWh"])
+    dist, pct = np.empty((len(GRADES), n)), np.empty((len(GRADES), n))
+    for r in range(n):
+        E24, T_hot, T_amb, V = (float(columns[k][r]) for k in vec.fields_of(vec.HOT_WARM))
+        value = core.est24(E24, T_hot, T_amb)
+        limits = core.grade_thresholds_kWh(V)
+        for i, g in enumerate(GRADES):
+            dist[i, r] = abs(value - limits[g])
+            pct[i, r] = abs(value - limits[g]) / abs(limits[g]) * 100
+    return dist, pct
+
+def _check(index, dist, pct):
+    nearest, nearest_pct = dist.min(axis=0), pct.min(axis=0)
+    for eps in (0.0, 0.002, 0.01, 0.05):
+        got = index.within(eps_kWh=eps)
+        assert sorted(got.tolist()) == np.flatnonzero(nearest <= eps).tolist()
+        assert np.all(np.diff(nearest[got]) >= 0)
+        counts = index.count_per_boundary(eps_kWh=eps)
+        assert counts == {g: int(np.sum(dist[i] <= eps)) for i, g in enumerate(GRADES)}
+    for p in (0.5, 2.0):
+        assert sorted(index.within(pct=p).tolist()) == np.flatnonzero(nearest_pct <= p).tolist()
+        assert index.count_per_boundary(pct=p) == {g: int(np.sum(pct[i] <= p)) for i, g in enumerate(GRADES)}
+    both = index.within(eps_kWh=0.005, pct=1.0)
+    assert both.tolist() == np.flatnonzero((nearest <= 0.005) | (nearest_pct <= 1.0)).tolist()
+
+    valid = np.flatnonzero(np.isfinite(nearest))
+    for k in (1, 10, 100):
+        top = index.top_k(k)
+        rest = np.setdiff1d(valid, top)
+        assert len(top) == k and nearest[top].max() <= nearest[rest].min()
+    assert np.array_equal(index.distance(valid), nearest[valid])
+    ok = np.isfinite(nearest)
+    assert np.array_equal(index.boundary[ok], np.argmin(dist[:, ok], axis=0) + 1)
+
+def test_queries_match_brute_force():
+    columns = _columns()
+    _check(BoundaryIndex.from_columns(vec.HOT_WARM, columns), *_brute_force(columns))
+
+def test_save_load_roundtrip(tmp_path):
+    columns = _columns(2000, seed=1)
+    index = BoundaryIndex.from_columns(vec.HOT_WARM, columns)
+    filename = os.path.join(str(tmp_path), "index.npz")
+    index.save(filename)
+    loaded = BoundaryIndex.load(filename)
+    assert loaded.n_rows == index.n_rows
+    for name in ("boundary", "nearest_order_kWh", "nearest_kWh", "nearest_order_pct", "nearest_pct"):
+        assert np.array_equal(getattr(loaded, name), getattr(index, name))
+    for name in ("order_kWh", "distance_kWh", "order_pct", "distance_pct"):
+        for g in GRADES:
+            assert np.array_equal(getattr(loaded, name)[g], getattr(index, name)[g])
+    _check(loaded, *_brute_force(columns))
+
+if __name__ == "__main__":
+    test_queries_match_brute_force()
+    with tempfile.TemporaryDirectory() as folder:
+        test_save_load_roundtrip(pathlib.Path(folder))
+    print("✓ 边界邻近索引测试通过")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试重新分级模拟：以手工草案比对转移矩阵与受影响机型清单和逐台 Kernel.evaluate 的结果
+"""
+
+import collections
+import json
+import os
+import pathlib
+import tempfile
+
+import numpy as np
+
+import HCD3_EnergyLevel_Cal_Vector as vec
+from HCD3_EnergyLevel_Cal_Core import ColdHotDispenserInput, HotWarmDispenserInput, standard
+from HCD3_EnergyLevel_Cal_Regrade import affected_rows, load_draft, regrade, summarize
+
+# 温热型草案：各级上限收紧约 5 %，2 L 以上另起一段
+HOT_WARM_DRAFT = {
+    "id": "草案-温热", "type": "hot_warm", "effective": None,
+    "rounding": {"V": 1, "E_st24": 3},
+    "segments": [
+        {"upper_L": 2, "coeffs": {"1": [0.030, 0.428], "2": [0.035, 0.499], "3": [0.040, 0.570],
+                                  "4": [0.046, 0.641], "5": [0.050, 0.712]}},
+        {"upper_L": None, "coeffs": {"1": [0.031, 0.426], "2": [0.036, 0.497], "3": [0.041, 0.568],
+                                     "4": [0.047, 0.639], "5": [0.051, 0.710]}},
+    ],
+}
+
+# 冰温热型草案（登记表格式，只含一个版本）
+COLD_HOT_DRAFT = {"versions": [{
+    "id": "草案-冰温热", "type": "cold_hot", "effective": None,
+    "rounding": {"V": 1, "K": 3, "E_standard": 3},
+    "segments": [{"upper_L": None, "coeffs": {"1": [0.047, 0.231], "2": [0.054, 0.270], "3": [0.062, 0.308],
+                                              "4": [0.069, 0.347], "5": [0.077, 0.385]}}],
+}]}
+
+def _write(folder, name, data):
+    filename = os.path.join(folder, name)
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    return filename
+
+def _columns(kind, n, seed):
+    rng = np.random.default_rng(seed)
+    if kind == vec.COLD_HOT:
+        return {"E24_kWh": rng.uniform(0.4, 1.2, n), "T_hot_C": rng.uniform(85.0, 92.0, n),
+                "T_cold_C": rng.uniform(5.0, 10.0, n), "T_amb_C": rng.uniform(20.0, 30.0, n),
+                "V_hot_L": rng.uniform(0.5, 4.0, n), "V_cold_L": rng.uniform(0.5, 4.0, n)}
+    return {"E24_kWh": rng.uniform(0.35, 0.8, n), "T_hot24_C": rng.uniform(85.0, 92.0, n),
+            "T_amb_C": rng.uniform(20.0, 30.0, n), "V_marked_L": rng.uniform(0.8, 4.0, n)}
+
+def _code(grade):
+    return vec.FAIL if grade is None else grade
+
+def _check(kind, columns, candidate, spec_type):
+    result = regrade(kind, columns, candidate, chunk_rows=64)
+    names = vec.fields_of(kind)
+    n = len(columns[names[0]])
+    current = standard(kind)
+    expected = collections.Counter()
+    changed = {}
+    for r in range(n):
+        spec = spec_type(*(float(columns[k][r]) for k in names))
+        g_cur = _code(current.evaluate(spec)["grade"])
+        g_new = _code(candidate.evaluate(spec)["grade"])
+        expected[g_cur, g_new] += 1
+        assert (result["grade_current"][r], result["grade_candidate"][r]) == (g_cur, g_new)
+        if g_cur != g_new:
+            changed[r + 1] = (g_cur, g_new)
+
+    assert result["transitions"].shape == (6, 6) and result["transitions"].sum() == n
+    for c in range(6):
+        for d in range(6):
+            assert result["transitions"][c, d] == expected[c, d]
+
+    labels = [f"M{r + 1}" for r in range(n)]
+    rows = affected_rows(result, labels)
+    label = {vec.FAIL: "不合格", **{g: f"{g}级" for g in (1, 2, 3, 4, 5)}}
+    assert {row["序号"]: (row["现行等级"], row["草案等级"]) for row in rows} == {
+        r: (label[c], label[d]) for r, (c, d) in changed.items()}
+    assert rows and all(row["型号"] == f"M{row['序号']}" for row in rows)
+    shifts = [float(row["余裕变化_kWh"]) for row in rows]
+    assert shifts == sorted(shifts)
+    return result
+
+def test_hot_warm_draft(tmp_path):
+    folder = str(tmp_path)
+    candidate = load_draft(_write(folder, "hot_warm.json", HOT_WARM_DRAFT))
+    result = _check(vec.HOT_WARM, _columns(vec.HOT_WARM, 500, 0), candidate, HotWarmDispenserInput)
+    s = summarize(result)
+    assert s["downgraded"] > 0 and s["upgraded"] == 0 and s["shift_max_kWh"] < 0
+
+def test_cold_hot_draft(tmp_path):
+    folder = str(tmp_path)
+    candidate = load_draft(_write(folder, "cold_hot.json", COLD_HOT_DRAFT))
+    _check(vec.COLD_HOT, _columns(vec.COLD_HOT, 500, 1), candidate, ColdHotDispenserInput)
+    try:
+        regrade(vec.HOT_WARM, _columns(vec.HOT_WARM, 10, 2), candidate)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("机型不符应抛出 ValueError")
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        test_hot_warm_draft(pathlib.Path(folder))
+    with tempfile.TemporaryDirectory() as folder:
+        test_cold_hot_draft(pathlib.Path(folder))
+    print("✓ 重新分级模拟测试通过")
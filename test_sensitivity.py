@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试灵敏度：各解析偏导数与有限差分一致（以不舍入的基准版本计算，避开 3 位小数阶梯），
+以及批量工具 --sensitivity 附加的字段
+"""
+
+import csv
+import json
+import os
+import pathlib
+import tempfile
+
+import numpy as np
+
+import HCD3_EnergyLevel_Cal_Vector as vec
+from HCD3_EnergyLevel_Cal_Batch import process_batch, read_csv
+from HCD3_EnergyLevel_Cal_Core import use_standard
+from HCD3_EnergyLevel_Cal_Sensitivity import cold_hot_sensitivity, hot_warm_sensitivity
+from HCD3_EnergyLevel_Cal_Standards import STANDARDS_FILE
+
+def _use_unrounded(folder):
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), STANDARDS_FILE), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    for version in data["versions"]:
+        version["rounding"] = {k: None for k in version["rounding"]}
+    path = os.path.join(folder, "standards.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    use_standard(path=path)
+
+def _central(f, columns, name, h):
+    up = dict(columns, **{name: columns[name] + h})
+    dn = dict(columns, **{name: columns[name] - h})
+    return (f(up) - f(dn)) / (2 * h)
+
+def _assert_close(analytic, numeric):
+    assert np.allclose(analytic, numeric, rtol=1e-6, atol=1e-9), np.max(np.abs(analytic - numeric))
+
+def _check_hot_warm():
+    rng = np.random.default_rng(0)
+    n = 200
+    columns = {"E24_kWh": rng.uniform(0.3, 1.0, n), "T_hot24_C": rng.uniform(80.0, 95.0, n),
+               "T_amb_C": rng.uniform(15.0, 35.0, n), "V_marked_L": rng.uniform(0.5, 10.0, n)}
+    sens = hot_warm_sensitivity(*(columns[k] for k in vec.fields_of(vec.HOT_WARM)))
+
+    def est(c):
+        return vec.evaluate_columns(*(c[k] for k in vec.fields_of(vec.HOT_WARM)))["E_st24_kWh"]
+
+    for key, name, h in (("dEst_dE24", "E24_kWh", 1e-6), ("dEst_dT_hot", "T_hot24_C", 1e-4),
+                         ("dEst_dT_amb", "T_amb_C", 1e-4), ("dEst_dV", "V_marked_L", 1e-4)):
+        _assert_close(sens[key], _central(est, columns, name, h))
+
+def _check_cold_hot():
+    rng = np.random.default_rng(1)
+    n = 200
+    columns = {"E24_kWh": rng.uniform(0.5, 2.0, n), "T_hot_C": rng.uniform(80.0, 95.0, n),
+               "T_cold_C": rng.uniform(3.0, 12.0, n), "T_amb_C": rng.uniform(15.0, 35.0, n),
+               "V_hot_L": rng.uniform(0.5, 3.0, n), "V_cold_L": rng.uniform(0.5, 3.0, n)}
+    sens = cold_hot_sensitivity(*(columns[k] for k in vec.fields_of(vec.COLD_HOT)))
+
+    def evaluate(c):
+        return vec.evaluate_cold_hot_columns(*(c[k] for k in vec.fields_of(vec.COLD_HOT)))
+
+    # 避开 Veq 分段边界附近的行
+    Veq = evaluate(columns)["Veq_L"]
+    assert np.all(np.abs(Veq - 8.0) > 1e-2)
+    for short, name, h in (("E24", "E24_kWh", 1e-6), ("T_hot", "T_hot_C", 1e-4), ("T_cold", "T_cold_C", 1e-4),
+                           ("T_amb", "T_amb_C", 1e-4), ("V_hot", "V_hot_L", 1e-4), ("V_cold", "V_cold_L", 1e-4)):
+        _assert_close(sens[f"dLimit_d{short}"], _central(lambda c: evaluate(c)["E_standard_kWh"], columns, name, h))
+        # 输出的 margin_kWh 为显示用的 3 位小数，故以 容许基准 - E24 求差分
+        _assert_close(sens[f"dMargin_d{short}"], _central(
+            lambda c: evaluate(c)["E_standard_kWh"] - c["E24_kWh"], columns, name, h))
+
+def test_partials_match_finite_differences(tmp_path):
+    _use_unrounded(str(tmp_path))
+    try:
+        _check_hot_warm()
+        _check_cold_hot()
+    finally:
+        use_standard()
+
+def test_batch_sensitivity_columns(tmp_path):
+    folder = str(tmp_path)
+    src, out = os.path.join(folder, "in.csv"), os.path.join(folder, "out.csv")
+    rows = [("A", 0.500, 85.0, 25.0, 2.0), ("B", 0.800, 88.0, 24.0, 3.0), ("C", 0.300, 90.0, 25.0, 1.5)]
+    with open(src, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["型号", "E24_kWh", "T_hot24_C", "T_amb_C", "V_marked_L"])
+        writer.writerows(rows)
+    process_batch(src, out)
+    plain = read_csv(out)
+    process_batch(src, out, sensitivity=True)
+    result = read_csv(out)
+
+    sens = hot_warm_sensitivity(*(np.array([r[i] for r in rows]) for i in (1, 2, 3, 4)))
+    added = set(result[0]) - set(plain[0])
+    assert added == set(sens)
+    for i, row in enumerate(result):
+        assert {k: row[k] for k in plain[0]} == plain[i]
+        assert row["flip_input"] == sens["flip_input"][i]
+        for key in added - {"flip_input"}:
+            assert float(row[key]) == float(f"{sens[key][i]:.6g}")
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        test_partials_match_finite_differences(pathlib.Path(folder))
+    with tempfile.TemporaryDirectory() as folder:
+        test_batch_sensitivity_columns(pathlib.Path(folder))
+    print("✓ 灵敏度测试通过")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试本机 HTTP 计算服务：同一 keep-alive 连接上的单台、批量与错误回应，
+以及无效 Content-Length 的拒绝
+"""
+
+import http.client
+import json
+import threading
+
+from HCD3_EnergyLevel_Cal_Core import HotWarmDispenserInput, ColdHotDispenserInput, evaluate, evaluate_cold_hot
+from HCD3_EnergyLevel_Cal_Server import MAX_BODY_BYTES, make_server, result_json
+
+def _post(conn, path, body):
+    conn.request("POST", path, json.dumps(body), {"Content-Type": "application/json"})
+    resp = conn.getresponse()
+    return resp.status, json.loads(resp.read())
+
+def test_endpoints_over_one_connection():
+    server = make_server("127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        conn = http.client.HTTPConnection(*server.server_address[:2], timeout=5)
+        hw = {"E24_kWh": 1.152, "T_hot24_C": 87.0, "T_amb_C": 25.0, "V_marked_L": 1.4}
+        ch = {"E24_kWh": 1.2, "T_hot_C": 88.0, "T_cold_C": 8.0, "T_amb_C": 25.0, "V_hot_L": 2.5, "V_cold_L": 3.0}
+
+        status, body = _post(conn, "/evaluate/hot-warm", hw)
+        assert status == 200 and body == result_json(evaluate(HotWarmDispenserInput(**hw)))
+        status, body = _post(conn, "/evaluate/cold-hot", ch)
+        assert status == 200 and body == result_json(evaluate_cold_hot(ColdHotDispenserInput(**ch)))
+
+        bad = dict(ch, T_amb_C=0.0)
+        status, body = _post(conn, "/evaluate/batch", {"records": [hw, bad, ch, {"E24_kWh": 1}]})
+        assert status == 200
+        assert body["results"][0]["grade"] is None and body["results"][2] is not None
+        assert body["results"][1] is None and body["results"][3] is None
+        assert {(e["index"], e["reason"]) for e in body["errors"]} >= {(1, "t_amb_0"), (3, "bad_record")}
+
+        status, body = _post(conn, "/evaluate/hot-warm", dict(hw, T_amb_C=100.0))
+        assert status == 422 and body["errors"][0]["reason"] == "t_amb_100"
+        assert _post(conn, "/evaluate/nothing", {})[0] == 404
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_invalid_content_length():
+    server = make_server("127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        for value, expected in (("-1", 400), ("abc", 400), ("1_0", 400), ("+5", 400),
+                                (str(MAX_BODY_BYTES + 1), 413)):
+            conn = http.client.HTTPConnection(*server.server_address[:2], timeout=5)
+            conn.putrequest("POST", "/evaluate/hot-warm")
+            conn.putheader("Content-Type", "application/json")
+            conn.putheader("Content-Length", value)
+            conn.endheaders()
+            resp = conn.getresponse()
+            assert resp.status == expected, (value, resp.status)
+            assert "error" in json.loads(resp.read())
+            assert resp.getheader("Connection") == "close"
+            conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+if __name__ == "__main__":
+    test_endpoints_over_one_connection()
+    test_invalid_content_length()
+    print("✓ HTTP 计算服务回应正确")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试基准登记表：现行版本的核心与 Core / Vector 结果一致，分段查找标量与阵列一致
+"""
+
+import json
+import os
+import pathlib
+import random
+import tempfile
+from datetime import date
+
+import numpy as np
+
+from HCD3_EnergyLevel_Cal_Core import (
+    HotWarmDispenserInput, ColdHotDispenserInput, evaluate, evaluate_cold_hot,
+    evaluate_fused, evaluate_cold_hot_fused, standard, use_standard,
+)
+from HCD3_EnergyLevel_Cal_Standards import (
+    COLD_HOT, HOT_WARM, StandardsRegistry, builtin_registry, load_registry, parse_version,
+)
+import HCD3_EnergyLevel_Cal_Vector as vec
+
+def _same(a, b):
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    return np.array_equal(a, b, equal_nan=True)
+
+def test_current_versions_match_core():
+    rng = random.Random(11)
+    for registry in (load_registry(), builtin_registry()):
+        hot = registry.kernel(kind=HOT_WARM)
+        cold = registry.kernel(kind=COLD_HOT)
+        for _ in range(2000):
+            spec = HotWarmDispenserInput(rng.uniform(0.2, 1.5), rng.uniform(80, 95), rng.uniform(15, 35),
+                                         rng.uniform(0.5, 10))
+            assert hot.evaluate(spec) == evaluate(spec)
+            spec = ColdHotDispenserInput(rng.uniform(0.2, 1.5), rng.uniform(85, 95), rng.uniform(2, 12),
+                                         rng.uniform(15, 35), rng.uniform(0.5, 10), rng.uniform(0.5, 10))
+            assert cold.evaluate(spec) == evaluate_cold_hot(spec)
+
+def test_current_versions_match_vector():
+    rng = np.random.default_rng(12)
+    n = 5000
+    columns = {
+        "E24_kWh": rng.uniform(0.2, 1.5, n), "T_hot24_C": rng.uniform(80, 95, n), "T_hot_C": rng.uniform(85, 95, n),
+        "T_cold_C": rng.uniform(2, 12, n), "T_amb_C": rng.uniform(15, 35, n), "V_marked_L": rng.uniform(0.5, 10, n),
+        "V_hot_L": rng.uniform(0.5, 10, n), "V_cold_L": rng.uniform(0.5, 10, n),
+    }
+    registry = load_registry()
+    for kind in (HOT_WARM, COLD_HOT):
+        got = registry.kernel(kind=kind).evaluate_any(columns)
+        want = vec.evaluate_any(kind, columns)
+        for key in want:
+            if key == "limits_kWh":
+                assert all(_same(got[key][g], want[key][g]) for g in (1, 2, 3, 4, 5))
+            else:
+                assert _same(got[key], want[key]), key
+
+def test_segments_and_date_selection():
+    coeffs = {str(g): [0.01 * g, 0.1 * g] for g in (1, 2, 3, 4, 5)}
+    wide = {str(g): [0.02 * g, 0.05 * g] for g in (1, 2, 3, 4, 5)}
+    registry = StandardsRegistry([
+        parse_version({"id": "old", "type": COLD_HOT, "effective": "2010-01-01",
+                       "rounding": {"V": 1, "K": 3, "E_standard": 3},
+                       "segments": [{"upper_L": None, "coeffs": coeffs}]}),
+        parse_version({"id": "new", "type": COLD_HOT, "effective": "2030-01-01",
+                       "rounding": {"V": 1, "K": 3, "E_standard": 3},
+                       "segments": [{"upper_L": 8, "coeffs": coeffs}, {"upper_L": None, "coeffs": wide}]}),
+    ])
+    assert registry.select(COLD_HOT, date(2020, 1, 1)).id == "old"
+    assert registry.select(COLD_HOT, date(2030, 1, 1)).id == "new"
+    kernel = registry.kernel("new")
+    assert registry.kernel("new") is kernel
+
+    rng = np.random.default_rng(13)
+    n = 3000
+    cols = [rng.uniform(0.2, 2.0, n), rng.uniform(85, 95, n), rng.uniform(2, 12, n),
+            rng.uniform(15, 35, n), rng.uniform(0.5, 20, n), rng.uniform(0.5, 20, n)]
+    batch = kernel.evaluate_columns(*cols)
+    for i, row in enumerate(zip(*(c.tolist() for c in cols))):
+        one = kernel.evaluate(ColdHotDispenserInput(*row))
+        assert (one["grade"] or vec.FAIL) == batch["grade"][i]
+        assert one["E_standard_kWh"] == batch["E_standard_kWh"][i]
+        Veq = one["V_hot_L"] * one["K1"] + (one["V_cold_L"] * one["K2"]) / 3
+        a, b = (coeffs if Veq <= 8 else wide)["1"]
+        assert one["limits_kWh"][1] == a * Veq + b
+
+def test_core_follows_selected_version(tmp_path):
+    # Core（参考与快速路径）与 Vector 皆依 use_standard 选用的版本计算，含冰温热型容量舍入位数
+    base = {str(g): [0.032 + 0.005 * g, 0.45 + 0.075 * g] for g in (1, 2, 3, 4, 5)}
+    revised = {str(g): [0.03 + 0.004 * g, 0.4 + 0.07 * g] for g in (1, 2, 3, 4, 5)}
+    path = os.path.join(str(tmp_path), "standards.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"versions": [
+            {"id": "hw-1", "type": HOT_WARM, "effective": "2000-01-01", "rounding": {"V": 1, "E_st24": 3},
+             "segments": [{"upper_L": None, "coeffs": base}]},
+            {"id": "hw-2", "type": HOT_WARM, "effective": "2030-01-01", "rounding": {"V": 1, "E_st24": 3},
+             "segments": [{"upper_L": None, "coeffs": revised}]},
+            {"id": "ch-2", "type": COLD_HOT, "effective": "2030-01-01", "rounding": {"V": 2, "K": 3, "E_standard": 3},
+             "segments": [{"upper_L": None, "coeffs": revised}]},
+        ]}, f)
+    hw = HotWarmDispenserInput(0.61, 88.0, 25.0, 2.0)
+    ch = ColdHotDispenserInput(0.9, 90.0, 6.0, 25.0, 2.3456, 3.0)
+    try:
+        use_standard(on=date(2031, 1, 1), path=path)
+        assert standard(HOT_WARM).version.id == "hw-2" and standard(COLD_HOT).version.id == "ch-2"
+        result = evaluate(hw)
+        assert result["limits_kWh"][3] == revised["3"][0] * 2.0 + revised["3"][1]
+        assert evaluate_fused(hw) == result
+        assert vec.evaluate_columns(*([v] for v in (0.61, 88.0, 25.0, 2.0)))["grade"][0] == result["grade"]
+        result = evaluate_cold_hot(ch)
+        assert result["V_hot_L"] == round(2.3456, 2)
+        assert evaluate_cold_hot_fused(ch) == result
+        assert vec.evaluate_cold_hot_columns(*([v] for v in (0.9, 90.0, 6.0, 25.0, 2.3456, 3.0)))["V_hot_L"][0] \
+            == result["V_hot_L"]
+
+        use_standard("hw-1", on=date(2031, 1, 1), path=path)
+        assert evaluate(hw)["limits_kWh"][3] == base["3"][0] * 2.0 + base["3"][1]
+    finally:
+        use_standard()
+    assert standard(HOT_WARM).version.id == "CNS3910"
+
+if __name__ == "__main__":
+    test_current_versions_match_core()
+    test_current_versions_match_vector()
+    test_segments_and_date_selection()
+    with tempfile.TemporaryDirectory() as folder:
+        test_core_follows_selected_version(pathlib.Path(folder))
+    print("✓ 登记表核心与 Core / Vector 结果一致")
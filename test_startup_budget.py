@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试启动路径：各入口载入与首个结果不载入预算档所禁止的模块（时间预算由 Bench startup 检查）
+"""
+
+from HCD3_EnergyLevel_Cal_Bench import STARTUP_ENTRIES, load_startup_budget, measure_startup
+
+def test_no_forbidden_modules():
+    for name, budget in load_startup_budget().items():
+        module, first = STARTUP_ENTRIES[name]
+        run = measure_startup(module, first, repeat=1)
+        loaded = {m.split(".")[0] for m in run["modules"]}
+        assert not loaded & set(budget.get("forbid", [])), f"{name} 载入了 {loaded & set(budget['forbid'])}"
+        assert run["first_result_ms"] is None or run["first_result_ms"] >= run["import_ms"]
+
+if __name__ == "__main__":
+    test_no_forbidden_modules()
+    print("✓ 启动路径未载入禁止的模块")
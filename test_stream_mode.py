@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试 NDJSON 串流模式：每行输入对应一行输出、机型自动判别、错误行不中断；
+管线中已到达的多行整批计算
+"""
+
+import io
+import json
+import os
+import sys
+import threading
+import time
+
+import HCD3_EnergyLevel_Cal_Core as core
+from HCD3_EnergyLevel_Cal_Core import (
+    HotWarmDispenserInput, ColdHotDispenserInput, evaluate, evaluate_cold_hot, stream_ndjson,
+)
+
+def test_stream_round_trip():
+    hw = {"id": "a", "E24_kWh": 1.152, "T_hot24_C": 87.0, "T_amb_C": 25.0, "V_marked_L": 1.4}
+    ch = {"E24_kWh": 1.2, "T_hot_C": 88.0, "T_cold_C": 8.0, "T_amb_C": 25.0, "V_hot_L": 2.5, "V_cold_L": 3.0}
+    lines = [json.dumps(hw), "", json.dumps(dict(ch, T_amb_C=100.0)), "{bad", json.dumps(ch)]
+    out = io.StringIO()
+    assert stream_ndjson(io.StringIO("\n".join(lines) + "\n"), out, batch=2) == 4
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert len(rows) == 4
+
+    expected = evaluate(HotWarmDispenserInput(*(hw[k] for k in list(hw)[1:])))
+    assert rows[0]["id"] == "a" and rows[0]["E_st24_kWh"] == expected["E_st24_kWh"]
+    assert rows[0]["limits_kWh"]["5"] == expected["limits_kWh"][5]
+    assert rows[1]["line"] == 3 and {e["reason"] for e in rows[1]["errors"]} >= {"t_amb_100"}
+    assert rows[2]["line"] == 4 and "error" in rows[2]
+    assert rows[3]["grade"] == evaluate_cold_hot(ColdHotDispenserInput(**ch))["grade"]
+
+def test_pipe_lines_form_one_batch():
+    if sys.platform == "win32":     # 管线不支持 select，只依 batch 大小分批
+        return
+    hw = {"E24_kWh": 1.152, "T_hot24_C": 87.0, "T_amb_C": 25.0, "V_marked_L": 1.4}
+    r, w = os.pipe()
+    os.write(w, "".join(json.dumps(dict(hw, id=i)) + "\n" for i in range(300)).encode())
+    sizes = []
+    stream_batch = core._stream_batch
+    core._stream_batch = lambda lines, out: (sizes.append(len(lines)), stream_batch(lines, out))
+    out = io.StringIO()
+    try:
+        with os.fdopen(r, 'r', encoding='utf-8') as stdin:
+            worker = threading.Thread(target=lambda: sizes.append(stream_ndjson(stdin, out)))
+            worker.start()
+            deadline = time.monotonic() + 10
+            while not sizes and time.monotonic() < deadline:
+                time.sleep(0.01)
+            os.write(w, (json.dumps(dict(hw, id=300)) + "\n").encode())   # 暂停后到达的行另成一批
+            os.close(w)
+            worker.join(10)
+    finally:
+        core._stream_batch = stream_batch
+    assert sizes == [300, 1, 301]
+    assert [json.loads(line)["id"] for line in out.getvalue().splitlines()] == list(range(301))
+
+if __name__ == "__main__":
+    test_stream_round_trip()
+    test_pipe_lines_form_one_batch()
+    print("✓ 串流模式输出正确")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试 NumPy 批量引擎与标量核心结果一致
+"""
+
+import json
+import os
+import random
+
+import numpy as np
+
+from HCD3_EnergyLevel_Cal_Core import (
+    HotWarmDispenserInput, ColdHotDispenserInput, evaluate, evaluate_cold_hot,
+    evaluate_fused, evaluate_cold_hot_fused, COLD_HOT_GRADE_COEFFS, cold_hot_coeffs, use_standard,
+)
+from HCD3_EnergyLevel_Cal_Standards import STANDARDS_FILE
+import HCD3_EnergyLevel_Cal_Vector as vec
+import HCD3_EnergyLevel_Cal_Sweep as sweep
+
+def _same(a, b) -> bool:
+    return a == b or (a != a and b != b)
+
+def test_py_round_matches_builtin():
+    rng = random.Random(1)
+    for nd in (0, 1, 3, 6):
+        values = [rng.uniform(-10, 10) for _ in range(5000)]
+        values += [(k + 0.5) / 10 ** nd for k in range(-500, 500)]
+        values += [2.675, 0.125, 1.0005, -0.0004, float('nan'), float('inf'), 1e15 + 0.3]
+        got = vec.py_round(np.array(values), nd).tolist()
+        for v, g in zip(values, got):
+            assert _same(round(v, nd), g), (v, nd)
+
+def test_columns_match_scalar():
+    rng = random.Random(2)
+    rows = [(round(rng.uniform(0.1, 2), 3), round(rng.uniform(80, 95), 1), round(rng.uniform(2, 12), 1),
+             round(rng.uniform(15, 35), 1), round(rng.uniform(0.5, 10), 2), round(rng.uniform(0.5, 10), 2))
+            for _ in range(3000)]
+    E, Th, Tc, Ta, V1, V2 = (np.array(c) for c in zip(*rows))
+
+    hw = vec.evaluate_columns(E, Th, Ta, V1)
+    ch = vec.evaluate_cold_hot_columns(E, Th, Tc, Ta, V1, V2)
+    for i, (e, th, tc, ta, v1, v2) in enumerate(rows):
+        for ref, out in ((evaluate(HotWarmDispenserInput(e, th, ta, v1)), hw),
+                         (evaluate_cold_hot(ColdHotDispenserInput(e, th, tc, ta, v1, v2)), ch)):
+            for key, value in ref.items():
+                if key == "limits_kWh":
+                    assert all(value[g] == out[key][g][i] for g in value)
+                elif key == "grade":
+                    assert (value or vec.FAIL) == out[key][i]
+                else:
+                    assert value == out[key][i], (key, rows[i])
+
+def test_cold_hot_segments(tmp_path):
+    # 登记表的大容量分段改用不同系数：标量（bisect）与阵列（searchsorted）须选到同一分段
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), STANDARDS_FILE), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    large = {str(g): [a * 0.5, b + 0.3] for g, (a, b) in COLD_HOT_GRADE_COEFFS.items()}
+    for version in data["versions"]:
+        if version["type"] == vec.COLD_HOT:
+            version["segments"][-1]["coeffs"] = large
+    path = os.path.join(str(tmp_path), "standards.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    use_standard(path=path)
+    try:
+        _check_cold_hot_segments(large)
+    finally:
+        use_standard()
+
+def _check_cold_hot_segments(large):
+    assert cold_hot_coeffs(8.0) == COLD_HOT_GRADE_COEFFS
+    assert cold_hot_coeffs(8.0 + 1e-12)[1] == tuple(large["1"])
+    a, _ = vec.cold_hot_coeffs(np.array([8.0, 8.0 + 1e-12]))
+    assert a[0].tolist() == [COLD_HOT_GRADE_COEFFS[1][0], large["1"][0]]
+
+    rng = random.Random(5)
+    rows = [(round(rng.uniform(0.2, 2.5), 3), round(rng.uniform(80, 95), 1), round(rng.uniform(2, 12), 1),
+             round(rng.uniform(15, 35), 1), round(rng.uniform(0.5, 20), 1), round(rng.uniform(0.5, 20), 1))
+            for _ in range(2000)]
+    out = vec.evaluate_cold_hot_columns(*(np.array(c) for c in zip(*rows)))
+    large = 0
+    for i, row in enumerate(rows):
+        ref = evaluate_cold_hot(ColdHotDispenserInput(*row))
+        assert (ref["grade"] or vec.FAIL) == out["grade"][i]
+        assert ref["E_standard_kWh"] == out["E_standard_kWh"][i]
+        assert all(ref["limits_kWh"][g] == out["limits_kWh"][g][i] for g in (1, 2, 3, 4, 5))
+        large += ref["Veq_L"] > 8
+    assert 0 < large < len(rows)
+
+def test_sweep_grid(tmp_path):
+    axes = {
+        "E24_kWh": np.linspace(0.2, 1.5, 7),
+        "T_hot24_C": np.array([85.0, 90.0]),
+        "T_amb_C": np.array([20.0, 25.0, 30.0]),
+        "V_marked_L": np.linspace(0.5, 5, 4),
+    }
+    sweep.sweep(vec.HOT_WARM, axes, str(tmp_path), chunk_elems=10)
+    meta, grade, _ = sweep.load(str(tmp_path))
+    assert list(grade.shape) == meta["shape"] == [7, 2, 3, 4]
+    for idx in np.ndindex(grade.shape):
+        args = [float(axes[k][i]) for k, i in zip(vec.HOT_WARM_FIELDS, idx)]
+        assert (evaluate(HotWarmDispenserInput(*args))["grade"] or vec.FAIL) == grade[idx]
+
+def test_fused_matches_reference():
+    rng = random.Random(39)
+    for _ in range(3000):
+        e, th, tc, ta = round(rng.uniform(0.1, 2), 3), round(rng.uniform(80, 95), 1), \
+            round(rng.uniform(2, 12), 1), round(rng.uniform(15, 35), 1)
+        v1, v2 = round(rng.uniform(0.5, 30), 2), round(rng.uniform(0.5, 30), 2)
+        hw = HotWarmDispenserInput(e, th, ta, v1)
+        ch = ColdHotDispenserInput(e, th, tc, ta, v1, v2)
+        assert evaluate_fused(hw) == evaluate(hw)
+        assert evaluate_cold_hot_fused(ch) == evaluate_cold_hot(ch)
+
+if __name__ == "__main__":
+    test_py_round_matches_builtin()
+    test_columns_match_scalar()
+    test_fused_matches_reference()
+    print("✓ 批量引擎与标量核心结果一致")